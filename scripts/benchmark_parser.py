@@ -0,0 +1,318 @@
+"""
+Parser throughput benchmark on synthetic SEEK alert emails.
+
+Usage:
+    make bench-parser
+    python scripts/benchmark_parser.py --cards 12 20 200 --output .bench/bench_parser.json
+    python scripts/benchmark_parser.py --compare .bench/bench_parser_main.json
+
+Results go under .bench/ (git-ignored) by default.
+
+Measures parse_seek_email (emails/s, per-card latency, peak memory per engine) and
+run_mail_parse end to end on an in-memory SQLite. Results are written as JSON; --compare
+reports the change against a previous run and fails when a case got slower than
+--max-slowdown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import UTC, datetime
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from hiring_compass_au.infra.storage.schema import init_all_tables
+from hiring_compass_au.services.job_alerts.parsers.html_engines import HTML_ENGINES
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import PARSER_CONFIGS
+from hiring_compass_au.services.job_alerts.parsers.runner import run_mail_parse
+from hiring_compass_au.services.job_alerts.parsers.seek_mail_parser import parse_seek_email
+
+SEEK_SENDER = "jobmail@s.seek.com.au"
+DEFAULT_CARD_COUNTS = (12, 16, 20, 100, 500)
+
+TITLES = ["Data Engineer", "Senior Analyst", "Platform Engineer", "BI Developer", "ML Engineer"]
+COMPANIES = ["Acme Pty Ltd", "Globex Australia", "Initech", "Hooli Group", "Umbrella Health"]
+LOCATIONS = [
+    "Sydney NSW",
+    "Surry Hills, Sydney NSW",
+    "Melbourne VIC",
+    "Brisbane QLD",
+    "Perth WA",
+    "Canberra ACT",
+]
+SALARIES = [
+    "$120,000 - $140,000 per year",
+    "$110k - $130k p.a. + super",
+    "$95 - $110 per hour",
+    "$900 per day",
+    None,
+]
+BOILERPLATE = (
+    "You are receiving this email because you created a job alert on SEEK. "
+    "Manage your alerts, change how often you hear from us or unsubscribe at any time. "
+)
+
+# ----------------------------
+# Synthetic corpus
+# ----------------------------
+
+
+def _stacked_card(key: str, title, company, location, salary, posted) -> str:
+    lines = [
+        f'<div style="color:#2e3849; font-size:16px; font-weight:700;">{title}</div>',
+        f'<div style="color:#5a6881; font-size:14px; font-weight:400;">{company}</div>',
+        f'<div style="color:#2e3849; font-size:14px;">{location}</div>',
+    ]
+    if salary:
+        lines.append(f'<div style="color:#2e3849; font-size:14px;">{salary}</div>')
+    lines.append('<div style="padding:4px 0;"><ul><li>Hybrid</li><li>Full time</li></ul></div>')
+    lines.append(f'<div style="color:#5a6881; font-size:12px;">{posted}</div>')
+    return (
+        f'<a href="https://email.s.seek.com.au/uni/ss/c/{key}" style="text-decoration:none;">'
+        f"<div>{''.join(lines)}</div></a>"
+    )
+
+
+def _table_card(key: str, title, company, location, salary, posted) -> str:
+    salary_row = f"<tr><td><div>{salary}</div></td></tr>" if salary else ""
+    return (
+        f'<a href="https://email.s.seek.com.au/uni/ss/c/{key}">'
+        '<table role="presentation" width="100%"><tbody>'
+        "<tr><td>"
+        f'<div style="color:#2e3849; font-size:16px; font-weight:700;">{title}</div>'
+        "</td></tr><tr><td>"
+        f'<div style="color:#5a6881; font-size:14px; font-weight:400;">{company}</div>'
+        f"</td></tr><tr><td><div>{location}</div></td></tr>{salary_row}"
+        f"<tr><td><div>{posted}</div><div>{BOILERPLATE * 2}</div></td></tr>"
+        "</tbody></table></a>"
+    )
+
+
+CARD_TEMPLATES = {"stacked": _stacked_card, "table": _table_card}
+
+
+def build_alert_email(n_cards: int, template: str = "stacked", seed: int = 0) -> str:
+    """SEEK-like alert email with n_cards job cards plus header/footer links and boilerplate."""
+    rng = random.Random(seed)
+    render = CARD_TEMPLATES[template]
+
+    cards = []
+    for i in range(n_cards):
+        cards.append(
+            render(
+                f"{seed:x}{i:05x}{rng.getrandbits(64):016x}",
+                rng.choice(TITLES),
+                rng.choice(COMPANIES),
+                rng.choice(LOCATIONS),
+                rng.choice(SALARIES),
+                f"Posted on {rng.randint(1, 28)} March 2025",
+            )
+        )
+
+    header = (
+        '<a href="https://www.seek.com.au/"><img alt="SEEK" src="logo.png"></a>'
+        f"<p>{n_cards} new jobs for Data Engineer in All Australia</p>"
+    )
+    footer = (
+        f"<p>{BOILERPLATE * 4}</p>"
+        '<a href="https://email.s.seek.com.au/uni/ss/c/unsubscribe"><div>Unsubscribe</div></a>'
+        '<a href="https://www.seek.com.au/privacy">Privacy</a>'
+    )
+    return (
+        '<html><head><style>td{font-family:Arial}</style></head><body><table width="600">'
+        f"<tr><td>{header}</td></tr><tr><td>{''.join(cards)}</td></tr>"
+        f"<tr><td>{footer}</td></tr></table></body></html>"
+    )
+
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+
+
+def _peak_memory_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def bench_parse_seek_email(
+    n_cards: int, template: str, engine: str, emails: int, warmup: int = 2
+) -> dict:
+    corpus = [build_alert_email(n_cards, template, seed=i) for i in range(emails)]
+
+    for html in corpus[:warmup]:
+        list(parse_seek_email(html, engine=engine))
+
+    hits = 0
+    t0 = time.perf_counter()
+    for html in corpus:
+        hits += len(list(parse_seek_email(html, engine=engine)))
+    seconds = time.perf_counter() - t0
+
+    if hits != n_cards * emails:
+        raise RuntimeError(f"expected {n_cards * emails} hits, got {hits} ({template}/{engine})")
+
+    return {
+        "case": f"parse_seek_email/{template}/{engine}/cards={n_cards}",
+        "emails": emails,
+        "cards": n_cards,
+        "seconds": round(seconds, 4),
+        "emails_per_s": round(emails / seconds, 1),
+        "card_latency_us": round(1e6 * seconds / hits, 1),
+        "peak_kib": _peak_memory_kib(lambda: list(parse_seek_email(corpus[0], engine=engine))),
+    }
+
+
+def _seeded_connection(corpus: list[str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_all_tables(conn)
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, html_raw, from_email, "
+        "internal_date_ms) VALUES (?, ?, 'fetched', 'x', ?, ?, ?)",
+        [(f"m{i}", f"t{i}", html, SEEK_SENDER, i) for i, html in enumerate(corpus)],
+    )
+    conn.commit()
+    return conn
+
+
+def bench_run_mail_parse(n_cards: int, template: str, emails: int, commit_every: int) -> dict:
+    corpus = [build_alert_email(n_cards, template, seed=i) for i in range(emails)]
+
+    conn = _seeded_connection(corpus)
+    try:
+        t0 = time.perf_counter()
+        processed, hits, *_ = run_mail_parse(conn, commit_every=commit_every)
+        seconds = time.perf_counter() - t0
+    finally:
+        conn.close()
+
+    if processed != emails or hits != n_cards * emails:
+        raise RuntimeError(f"run_mail_parse processed={processed} hits={hits}")
+
+    def traced_run() -> None:
+        traced_conn = _seeded_connection(corpus)
+        try:
+            run_mail_parse(traced_conn, commit_every=commit_every)
+        finally:
+            traced_conn.close()
+
+    return {
+        "case": f"run_mail_parse/{template}/commit_every={commit_every}/cards={n_cards}",
+        "emails": emails,
+        "cards": n_cards,
+        "seconds": round(seconds, 4),
+        "emails_per_s": round(emails / seconds, 1),
+        "card_latency_us": round(1e6 * seconds / hits, 1),
+        "peak_kib": _peak_memory_kib(traced_run),
+    }
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare_results(current: list[dict], baseline: list[dict], max_slowdown: float) -> int:
+    """Print the per-case change of card latency; return the number of regressions."""
+    previous = {r["case"]: r for r in baseline}
+    regressions = 0
+    for r in current:
+        old = previous.get(r["case"])
+        if old is None:
+            continue
+        change = r["card_latency_us"] / old["card_latency_us"] - 1
+        flag = ""
+        if change > max_slowdown:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{r['case']:<60} {old['card_latency_us']:>9.1f}us -> {r['card_latency_us']:>9.1f}us"
+            f" ({change:+.1%}){flag}"
+        )
+    return regressions
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark the mail parsers on synthetic emails.")
+    p.add_argument("--cards", nargs="+", type=int, default=list(DEFAULT_CARD_COUNTS))
+    p.add_argument("--templates", nargs="+", default=list(CARD_TEMPLATES))
+    p.add_argument("--engines", nargs="+", choices=list(HTML_ENGINES), default=list(HTML_ENGINES))
+    p.add_argument("--card-budget", type=int, default=4000, help="cards parsed per case")
+    p.add_argument("--commit-every", type=int, default=1, help="run_mail_parse group commit")
+    p.add_argument("--output", default=".bench/bench_parser.json")
+    p.add_argument("--compare", help="previous JSON output to compare with")
+    p.add_argument("--max-slowdown", type=float, default=0.2, help="0.2 = 20%% slower")
+    args = p.parse_args()
+
+    # read the baseline before anything is written: --output may be the same file
+    baseline = None
+    if args.compare:
+        if pathlib.Path(args.compare).resolve() == pathlib.Path(args.output).resolve():
+            p.error("--compare and --output must be different files")
+        baseline = json.loads(pathlib.Path(args.compare).read_text(encoding="utf-8"))
+
+
+    results = []
+    for n_cards in args.cards:
+        emails = max(3, args.card_budget // n_cards)
+        for template in args.templates:
+            for engine in args.engines:
+                results.append(bench_parse_seek_email(n_cards, template, engine, emails))
+                print(f"{results[-1]['case']:<60} {results[-1]['card_latency_us']:>9.1f}us/card")
+            results.append(bench_run_mail_parse(n_cards, template, emails, args.commit_every))
+            print(f"{results[-1]['case']:<60} {results[-1]['card_latency_us']:>9.1f}us/card")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(UTC).replace(microsecond=0).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parser_version": PARSER_CONFIGS[SEEK_SENDER]["parser_version"],
+        },
+        "results": results,
+    }
+    output = pathlib.Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline["results"], args.max_slowdown)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
+from functools import lru_cache
 
 STATE_SET = {"NSW", "VIC", "QLD", "SA", "WA", "TAS", "ACT", "NT"}
 
@@ -16,6 +18,9 @@ RATE_MONTH_RE = re.compile(r"(per\s+month|p\.?\s*m\.?|pm|monthly)\b", re.I)
 RATE_DAY_RE = re.compile(r"(per\s+day|p\.?\s*d\.?|pd|daily)\b", re.I)
 RATE_HOUR_RE = re.compile(r"(per\s+hour|p\.?\s*h\.?|ph|hourly)\b", re.I)
 
+# Distinct normalized strings kept per parser below (alert locations/salaries repeat a lot)
+NORMALIZER_CACHE_SIZE = 4096
+
 
 def normalize_space(s: str | None) -> str:
     return " ".join((s or "").split())
@@ -25,12 +30,22 @@ def parse_location_raw(location_raw: str | None) -> dict:
     """Parse a location string into structured fields.
 
     Returns a dict with keys: suburb, city, state, location_raw (all may be None).
+    Results are memoized per normalized string; the caller gets its own dict.
     """
-    result = {"suburb": None, "city": None, "state": None, "location_raw": None}
-    if not location_raw:
-        return result
+    return dict(_parse_location(normalize_space(location_raw)))
+
 
-    s = normalize_space(location_raw)
+def parse_location_many(values: Iterable[str | None]) -> list[dict]:
+    """parse_location_raw over a list, each distinct string parsed once."""
+    values = list(values)
+    parsed = {v: _parse_location(normalize_space(v)) for v in set(values)}
+    return [dict(parsed[v]) for v in values]
+
+
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def _parse_location(s: str) -> dict:
+    # s is normalized; the returned dict is shared, never hand it out
+    result = {"suburb": None, "city": None, "state": None, "location_raw": None}
     if not s:
         return result
 
@@ -93,12 +108,22 @@ def parse_salary_raw(salary_raw: str | None) -> dict:
     """Extract salary range and period from a raw salary string.
 
     Returns a dict with keys: salary_min, salary_max, salary_period, salary_raw.
+    Results are memoized per normalized string; the caller gets its own dict.
     """
-    result = {"salary_min": None, "salary_max": None, "salary_period": None, "salary_raw": None}
-    if not salary_raw:
-        return result
+    return dict(_parse_salary(normalize_space(salary_raw)))
+
 
-    raw = normalize_space(salary_raw)
+def parse_salary_many(values: Iterable[str | None]) -> list[dict]:
+    """parse_salary_raw over a list, each distinct string parsed once."""
+    values = list(values)
+    parsed = {v: _parse_salary(normalize_space(v)) for v in set(values)}
+    return [dict(parsed[v]) for v in values]
+
+
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def _parse_salary(raw: str) -> dict:
+    # raw is normalized; the returned dict is shared, never hand it out
+    result = {"salary_min": None, "salary_max": None, "salary_period": None, "salary_raw": None}
     if not raw:
         return result
 
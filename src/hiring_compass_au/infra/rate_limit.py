@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class _TokenBucket:
+    """Token bucket counted in units (quota units, requests); arithmetic shared by both budgets."""
+
+    def __init__(self, units_per_s: float, burst: float | None, clock):
+        if units_per_s <= 0:
+            raise ValueError(f"units_per_s must be > 0, got {units_per_s}")
+
+        self.units_per_s = float(units_per_s)
+        self.capacity = float(burst if burst is not None else units_per_s)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _check(self, units: float) -> None:
+        if units > self.capacity:
+            raise ValueError(f"Cannot acquire {units} units (capacity={self.capacity})")
+
+    def _try_take(self, units: float) -> float:
+        """Take units and return 0.0, or return the delay before they are available."""
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.units_per_s)
+        self._updated = now
+
+        if self._tokens >= units:
+            self._tokens -= units
+            return 0.0
+        return (units - self._tokens) / self.units_per_s
+
+
+class QuotaBudget(_TokenBucket):
+    """
+    Thread-safe token bucket.
+    acquire() blocks until enough units are available and returns the time waited.
+    """
+
+    def __init__(
+        self,
+        units_per_s: float,
+        burst: float | None = None,
+        *,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        super().__init__(units_per_s, burst, clock)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float) -> float:
+        self._check(units)
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self._try_take(units)
+            if not delay:
+                return waited
+
+            self._sleep(delay)
+            waited += delay
+
+
+class AsyncQuotaBudget(_TokenBucket):
+    """
+    Same token bucket as QuotaBudget for coroutines sharing one event loop.
+    acquire() awaits until enough units are available and returns the time waited.
+    """
+
+    def __init__(
+        self,
+        units_per_s: float,
+        burst: float | None = None,
+        *,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        super().__init__(units_per_s, burst, clock)
+        self._sleep = sleep
+
+    async def acquire(self, units: float) -> float:
+        self._check(units)
+
+        waited = 0.0
+        while True:
+            # no await inside _try_take: refill and take are atomic within the event loop
+            delay = self._try_take(units)
+            if not delay:
+                return waited
+
+            await self._sleep(delay)
+            waited += delay
@@ -2,9 +2,52 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import UTC, datetime, timedelta
 
-from hiring_compass_au.infra.storage.db import compute_backoff_minutes, utc_now_iso
+from hiring_compass_au.infra.storage.db import utc_now_iso
+
+# Parsed content of a hit, in the column order of hit_content()
+HIT_CONTENT_COLUMNS = (
+    "source",
+    "fingerprint",
+    "title",
+    "company",
+    "suburb",
+    "city",
+    "state",
+    "location_raw",
+    "salary_min",
+    "salary_max",
+    "salary_period",
+    "salary_raw",
+    "debug_lines",
+    "hit_confidence",
+    "template",
+)
+
+
+def hit_content(hit: dict, parser_cfg: dict) -> tuple:
+    """Values stored in HIT_CONTENT_COLUMNS for a parsed hit."""
+    debug_lines = hit.get("debug_lines")
+    debug_lines_json = json.dumps(debug_lines) if isinstance(debug_lines, list) else None
+
+    return (
+        parser_cfg["source"],
+        hit.get("fingerprint"),
+        hit.get("title"),
+        hit.get("company"),
+        hit.get("suburb"),
+        hit.get("city"),
+        hit.get("state"),
+        hit.get("location_raw"),
+        hit.get("salary_min"),
+        hit.get("salary_max"),
+        hit.get("salary_period"),
+        hit.get("salary_raw"),
+        debug_lines_json,
+        int(hit.get("hit_confidence") or 0),
+        hit.get("template"),
+    )
+
 
 # ----------------------------
 # Fill database
@@ -41,10 +84,11 @@ def upsert_email_job_hits(
         salary_raw,
         debug_lines,
         hit_confidence,
+        template,
         parser_name,
         parser_version
     )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ON CONFLICT(message_id, out_url) DO UPDATE SET
         source = excluded.source,
         fingerprint = excluded.fingerprint,
@@ -60,31 +104,19 @@ def upsert_email_job_hits(
         salary_raw = excluded.salary_raw,
         debug_lines = excluded.debug_lines,
         hit_confidence = excluded.hit_confidence,
+        template = excluded.template,
         parser_name = excluded.parser_name,
         parser_version = excluded.parser_version
     """
     rows = []
     for hit in valid_hits:
-        debug_lines = hit.get("debug_lines")
-        debug_lines_json = json.dumps(debug_lines) if isinstance(debug_lines, list) else None
-
+        source, fingerprint, *content = hit_content(hit, parser_cfg)
         row = (
             message_id,
-            parser_cfg["source"],
-            hit.get("fingerprint"),
+            source,
+            fingerprint,
             hit.get("out_url"),
-            hit.get("title"),
-            hit.get("company"),
-            hit.get("suburb"),
-            hit.get("city"),
-            hit.get("state"),
-            hit.get("location_raw"),
-            hit.get("salary_min"),
-            hit.get("salary_max"),
-            hit.get("salary_period"),
-            hit.get("salary_raw"),
-            debug_lines_json,
-            int(hit.get("hit_confidence") or 0),
+            *content,
             parser_cfg["parser_name"],
             parser_cfg["parser_version"],
         )
@@ -101,6 +133,63 @@ def upsert_email_job_hits(
 # ----------------------------
 
 
+# Canonicalization outcome of one hit; attempt_count/next_retry_at/last_attempt_at are
+# computed in SQL from the stored attempt_count (backoff = compute_backoff_minutes()).
+_UPDATE_CANONICALIZATION_SQL = """
+UPDATE email_job_hits
+SET
+    external_job_id = :external_job_id,
+    canonical_url = :canonical_url,
+    canonical_status = :outcome,
+    http_status = :http_status,
+    attempt_count = attempt_count + 1,
+    next_retry_at = CASE
+        WHEN :outcome = 'retry' THEN strftime(
+            '%Y-%m-%dT%H:%M:%S+00:00',
+            :now,
+            '+' || MIN(1 << MIN(attempt_count + 1, 11), 1440) || ' minutes'
+        )
+        ELSE NULL
+    END,
+    last_attempt_at = :now,
+    canon_error = :canon_error,
+    promote_status = CASE WHEN :outcome = 'error' THEN 'rejected' ELSE 'pending' END
+WHERE hit_id = :hit_id
+"""
+
+
+def _canonicalization_params(hit_id: int, now: str, resolution: dict) -> dict:
+    outcome = resolution["outcome"]
+    if outcome not in {"ok", "retry", "error"}:
+        raise ValueError(f"Invalid outcome: {outcome}")
+    return {
+        "hit_id": hit_id,
+        "now": now,
+        "outcome": outcome,
+        "http_status": resolution.get("http_status"),
+        "canonical_url": resolution.get("canonical_url"),
+        "external_job_id": resolution.get("external_job_id"),
+        "canon_error": None if outcome == "ok" else resolution.get("canon_error"),
+    }
+
+
+def update_job_hits_canonicalization(
+    conn: sqlite3.Connection, outcomes: list[tuple[int, dict]]
+) -> int:
+    """
+    Apply a batch of canonicalization outcomes [(hit_id, resolution), ...] in one
+    executemany; resolution holds the keyword arguments of update_job_hit_canonicalization.
+    Return number of updated rows.
+    - No commit here
+    """
+    if not outcomes:
+        return 0
+    now = utc_now_iso()
+    params = [_canonicalization_params(hit_id, now, resolution) for hit_id, resolution in outcomes]
+    cur = conn.executemany(_UPDATE_CANONICALIZATION_SQL, params)
+    return int(cur.rowcount or 0)
+
+
 def update_job_hit_canonicalization(
     conn,
     hit_id: int,
@@ -110,67 +199,18 @@ def update_job_hit_canonicalization(
     external_job_id: str | None = None,
     canon_error: str | None = None,
 ) -> None:
-    if outcome not in {"ok", "retry", "error"}:
-        raise ValueError(f"Invalid outcome: {outcome}")
-
-    now = utc_now_iso()
-
-    # Fetch current attempt_count so backoff uses the incremented value
-    row = conn.execute(
-        "SELECT attempt_count FROM email_job_hits WHERE hit_id = ?",
-        (hit_id,),
-    ).fetchone()
-    if row is None:
-        raise ValueError(f"email_job_hits hit_id not found: {hit_id}")
-
-    attempt_count_before = int(row["attempt_count"])
-    attempt_count_after = attempt_count_before + 1
-
-    next_retry_at = None
-
-    if outcome == "ok":
-        canon_error = None
-        next_retry_at = None
-        promote_status = "pending"
-
-    elif outcome == "retry":
-        delay_min = compute_backoff_minutes(attempt_count_after)
-        dt = datetime.now(UTC) + timedelta(minutes=delay_min)
-        next_retry_at = dt.replace(microsecond=0).isoformat()
-        promote_status = "pending"
-
-    else:
-        next_retry_at = None
-        promote_status = "rejected"
-
-    conn.execute(
-        """
-        UPDATE email_job_hits
-        SET
-            external_job_id = ?,
-            canonical_url = ?,
-            canonical_status = ?,
-            http_status = ?,
-            attempt_count = ?,
-            next_retry_at = ?,
-            last_attempt_at = ?,
-            canon_error = ?,
-            promote_status = ?
-        WHERE hit_id = ?
-        """,
-        (
-            external_job_id,
-            canonical_url,
-            outcome,
-            http_status,
-            attempt_count_after,
-            next_retry_at,
-            now,
-            canon_error,
-            promote_status,
-            hit_id,
-        ),
+    resolution = {
+        "outcome": outcome,
+        "http_status": http_status,
+        "canonical_url": canonical_url,
+        "external_job_id": external_job_id,
+        "canon_error": canon_error,
+    }
+    cur = conn.execute(
+        _UPDATE_CANONICALIZATION_SQL, _canonicalization_params(hit_id, utc_now_iso(), resolution)
     )
+    if cur.rowcount == 0:
+        raise ValueError(f"email_job_hits hit_id not found: {hit_id}")
 
 
 def update_promoted_job_hits(
@@ -238,7 +278,7 @@ def get_batch_url_to_canonicalize(
 
     return conn.execute(
         """
-        SELECT hit_id, out_url
+        SELECT hit_id, out_url, fingerprint
         FROM email_job_hits
         WHERE
             canonical_status IN ('pending','retry')
@@ -258,6 +298,16 @@ def get_batch_url_to_canonicalize(
     ).fetchall()
 
 
+def get_email_job_hit_contents(conn: sqlite3.Connection, message_id: str) -> dict[str, tuple]:
+    """Stored HIT_CONTENT_COLUMNS of an email's hits, by out_url."""
+    rows = conn.execute(
+        f"SELECT out_url, {', '.join(HIT_CONTENT_COLUMNS)} FROM email_job_hits "
+        "WHERE message_id = ?",
+        (message_id,),
+    ).fetchall()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
 def get_promote_pending_job_hits(conn: sqlite3.Connection, limit: int = 200):
     return conn.execute(
         """
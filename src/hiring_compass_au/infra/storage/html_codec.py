@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+import struct
+import zlib
+from collections import Counter
+from collections.abc import Iterable
+
+# Compressed html_raw values are BLOBs: MAGIC + dict_id (uint32 BE) + zlib stream.
+# dict_id 0 means no preset dictionary. Plain TEXT values are still read as-is.
+HTML_CODEC_MAGIC = b"HCZ1"
+_HEADER = struct.Struct(">4sI")
+
+ZLIB_LEVEL = 9
+# zlib only looks back 32KB, a bigger preset dictionary is useless
+ZDICT_MAX_SIZE = 32 * 1024
+# Dictionaries are trained on the most recent bodies, once enough of them are stored
+ZDICT_TRAIN_SAMPLE_SIZE = 200
+ZDICT_TRAIN_MIN_SAMPLES = 20
+
+_TAG_RE = re.compile(r"<[^<>]{1,2000}>")
+
+
+def train_zdict(samples: Iterable[str], max_size: int = ZDICT_MAX_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample HTML bodies.
+
+    Keeps the tags (with their inline styles) found in at least two samples and packs the
+    most shared ones at the end of the dictionary, where zlib matches are the cheapest.
+    """
+    doc_freq: Counter[str] = Counter()
+    for html in samples:
+        if html:
+            doc_freq.update(set(_TAG_RE.findall(html)))
+
+    shared = [tag for tag, n in doc_freq.items() if n >= 2]
+    shared.sort(key=lambda tag: (doc_freq[tag], len(tag)), reverse=True)
+
+    parts: list[bytes] = []
+    size = 0
+    for tag in shared:
+        b = tag.encode("utf-8")
+        if size + len(b) > max_size:
+            continue
+        parts.append(b)
+        size += len(b)
+
+    # most shared last
+    return b"".join(reversed(parts))
+
+
+def compress_html(html: str | None, zdict: bytes | None = None, dict_id: int = 0) -> bytes | None:
+    if html is None:
+        return None
+
+    if zdict:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL)
+        dict_id = 0
+    data = compressor.compress(html.encode("utf-8")) + compressor.flush()
+    return _HEADER.pack(HTML_CODEC_MAGIC, dict_id) + data
+
+
+def is_compressed_html(value) -> bool:
+    return isinstance(value, bytes) and value[: len(HTML_CODEC_MAGIC)] == HTML_CODEC_MAGIC
+
+
+def decompress_html(value, zdicts: dict[int, bytes] | None = None) -> str | None:
+    """Return html_raw as text whether it is stored compressed or not."""
+    if value is None or isinstance(value, str):
+        return value
+    if not is_compressed_html(value):
+        return bytes(value).decode("utf-8", errors="replace")
+
+    _, dict_id = _HEADER.unpack_from(value)
+    if dict_id:
+        zdict = (zdicts or {}).get(dict_id)
+        if zdict is None:
+            raise ValueError(f"Unknown html_raw dictionary id: {dict_id}")
+        decompressor = zlib.decompressobj(zdict=zdict)
+    else:
+        decompressor = zlib.decompressobj()
+
+    data = decompressor.decompress(value[_HEADER.size :]) + decompressor.flush()
+    return data.decode("utf-8")
@@ -3,16 +3,31 @@ from __future__ import annotations
 import sqlite3
 from datetime import UTC, datetime
 
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore
 from hiring_compass_au.infra.storage.db import utc_now_iso
+from hiring_compass_au.infra.storage.html_codec import (
+    HTML_CODEC_MAGIC,
+    ZDICT_TRAIN_MIN_SAMPLES,
+    ZDICT_TRAIN_SAMPLE_SIZE,
+    compress_html,
+    decompress_html,
+    train_zdict,
+)
+
+# Emails read per query by the parse stage
+PARSE_PAGE_SIZE = 100
 
 # ----------------------------
 # Fill database
 # ----------------------------
 
 
-def upsert_indexed_emails(conn: sqlite3.Connection, messages: list[dict]) -> int:
+def upsert_indexed_emails(
+    conn: sqlite3.Connection, messages: list[dict], from_email: str | None = None
+) -> int:
     """
     Insert new message_ids into emails with status='indexed' and indexed_at=now.
+    from_email is the sender of a from:(sender) listing, None when unknown until fetched.
     Do not overwrite existing rows.
     Return number of newly inserted rows.
     """
@@ -27,7 +42,7 @@ def upsert_indexed_emails(conn: sqlite3.Connection, messages: list[dict]) -> int
         thread_id = m.get("threadId")
         if not msg_id:
             continue
-        rows.append((msg_id, thread_id, now, "indexed"))
+        rows.append((msg_id, thread_id, from_email, now, "indexed"))
 
     if not rows:
         return 0
@@ -37,8 +52,8 @@ def upsert_indexed_emails(conn: sqlite3.Connection, messages: list[dict]) -> int
 
     cur.executemany(
         """
-        INSERT OR IGNORE INTO emails (message_id, thread_id, indexed_at, status)
-        VALUES (?, ?, ?, ?)
+        INSERT OR IGNORE INTO emails (message_id, thread_id, from_email, indexed_at, status)
+        VALUES (?, ?, ?, ?, ?)
         """,
         rows,
     )
@@ -53,13 +68,83 @@ def upsert_indexed_emails(conn: sqlite3.Connection, messages: list[dict]) -> int
 # ----------------------------
 
 
-def update_fetched_email_metadata(conn: sqlite3.Connection, fetched_mail_batch: list[dict]) -> int:
+def insert_html_zdict(conn: sqlite3.Connection, zdict: bytes, sample_count: int) -> int:
+    """
+    Register a new html_raw compression dictionary (becomes the active one).
+    - No commit here.
+    """
+    cur = conn.execute(
+        "INSERT INTO html_zdicts (zdict, sample_count, created_at) VALUES (?, ?, ?)",
+        (zdict, int(sample_count), utc_now_iso()),
+    )
+    return int(cur.lastrowid)
+
+
+def train_html_zdict(
+    conn: sqlite3.Connection,
+    min_samples: int = ZDICT_TRAIN_MIN_SAMPLES,
+    sample_size: int = ZDICT_TRAIN_SAMPLE_SIZE,
+) -> int:
+    """
+    Train the shared html_raw dictionary once min_samples bodies are stored without one
+    (new databases start with dict_id 0). Bodies already stored stay readable as they are;
+    the next fetched ones use the new dictionary.
+    Return the new dict_id, 0 when nothing was trained.
+    """
+    if get_active_html_zdict(conn)[0]:
+        return 0
+
+    no_dict_prefix = HTML_CODEC_MAGIC + bytes(4)
+    rows = conn.execute(
+        """
+        SELECT html_raw FROM emails
+        WHERE typeof(html_raw) = 'text'
+           OR (typeof(html_raw) = 'blob' AND substr(html_raw, 1, ?) = ?)
+        ORDER BY internal_date_ms DESC
+        LIMIT ?
+        """,
+        (len(no_dict_prefix), no_dict_prefix, sample_size),
+    ).fetchall()
+    if len(rows) < min_samples:
+        return 0
+
+    samples = [decompress_html(r[0]) for r in rows]
+    zdict = train_zdict(samples)
+    if not zdict:
+        return 0
+
+    dict_id = insert_html_zdict(conn, zdict, len(samples))
+    conn.commit()
+    return dict_id
+
+
+def _received_at(internal_date_ms: int | None) -> str | None:
+    if internal_date_ms is None:
+        return None
+    return datetime.fromtimestamp(
+        internal_date_ms / 1000,
+        tz=UTC,
+    ).isoformat(timespec="seconds")
+
+
+def update_fetched_email_metadata(
+    conn: sqlite3.Connection,
+    fetched_mail_batch: list[dict],
+    *,
+    compress: bool = True,
+    blob_store: HtmlBlobStore | None = None,
+) -> int:
+    """
+    Store fetched metadata and body. With a blob_store, the body is written there and
+    only its sha256 is kept in emails.html_sha256 (html_raw stays NULL).
+    """
     # TODO ajouter template
 
     if not fetched_mail_batch:
         return 0
 
     now = utc_now_iso()
+    dict_id, zdict = get_active_html_zdict(conn) if compress else (0, None)
 
     rows = []
     for m in fetched_mail_batch:
@@ -70,14 +155,15 @@ def update_fetched_email_metadata(conn: sqlite3.Connection, fetched_mail_batch:
         from_email = m.get("from_email")
         subject = m.get("subject")
         internal_date_ms = m.get("internal_date_ms")
-        if internal_date_ms is None:
-            received_at = None
-        else:
-            received_at = datetime.fromtimestamp(
-                internal_date_ms / 1000,
-                tz=UTC,
-            ).isoformat(timespec="seconds")
+        received_at = _received_at(internal_date_ms)
         html_raw = m.get("html_raw")
+        html_digest = None
+        if blob_store is not None:
+            if html_raw is not None:
+                html_digest = blob_store.put(html_raw)
+            html_raw = None
+        elif compress:
+            html_raw = compress_html(html_raw, zdict, dict_id)
         error = m.get("error")
 
         status = "fetch_error" if error else "fetched"
@@ -89,6 +175,7 @@ def update_fetched_email_metadata(conn: sqlite3.Connection, fetched_mail_batch:
                 internal_date_ms,
                 received_at,
                 html_raw,
+                html_digest,
                 error,
                 status,
                 now,
@@ -111,6 +198,7 @@ def update_fetched_email_metadata(conn: sqlite3.Connection, fetched_mail_batch:
             internal_date_ms = ?,
             received_at      = ?,
             html_raw         = ?,
+            html_sha256      = ?,
             error            = ?,
             status           = ?,
             fetched_at       = ?
@@ -125,6 +213,94 @@ def update_fetched_email_metadata(conn: sqlite3.Connection, fetched_mail_batch:
     return after - before
 
 
+def mark_unsupported_emails(conn: sqlite3.Connection, metadata_rows: list[dict]) -> int:
+    """
+    Store headers of indexed emails no parser handles and mark them parsed_unsupported,
+    without any body (metadata-first fetch).
+    """
+    if not metadata_rows:
+        return 0
+
+    now = utc_now_iso()
+    rows = [
+        (
+            m.get("from_email"),
+            m.get("subject"),
+            m.get("internal_date_ms"),
+            _received_at(m.get("internal_date_ms")),
+            now,
+            now,
+            m["message_id"],
+        )
+        for m in metadata_rows
+    ]
+
+    before = conn.total_changes
+    conn.executemany(
+        """
+        UPDATE emails
+        SET
+            from_email       = ?,
+            subject          = ?,
+            internal_date_ms = ?,
+            received_at      = ?,
+            status           = 'parsed_unsupported',
+            fetched_at       = ?,
+            parsed_at        = ?
+        WHERE message_id = ?
+          AND status = 'indexed'
+        """,
+        rows,
+    )
+    conn.commit()
+    return conn.total_changes - before
+
+
+def set_history_id(conn: sqlite3.Connection, history_id: str, account: str = "me") -> None:
+    """Persist the Gmail historyId the next incremental index starts from."""
+    conn.execute(
+        """
+        INSERT INTO mail_sync_state (account, history_id, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(account) DO UPDATE SET
+            history_id = excluded.history_id,
+            updated_at = excluded.updated_at
+        """,
+        (account, str(history_id), utc_now_iso()),
+    )
+    conn.commit()
+
+
+def save_index_checkpoint(
+    conn: sqlite3.Connection,
+    from_email: str,
+    query: str,
+    page_token: str,
+    pages_done: int,
+) -> None:
+    """
+    Remember the next page to list for from_email.
+    - No commit here: committed together with the page it follows.
+    """
+    conn.execute(
+        """
+        INSERT INTO mail_index_checkpoints (from_email, query, page_token, pages_done, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(from_email) DO UPDATE SET
+            query = excluded.query,
+            page_token = excluded.page_token,
+            pages_done = excluded.pages_done,
+            updated_at = excluded.updated_at
+        """,
+        (from_email, query, page_token, int(pages_done), utc_now_iso()),
+    )
+
+
+def clear_index_checkpoint(conn: sqlite3.Connection, from_email: str) -> None:
+    conn.execute("DELETE FROM mail_index_checkpoints WHERE from_email = ?", (from_email,))
+    conn.commit()
+
+
 def update_parsed_email(
     conn: sqlite3.Connection,
     message_id: str,
@@ -133,6 +309,7 @@ def update_parsed_email(
     parsed_confidence: int = 0,
     supported: bool = True,
     error: str = None,
+    template: str | None = None,
 ) -> int:
     """
     Update email row after parsing.
@@ -140,6 +317,7 @@ def update_parsed_email(
     - supported=False  => status='parsed_unsupported' (no parser registered)
     - supported=True and parsed_count==0 => status='parsed_empty'
     - supported=True and parsed_count>0  => status='parsed'
+    - template: fingerprint of the email layout, when the parser gives one
     """
     now = utc_now_iso()
 
@@ -168,6 +346,7 @@ def update_parsed_email(
             parser_version = ?,
             hit_extract_count = ?,
             parsed_confidence = ?,
+            template = ?,
             error = ?
         WHERE message_id = ?
         """,
@@ -178,6 +357,7 @@ def update_parsed_email(
             parser_version,
             int(hit_parsed_count),
             parsed_confidence,
+            template,
             error,
             message_id,
         ),
@@ -191,6 +371,20 @@ def update_parsed_email(
 # ----------------------------
 
 
+def get_html_zdicts(conn: sqlite3.Connection) -> dict[int, bytes]:
+    rows = conn.execute("SELECT dict_id, zdict FROM html_zdicts").fetchall()
+    return {int(r[0]): bytes(r[1]) for r in rows}
+
+
+def get_active_html_zdict(conn: sqlite3.Connection) -> tuple[int, bytes | None]:
+    row = conn.execute(
+        "SELECT dict_id, zdict FROM html_zdicts ORDER BY dict_id DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return 0, None
+    return int(row[0]), bytes(row[1])
+
+
 def get_last_internal_date_ms(conn: sqlite3.Connection, from_email: str) -> int | None:
     cur = conn.cursor()
 
@@ -217,6 +411,28 @@ def get_last_internal_date_ms(conn: sqlite3.Connection, from_email: str) -> int
     return value
 
 
+def get_history_id(conn: sqlite3.Connection, account: str = "me") -> str | None:
+    row = conn.execute(
+        "SELECT history_id FROM mail_sync_state WHERE account = ?",
+        (account,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_index_checkpoint(conn: sqlite3.Connection, from_email: str) -> dict | None:
+    row = conn.execute(
+        """
+        SELECT query, page_token, pages_done
+        FROM mail_index_checkpoints
+        WHERE from_email = ?
+        """,
+        (from_email,),
+    ).fetchone()
+    if row is None:
+        return None
+    return {"query": row[0], "page_token": row[1], "pages_done": row[2]}
+
+
 def get_non_fetched_email_list(conn: sqlite3.Connection) -> list:
     cur = conn.cursor()
     cur.execute(
@@ -231,14 +447,140 @@ def get_non_fetched_email_list(conn: sqlite3.Connection) -> list:
     return ids
 
 
-def get_fetched_emails_to_parse(conn: sqlite3.Connection):
-    cur = conn.cursor()
-    cur.execute(
+def get_non_fetched_email_senders(conn: sqlite3.Connection) -> list[tuple[str, str | None]]:
+    """(message_id, sender known from the index or None) of every non-fetched email."""
+    rows = conn.execute(
         """
-        SELECT message_id, from_email, internal_date_ms, html_raw
-        FROM emails
-        WHERE status = 'fetched' AND html_raw IS NOT NULL
-        ORDER BY internal_date_ms
+        SELECT message_id, from_email FROM emails
+        WHERE fetched_at IS NULL
+        ORDER BY indexed_at
         """
-    )
-    yield from cur
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def filter_non_fetched_ids(conn: sqlite3.Connection, message_ids: list[str]) -> list[str]:
+    """Keep the ids of message_ids that are indexed but not fetched yet (input order)."""
+    if not message_ids:
+        return []
+
+    placeholders = ",".join("?" * len(message_ids))
+    rows = conn.execute(
+        f"""
+        SELECT message_id FROM emails
+        WHERE fetched_at IS NULL AND message_id IN ({placeholders})
+        """,
+        message_ids,
+    ).fetchall()
+    pending = {row[0] for row in rows}
+    return [m for m in message_ids if m in pending]
+
+
+def get_emails_to_reparse(
+    conn: sqlite3.Connection,
+    from_email: str,
+    parser_name: str,
+    parser_version: str,
+    after_message_id: str = "",
+    limit: int = 500,
+) -> list[dict]:
+    """
+    One keyset page (message_id > after_message_id) of already parsed emails of a sender
+    whose parser_name/parser_version differ from the given ones, html_raw decompressed.
+    """
+    zdicts = get_html_zdicts(conn)
+    rows = conn.execute(
+        """
+        SELECT message_id, from_email, internal_date_ms, html_raw, html_sha256
+        FROM emails
+        WHERE from_email = ?
+          AND status IN ('parsed', 'parsed_empty', 'parsed_error', 'parsed_unsupported')
+          AND (html_raw IS NOT NULL OR html_sha256 IS NOT NULL)
+          AND (parser_name IS NOT ? OR parser_version IS NOT ?)
+          AND message_id > ?
+        ORDER BY message_id
+        LIMIT ?
+        """,
+        (from_email, parser_name, parser_version, after_message_id, limit),
+    ).fetchall()
+    return [
+        {
+            "message_id": message_id,
+            "from_email": from_email,
+            "internal_date_ms": internal_date_ms,
+            "html_raw": decompress_html(html_raw, zdicts),
+            "html_sha256": html_digest,
+        }
+        for message_id, from_email, internal_date_ms, html_raw, html_digest in rows
+    ]
+
+
+def get_fetched_emails_page(
+    conn: sqlite3.Connection,
+    after: tuple[int | None, str] | None = None,
+    limit: int = PARSE_PAGE_SIZE,
+) -> list[dict]:
+    """
+    One page of fetched emails in (internal_date_ms, message_id) order, NULL dates first,
+    html_raw decompressed. `after` is the key of the last row of the previous page.
+    Bodies kept in the blob store come with html_raw=None and their html_sha256.
+    """
+    zdicts = get_html_zdicts(conn)
+    select = """
+        SELECT message_id, from_email, internal_date_ms, html_raw, html_sha256
+        FROM emails
+        WHERE status = 'fetched' AND (html_raw IS NOT NULL OR html_sha256 IS NOT NULL)
+    """
+    rows = []
+    if after is None or after[0] is None:
+        rows = conn.execute(
+            select
+            + """
+            AND internal_date_ms IS NULL AND message_id > ?
+            ORDER BY message_id
+            LIMIT ?
+            """,
+            ("" if after is None else after[1], limit),
+        ).fetchall()
+
+    if len(rows) < limit:
+        if after is None or after[0] is None:
+            keyset, params = "internal_date_ms IS NOT NULL", ()
+        else:
+            keyset, params = "(internal_date_ms, message_id) > (?, ?)", after
+        rows += conn.execute(
+            select
+            + f"""
+            AND {keyset}
+            ORDER BY internal_date_ms, message_id
+            LIMIT ?
+            """,
+            (*params, limit - len(rows)),
+        ).fetchall()
+
+    return [
+        {
+            "message_id": message_id,
+            "from_email": from_email,
+            "internal_date_ms": internal_date_ms,
+            "html_raw": decompress_html(html_raw, zdicts),
+            "html_sha256": html_digest,
+        }
+        for message_id, from_email, internal_date_ms, html_raw, html_digest in rows
+    ]
+
+
+def get_fetched_emails_to_parse(conn: sqlite3.Connection, page_size: int = PARSE_PAGE_SIZE):
+    """
+    Yield fetched emails as dicts (see get_fetched_emails_page), page by page.
+    Each page is read in full before it is yielded: no cursor stays open across the
+    caller's writes and commits, and at most page_size bodies are held in memory.
+    """
+    after = None
+    while True:
+        page = get_fetched_emails_page(conn, after, page_size)
+        if not page:
+            return
+        yield from page
+        last = page[-1]
+        after = (last["internal_date_ms"], last["message_id"])
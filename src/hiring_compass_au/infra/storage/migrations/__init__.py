@@ -6,6 +6,17 @@ from .migration_0001_job_ads_columns import apply as apply_0001_job_ads_columns
 from .migration_0002_job_ad_enrichment_in_progress import (
     apply as apply_0002_job_ad_enrichment_in_progress,
 )
+from .migration_0003_compress_html_raw import apply as apply_0003_compress_html_raw
+from .migration_0004_emails_html_sha256 import apply as apply_0004_emails_html_sha256
+from .migration_0005_email_job_hits_queue_indexes import (
+    apply as apply_0005_email_job_hits_queue_indexes,
+)
+from .migration_0006_email_job_hits_fingerprint_index import (
+    apply as apply_0006_email_job_hits_fingerprint_index,
+)
+from .migration_0007_emails_fetched_queue_index import (
+    apply as apply_0007_emails_fetched_queue_index,
+)
 
 _MIGRATIONS = (
     ("0001_job_ads_columns", apply_0001_job_ads_columns),
@@ -13,15 +24,38 @@ _MIGRATIONS = (
         "0002_job_ad_enrichment_in_progress",
         apply_0002_job_ad_enrichment_in_progress,
     ),
+    ("0003_compress_html_raw", apply_0003_compress_html_raw),
+    ("0004_emails_html_sha256", apply_0004_emails_html_sha256),
+    (
+        "0005_email_job_hits_queue_indexes",
+        apply_0005_email_job_hits_queue_indexes,
+    ),
+    (
+        "0006_email_job_hits_fingerprint_index",
+        apply_0006_email_job_hits_fingerprint_index,
+    ),
+    (
+        "0007_emails_fetched_queue_index",
+        apply_0007_emails_fetched_queue_index,
+    ),
 )
 
 
+# Migrations that rewrite most of a table leave its old pages on the freelist: the file
+# only shrinks once VACUUM runs (outside a transaction, so after the commit)
+_VACUUM_AFTER = {"0003_compress_html_raw"}
+
+
 def apply_migrations(conn: sqlite3.Connection) -> bool:
     applied_any = False
-    for _name, apply_fn in _MIGRATIONS:
+    vacuum = False
+    for name, apply_fn in _MIGRATIONS:
         applied = apply_fn(conn)
         if applied:
             applied_any = True
+            vacuum = vacuum or name in _VACUUM_AFTER
     if applied_any:
         conn.commit()
+    if vacuum:
+        conn.execute("VACUUM")
     return applied_any
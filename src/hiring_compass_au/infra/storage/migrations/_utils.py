@@ -28,3 +28,13 @@ def table_sql(conn: sqlite3.Connection, table: str) -> str | None:
     if not row:
         return None
     return row[0]
+
+
+def index_sql(conn: sqlite3.Connection, index: str) -> str | None:
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND name=?",
+        (index,),
+    ).fetchone()
+    if not row:
+        return None
+    return row[0]
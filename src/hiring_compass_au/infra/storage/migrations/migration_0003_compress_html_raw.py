@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ..html_codec import (
+    ZDICT_TRAIN_MIN_SAMPLES,
+    ZDICT_TRAIN_SAMPLE_SIZE,
+    compress_html,
+    train_zdict,
+)
+from ..mail_store import insert_html_zdict
+from ._utils import table_exists
+
+TRAIN_SAMPLE_SIZE = ZDICT_TRAIN_SAMPLE_SIZE
+TRAIN_MIN_SAMPLES = ZDICT_TRAIN_MIN_SAMPLES
+PAGE_SIZE = 500
+
+
+def apply(conn: sqlite3.Connection) -> bool:
+    if not table_exists(conn, "emails"):
+        return False
+
+    row = conn.execute(
+        "SELECT 1 FROM emails WHERE typeof(html_raw) = 'text' LIMIT 1",
+    ).fetchone()
+    if row is None:
+        return False
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS html_zdicts (
+            dict_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            zdict             BLOB NOT NULL,
+            sample_count      INTEGER NOT NULL DEFAULT 0,
+            created_at        TEXT NOT NULL
+        );
+        """
+    )
+
+    # Train the shared dictionary on the most recent bodies
+    samples = [
+        r[0]
+        for r in conn.execute(
+            """
+            SELECT html_raw FROM emails
+            WHERE typeof(html_raw) = 'text'
+            ORDER BY internal_date_ms DESC
+            LIMIT ?
+            """,
+            (TRAIN_SAMPLE_SIZE,),
+        )
+    ]
+    dict_id, zdict = 0, None
+    if len(samples) >= TRAIN_MIN_SAMPLES:
+        zdict = train_zdict(samples) or None
+        if zdict:
+            dict_id = insert_html_zdict(conn, zdict, len(samples))
+
+    # Compress in place, page by page (rowid keyset)
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT rowid, html_raw FROM emails
+            WHERE rowid > ? AND typeof(html_raw) = 'text'
+            ORDER BY rowid
+            LIMIT ?
+            """,
+            (last_rowid, PAGE_SIZE),
+        ).fetchall()
+        if not rows:
+            break
+
+        conn.executemany(
+            "UPDATE emails SET html_raw = ? WHERE rowid = ?",
+            [(compress_html(r[1], zdict, dict_id), r[0]) for r in rows],
+        )
+        last_rowid = rows[-1][0]
+
+    return True
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ._utils import column_exists, table_exists
+
+
+def apply(conn: sqlite3.Connection) -> bool:
+    if not table_exists(conn, "emails"):
+        return False
+
+    if column_exists(conn, "emails", "html_sha256"):
+        return False
+
+    conn.execute("ALTER TABLE emails ADD COLUMN html_sha256 TEXT")
+    return True
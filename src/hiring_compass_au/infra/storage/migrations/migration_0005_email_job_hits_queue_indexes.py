@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ._utils import index_sql, table_exists
+
+# Partial indexes over the queue-style scans of email_job_hits: each one holds only the
+# rows still waiting in its queue. Their WHERE clauses repeat the predicates of the queries
+# verbatim (TRIM(...) <> '' included) so the planner can prove the index applies:
+# - canonical queue: count_urls_to_canonicalize / get_batch_url_to_canonicalize
+# - promote queue: get_promote_pending_job_hits
+QUEUE_INDEXES = {
+    "idx_email_job_hits_canon_queue": """
+        CREATE INDEX idx_email_job_hits_canon_queue
+        ON email_job_hits(canonical_status, next_retry_at, attempt_count)
+        WHERE canonical_status IN ('pending','retry') AND TRIM(out_url) <> ''
+    """,
+    "idx_email_job_hits_promote_queue": """
+        CREATE INDEX idx_email_job_hits_promote_queue
+        ON email_job_hits(promote_status, canonical_status)
+        WHERE promote_status = 'pending' AND canonical_status = 'ok'
+    """,
+}
+
+
+def _normalized(sql: str | None) -> str:
+    return " ".join((sql or "").split())
+
+
+def apply(conn: sqlite3.Connection) -> bool:
+    if not table_exists(conn, "email_job_hits"):
+        return False
+
+    applied = False
+    for name, sql in QUEUE_INDEXES.items():
+        existing = index_sql(conn, name)
+        if _normalized(existing) == _normalized(sql):
+            continue
+        # Missing, or created with an older definition
+        if existing is not None:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute(sql)
+        applied = True
+
+    return applied
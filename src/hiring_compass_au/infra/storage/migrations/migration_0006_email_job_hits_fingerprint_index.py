@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ._utils import index_sql, table_exists
+
+# Lookup of an earlier canonicalization of the same job (get_canonical_by_fingerprint):
+# only hits that were canonicalized can answer it, so the others stay out of the index
+FINGERPRINT_INDEX = "idx_email_job_hits_fingerprint"
+FINGERPRINT_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_email_job_hits_fingerprint
+    ON email_job_hits(fingerprint)
+    WHERE canonical_url IS NOT NULL
+"""
+
+
+def apply(conn: sqlite3.Connection) -> bool:
+    if not table_exists(conn, "email_job_hits"):
+        return False
+    if index_sql(conn, FINGERPRINT_INDEX) is not None:
+        return False
+
+    conn.execute(FINGERPRINT_INDEX_SQL)
+    return True
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ._utils import index_sql, table_exists
+
+# Parse queue, read in (internal_date_ms, message_id) keyset pages
+# (get_fetched_emails_to_parse); same definition as init_email_table
+FETCHED_QUEUE_INDEX = "idx_emails_fetched_queue"
+FETCHED_QUEUE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_emails_fetched_queue
+    ON emails(internal_date_ms, message_id)
+    WHERE status = 'fetched'
+"""
+
+
+def apply(conn: sqlite3.Connection) -> bool:
+    if not table_exists(conn, "emails"):
+        return False
+    if index_sql(conn, FETCHED_QUEUE_INDEX) is not None:
+        return False
+
+    conn.execute(FETCHED_QUEUE_INDEX_SQL)
+    return True
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import UTC, datetime, timedelta
+
+from hiring_compass_au.infra.storage.db import utc_now_iso
+
+# Cached parse results, keyed by (html_sha256, parser_name, parser_version).
+# A new parser_version never reads entries of an older one.
+
+
+def get_cached_parse(
+    conn: sqlite3.Connection,
+    html_sha256: str,
+    parser_name: str,
+    parser_version: str,
+) -> dict | None:
+    """Return {"valid_hits", "parsed_confidence"} or None on a miss."""
+    row = conn.execute(
+        """
+        SELECT hits_json, parsed_confidence FROM parse_cache
+        WHERE html_sha256 = ? AND parser_name = ? AND parser_version = ?
+        """,
+        (html_sha256, parser_name, parser_version),
+    ).fetchone()
+    if row is None:
+        return None
+    return {"valid_hits": json.loads(row[0]), "parsed_confidence": row[1]}
+
+
+def put_cached_parse(
+    conn: sqlite3.Connection,
+    html_sha256: str,
+    parser_name: str,
+    parser_version: str,
+    valid_hits: list[dict],
+    parsed_confidence: int,
+) -> None:
+    """
+    Store the hits of a successful parse.
+    - No commit here
+    """
+    now = utc_now_iso()
+    conn.execute(
+        """
+        INSERT INTO parse_cache(
+            html_sha256, parser_name, parser_version, hits_json, parsed_confidence,
+            created_at, last_used_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(html_sha256, parser_name, parser_version) DO UPDATE SET
+            hits_json = excluded.hits_json,
+            parsed_confidence = excluded.parsed_confidence,
+            last_used_at = excluded.last_used_at
+        """,
+        (
+            html_sha256,
+            parser_name,
+            parser_version,
+            json.dumps(valid_hits, ensure_ascii=False),
+            parsed_confidence,
+            now,
+            now,
+        ),
+    )
+
+
+def touch_cached_parses(conn: sqlite3.Connection, keys: list[tuple[str, str, str]]) -> None:
+    """
+    Mark cache entries as used now (keys are (html_sha256, parser_name, parser_version)).
+    - No commit here
+    """
+    if not keys:
+        return
+    now = utc_now_iso()
+    conn.executemany(
+        """
+        UPDATE parse_cache SET last_used_at = ?
+        WHERE html_sha256 = ? AND parser_name = ? AND parser_version = ?
+        """,
+        [(now, *key) for key in keys],
+    )
+
+
+def evict_parse_cache(
+    conn: sqlite3.Connection,
+    max_age_days: int | None = None,
+    max_entries: int | None = None,
+) -> int:
+    """
+    Drop entries unused for max_age_days, then the least recently used ones above
+    max_entries. Return number of deleted rows.
+    - No commit here
+    """
+    deleted = 0
+    if max_age_days is not None:
+        cutoff = (datetime.now(UTC) - timedelta(days=max_age_days)).replace(microsecond=0)
+        cur = conn.execute(
+            "DELETE FROM parse_cache WHERE last_used_at < ?",
+            (cutoff.isoformat(),),
+        )
+        deleted += cur.rowcount
+
+    if max_entries is not None:
+        cur = conn.execute(
+            """
+            DELETE FROM parse_cache
+            WHERE rowid IN (
+                SELECT rowid FROM parse_cache
+                ORDER BY last_used_at DESC, rowid DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (max(0, max_entries),),
+        )
+        deleted += cur.rowcount
+
+    return deleted
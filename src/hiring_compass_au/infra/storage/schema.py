@@ -18,7 +18,8 @@ def init_email_table(conn: sqlite3.Connection) -> None:
             subject           TEXT,
             internal_date_ms  INTEGER,
             received_at       TEXT,
-            html_raw          TEXT,    
+            html_raw          TEXT,    -- zlib BLOB (see html_codec) or legacy TEXT
+            html_sha256       TEXT,    -- body kept in the blob store instead
             
             -- Informations       
             template          TEXT,
@@ -38,6 +39,79 @@ def init_email_table(conn: sqlite3.Connection) -> None:
         );
         """
     )
+    # parse queue, read in (internal_date_ms, message_id) keyset pages
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_emails_fetched_queue
+        ON emails(internal_date_ms, message_id)
+        WHERE status = 'fetched';
+        """
+    )
+    conn.commit()
+
+
+def init_html_zdicts_table(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS html_zdicts (
+            dict_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            zdict             BLOB NOT NULL,
+            sample_count      INTEGER NOT NULL DEFAULT 0,
+            created_at        TEXT NOT NULL
+        );
+        """
+    )
+    conn.commit()
+
+
+def init_parse_cache_table(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS parse_cache (
+            html_sha256       TEXT NOT NULL,
+            parser_name       TEXT NOT NULL,
+            parser_version    TEXT NOT NULL,
+            hits_json         TEXT NOT NULL,
+            parsed_confidence INTEGER NOT NULL,
+            created_at        TEXT NOT NULL,
+            last_used_at      TEXT NOT NULL,
+
+            PRIMARY KEY (html_sha256, parser_name, parser_version)
+        );
+        """
+    )
+    conn.commit()
+
+
+def init_mail_sync_state_table(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mail_sync_state (
+            account           TEXT PRIMARY KEY,
+            history_id        TEXT,
+            updated_at        TEXT NOT NULL
+        );
+        """
+    )
+    conn.commit()
+
+
+def init_mail_index_checkpoints_table(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mail_index_checkpoints (
+            from_email        TEXT PRIMARY KEY,
+            query             TEXT NOT NULL,
+            page_token        TEXT NOT NULL,
+            pages_done        INTEGER NOT NULL DEFAULT 0,
+            updated_at        TEXT NOT NULL
+        );
+        """
+    )
     conn.commit()
 
 
@@ -93,6 +167,48 @@ def init_email_job_hits_table(conn: sqlite3.Connection) -> None:
         );
         """
     )
+    # queue scans, one partial index per queue (see migration 0005 for the predicates)
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_email_job_hits_canon_queue
+        ON email_job_hits(canonical_status, next_retry_at, attempt_count)
+        WHERE canonical_status IN ('pending','retry') AND TRIM(out_url) <> '';
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_email_job_hits_promote_queue
+        ON email_job_hits(promote_status, canonical_status)
+        WHERE promote_status = 'pending' AND canonical_status = 'ok';
+        """
+    )
+    # earlier canonicalization of the same job, see get_canonical_by_fingerprint
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_email_job_hits_fingerprint
+        ON email_job_hits(fingerprint)
+        WHERE canonical_url IS NOT NULL;
+        """
+    )
+    conn.commit()
+
+
+def init_url_resolution_cache_table(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS url_resolution_cache (
+            out_url           TEXT PRIMARY KEY,
+            outcome           TEXT NOT NULL CHECK (outcome IN ('ok','error')),
+            external_job_id   TEXT,
+            canonical_url     TEXT,
+            http_status       INTEGER,
+            canon_error       TEXT,
+            resolved_at       TEXT NOT NULL,
+            expires_at        TEXT NOT NULL
+        );
+        """
+    )
     conn.commit()
 
 
@@ -236,7 +352,12 @@ def init_email_job_ads_table(conn: sqlite3.Connection) -> None:
 
 def init_all_tables(conn):
     init_email_table(conn)
+    init_html_zdicts_table(conn)
+    init_parse_cache_table(conn)
+    init_mail_sync_state_table(conn)
+    init_mail_index_checkpoints_table(conn)
     init_email_job_hits_table(conn)
+    init_url_resolution_cache_table(conn)
     init_company_table(conn)
     init_job_ads_table(conn)
     init_job_ad_enrichment(conn)
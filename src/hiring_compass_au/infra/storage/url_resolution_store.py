@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import UTC, datetime, timedelta
+
+from hiring_compass_au.infra.storage.db import utc_now_iso
+
+# SQLite caps bound parameters per statement (999 on old builds)
+_IN_CHUNK = 500
+
+
+def get_url_resolutions(conn: sqlite3.Connection, out_urls: list[str]) -> dict[str, dict]:
+    """Unexpired cached resolutions of out_urls, by out_url."""
+    now = utc_now_iso()
+    found: dict[str, dict] = {}
+    for i in range(0, len(out_urls), _IN_CHUNK):
+        chunk = out_urls[i : i + _IN_CHUNK]
+        rows = conn.execute(
+            f"""
+            SELECT out_url, outcome, external_job_id, canonical_url, http_status, canon_error
+            FROM url_resolution_cache
+            WHERE out_url IN ({", ".join("?" * len(chunk))}) AND expires_at > ?
+            """,
+            (*chunk, now),
+        ).fetchall()
+        for out_url, outcome, external_job_id, canonical_url, http_status, canon_error in rows:
+            found[out_url] = {
+                "outcome": outcome,
+                "external_job_id": external_job_id,
+                "canonical_url": canonical_url,
+                "http_status": http_status,
+                "canon_error": canon_error,
+            }
+    return found
+
+
+def put_url_resolution(
+    conn: sqlite3.Connection,
+    out_url: str,
+    resolution: dict,
+    ttl_days: float,
+) -> None:
+    """
+    Cache an ok/error resolution of out_url for ttl_days (retry outcomes are not cached).
+    - No commit here
+    """
+    now = datetime.now(UTC).replace(microsecond=0)
+    conn.execute(
+        """
+        INSERT INTO url_resolution_cache(
+            out_url, outcome, external_job_id, canonical_url, http_status, canon_error,
+            resolved_at, expires_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(out_url) DO UPDATE SET
+            outcome = excluded.outcome,
+            external_job_id = excluded.external_job_id,
+            canonical_url = excluded.canonical_url,
+            http_status = excluded.http_status,
+            canon_error = excluded.canon_error,
+            resolved_at = excluded.resolved_at,
+            expires_at = excluded.expires_at
+        """,
+        (
+            out_url,
+            resolution["outcome"],
+            resolution.get("external_job_id"),
+            resolution.get("canonical_url"),
+            resolution.get("http_status"),
+            resolution.get("canon_error"),
+            now.isoformat(),
+            (now + timedelta(days=ttl_days)).isoformat(),
+        ),
+    )
+
+
+def get_canonical_by_fingerprint(
+    conn: sqlite3.Connection,
+    fingerprint: str,
+    max_age_days: float,
+) -> dict | None:
+    """Most recent ok canonicalization of a hit with this fingerprint, if recent enough."""
+    since = (datetime.now(UTC) - timedelta(days=max_age_days)).replace(microsecond=0)
+    row = conn.execute(
+        """
+        SELECT external_job_id, canonical_url, http_status
+        FROM email_job_hits
+        WHERE fingerprint = ?
+          AND canonical_url IS NOT NULL
+          AND canonical_status = 'ok'
+          AND last_attempt_at >= ?
+        ORDER BY last_attempt_at DESC
+        LIMIT 1
+        """,
+        (fingerprint, since.isoformat()),
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "outcome": "ok",
+        "external_job_id": row[0],
+        "canonical_url": row[1],
+        "http_status": row[2],
+        "canon_error": None,
+    }
+
+
+def purge_expired_url_resolutions(conn: sqlite3.Connection) -> int:
+    """
+    Delete expired cache rows. Return number of deleted rows.
+    - No commit here
+    """
+    cur = conn.execute(
+        "DELETE FROM url_resolution_cache WHERE expires_at <= ?",
+        (utc_now_iso(),),
+    )
+    return int(cur.rowcount or 0)
@@ -11,6 +11,7 @@ import requests
 
 from hiring_compass_au.config.settings import WorkspaceSettings
 from hiring_compass_au.infra.storage.db import get_connection
+from hiring_compass_au.infra.storage.migrations import apply_migrations
 from hiring_compass_au.infra.storage.schema import init_all_tables
 from hiring_compass_au.services.job_alerts.pipeline import run_job_alert_pipeline
 from hiring_compass_au.services.job_alerts.settings import JobAlertsSettings
@@ -73,7 +74,8 @@ def main() -> int:
     ws = WorkspaceSettings()
     cfg = JobAlertsSettings()
 
-    ensure_workspace(WorkspacePaths(root=ws.root), minimal=True)
+    paths = WorkspacePaths(root=ws.root)
+    ensure_workspace(paths, minimal=True)
 
     run_id = str(uuid.uuid4())
     started_at = datetime.now(UTC).replace(microsecond=0).isoformat()
@@ -119,6 +121,7 @@ def main() -> int:
         try:
             with get_connection(ws.db_path, sqlite3.Row) as conn:
                 init_all_tables(conn)
+                apply_migrations(conn)
 
                 results = run_job_alert_pipeline(
                     conn,
@@ -130,13 +133,36 @@ def main() -> int:
                     index=not args.no_index,
                     fetch=not args.no_fetch,
                     fetch_batch_size=cfg.fetch_batch_size,
+                    fetch_batch_requests=cfg.fetch_batch_requests,
+                    fetch_workers=cfg.fetch_workers,
+                    fetch_profile=cfg.fetch_profile,
+                    fetch_metadata_first=cfg.fetch_metadata_first,
+                    gmail_quota_units_per_s=cfg.gmail_quota_units_per_s,
+                    html_blob_dir=paths.blobs,
+                    html_blob_store=cfg.html_blob_store,
                     parse=not args.no_parse,
+                    parse_workers=cfg.parse_workers,
+                    parse_commit_every=cfg.parse_commit_every,
+                    parse_commit_interval_ms=cfg.parse_commit_interval_ms,
+                    parse_cache=cfg.parse_cache,
+                    parse_cache_max_age_days=cfg.parse_cache_max_age_days,
+                    parse_cache_max_entries=cfg.parse_cache_max_entries,
                     canonicalize=not args.no_canonicalize,
                     canon_batch_size=cfg.canon_batch_size,
                     canon_timeout_s=cfg.canon_timeout_s,
                     canon_max_batches=cfg.canon_max_batches,
+                    canon_engine=cfg.canon_engine,
+                    canon_concurrency=cfg.canon_concurrency,
+                    canon_per_host_concurrency=cfg.canon_per_host_concurrency,
+                    canon_rate_per_s=cfg.canon_rate_per_s,
+                    canon_cache_ttl_days=cfg.canon_cache_ttl_days,
+                    canon_cache_negative_ttl_days=cfg.canon_cache_negative_ttl_days,
+                    canon_cache_reuse_fingerprint=cfg.canon_cache_reuse_fingerprint,
                     promote=not args.no_promote,
                     senders=cfg.senders,
+                    index_use_history=cfg.index_use_history,
+                    ingest_engine=cfg.ingest_engine,
+                    ingest_concurrency=cfg.ingest_concurrency,
                     progress=cfg.progress,
                 )
         except Exception as e:
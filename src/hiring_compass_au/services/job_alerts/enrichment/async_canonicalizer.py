@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from hiring_compass_au.infra.rate_limit import AsyncQuotaBudget
+from hiring_compass_au.infra.storage.hit_store import (
+    get_batch_url_to_canonicalize,
+    update_job_hits_canonicalization,
+)
+from hiring_compass_au.services.job_alerts.enrichment.resolution_cache import (
+    EMPTY_OUT_URL,
+    ResolutionCache,
+    apply_resolution,
+    resolution_ok,
+)
+from hiring_compass_au.services.job_alerts.enrichment.url_canonicalizer import (
+    USER_AGENT,
+    canonicalize_failure,
+    decode_offline,
+    resolve_to_canonical_async,
+)
+
+logger = logging.getLogger(__name__)
+
+# pause of a host after a retry outcome (429/5xx, network error), as the sync engine sleeps
+RETRY_BACKOFF_S = (2.0, 4.0)
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+class HostLimiter:
+    """One semaphore per host: at most `per_host` requests in flight to the same host."""
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def for_url(self, url: str) -> asyncio.Semaphore:
+        host = _host(url)
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+
+class HostBackoff:
+    """
+    Per-host pause shared by every request of a run (batches included): after a retry
+    outcome, wait() holds new requests to that host for RETRY_BACKOFF_S seconds.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._not_before: dict[str, float] = {}
+
+    def back_off(self, url: str) -> None:
+        host = _host(url)
+        until = self._clock() + random.uniform(*RETRY_BACKOFF_S)
+        self._not_before[host] = max(self._not_before.get(host, 0.0), until)
+
+    async def wait(self, url: str) -> None:
+        host = _host(url)
+        # the pause can be extended while sleeping
+        while (delay := self._not_before.get(host, 0.0) - self._clock()) > 0:
+            await asyncio.sleep(delay)
+
+
+async def _resolve_url(
+    client: httpx.AsyncClient,
+    out_url: str,
+    timeout: float,
+    inflight: asyncio.Semaphore,
+    hosts: HostLimiter,
+    backoff: HostBackoff,
+    rate: AsyncQuotaBudget | None,
+) -> tuple[str, dict]:
+    decoded = decode_offline(out_url)
+    if decoded is not None:
+        # no request: no concurrency slot or rate budget spent
+        return out_url, resolution_ok(*decoded, None)
+
+    async with hosts.for_url(out_url):
+        await backoff.wait(out_url)
+        async with inflight:
+            if rate is not None:
+                await rate.acquire(1)
+            try:
+                resolved = await resolve_to_canonical_async(
+                    client, out_url, timeout=timeout, decoders=()
+                )
+            except Exception as e:
+                failure = canonicalize_failure(e, out_url)
+                if failure["outcome"] == "retry":
+                    backoff.back_off(out_url)
+                return out_url, failure
+    return out_url, resolution_ok(*resolved)
+
+
+async def run_url_canonicalization_batch_async(
+    conn: sqlite3.Connection,
+    client: httpx.AsyncClient,
+    limit: int = 200,
+    timeout: float = 15.0,
+    *,
+    concurrency: int = 16,
+    per_host_concurrency: int = 8,
+    rate: AsyncQuotaBudget | None = None,
+    cache: ResolutionCache | None = None,
+    backoff: HostBackoff | None = None,
+    global_bar=None,
+) -> tuple[int, int, int, int]:
+    """
+    Same contract as run_url_canonicalization_batch, with up to `concurrency` URLs resolved
+    at once (`per_host_concurrency` per host, `rate` spent 1 unit per request overall).
+    A retry outcome pauses its host, see HostBackoff. Pass the same backoff and rate to
+    every batch of a run, so pauses and the request budget carry over batch boundaries.
+    Outcomes are collected on the loop thread as they complete and written with one
+    executemany and one commit per batch.
+    """
+    hits = get_batch_url_to_canonicalize(conn, limit=limit)
+
+    if not hits:
+        return 0, 0, 0, 0
+
+    cache = cache or ResolutionCache(conn, ttl_days=None, negative_ttl_days=None)
+    counts = {"ok": 0, "retry": 0, "error": 0}
+    outcomes: list[tuple[int, dict]] = []
+    inflight = asyncio.Semaphore(max(1, concurrency))
+    hosts = HostLimiter(per_host_concurrency)
+    backoff = backoff or HostBackoff()
+
+    tasks = []
+    try:
+        ready, pending = cache.plan(hits)
+        for group, resolution in ready:
+            apply_resolution(outcomes, group, resolution, counts, global_bar)
+
+        for out_url, group in pending.items():
+            if not out_url.strip():
+                apply_resolution(outcomes, group, EMPTY_OUT_URL, counts, global_bar)
+                continue
+            tasks.append(
+                asyncio.create_task(
+                    _resolve_url(client, out_url, timeout, inflight, hosts, backoff, rate)
+                )
+            )
+
+        for next_done in asyncio.as_completed(tasks):
+            out_url, resolution = await next_done
+            cache.record(out_url, resolution)
+            apply_resolution(outcomes, pending[out_url], resolution, counts, global_bar)
+
+        update_job_hits_canonicalization(conn, outcomes)
+        conn.commit()
+        return counts["ok"], counts["retry"], counts["error"], len(hits)
+
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        conn.rollback()
+        raise
+
+
+def run_url_canonicalization_batch_concurrent(
+    conn: sqlite3.Connection,
+    limit: int = 200,
+    timeout: float = 15.0,
+    *,
+    concurrency: int = 16,
+    per_host_concurrency: int = 8,
+    rate: AsyncQuotaBudget | None = None,
+    cache: ResolutionCache | None = None,
+    backoff: HostBackoff | None = None,
+    global_bar=None,
+) -> tuple[int, int, int, int]:
+    """Blocking entry point of run_url_canonicalization_batch_async (one client per batch)."""
+
+    async def _main() -> tuple[int, int, int, int]:
+        async with httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max(1, concurrency)),
+        ) as client:
+            return await run_url_canonicalization_batch_async(
+                conn,
+                client,
+                limit=limit,
+                timeout=timeout,
+                concurrency=concurrency,
+                per_host_concurrency=per_host_concurrency,
+                rate=rate,
+                cache=cache,
+                backoff=backoff,
+                global_bar=global_bar,
+            )
+
+    return asyncio.run(_main())
@@ -0,0 +1,138 @@
+import sqlite3
+
+from hiring_compass_au.infra.storage.url_resolution_store import (
+    get_canonical_by_fingerprint,
+    get_url_resolutions,
+    purge_expired_url_resolutions,
+    put_url_resolution,
+)
+
+# Resolution = keyword arguments of update_job_hit_canonicalization (outcome, http_status,
+# canonical_url, external_job_id, canon_error)
+EMPTY_OUT_URL = {"outcome": "error", "http_status": None, "canon_error": "Empty out_url"}
+
+
+def resolution_ok(external_job_id: str, canonical_url: str, http_status: int | None) -> dict:
+    return {
+        "outcome": "ok",
+        "external_job_id": external_job_id,
+        "canonical_url": canonical_url,
+        "http_status": http_status,
+        "canon_error": None,
+    }
+
+
+def group_hits_by_url(hits) -> dict[str, list]:
+    """Hits of a batch by out_url, batch order kept: each URL is resolved once."""
+    groups: dict[str, list] = {}
+    for hit in hits:
+        groups.setdefault(hit["out_url"], []).append(hit)
+    return groups
+
+
+def apply_resolution(
+    outcomes: list[tuple[int, dict]],
+    group: list,
+    resolution: dict,
+    counts: dict,
+    global_bar=None,
+) -> None:
+    """
+    Queue one resolution for every hit sharing its out_url; the batch is written at once
+    with update_job_hits_canonicalization().
+    """
+    for hit in group:
+        outcomes.append((hit["hit_id"], resolution))
+        counts[resolution["outcome"]] += 1
+        if global_bar is not None:
+            global_bar.update(1)
+
+
+class ResolutionCache:
+    """
+    Tracking URL -> canonical URL outcomes, consulted before any HTTP request.
+
+    ok outcomes are kept ttl_days, error outcomes (404-style answers, not a job URL)
+    negative_ttl_days; retry outcomes are never cached. None disables either side.
+    With reuse_fingerprint, a URL missing from the cache takes the result of a hit with the
+    same fingerprint canonicalized ok within ttl_days (SEEK re-sends a job under new
+    tracking URLs).
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        ttl_days: float | None = 30,
+        negative_ttl_days: float | None = 7,
+        reuse_fingerprint: bool = False,
+    ):
+        self.conn = conn
+        self.ttl_days = ttl_days
+        self.negative_ttl_days = negative_ttl_days
+        self.reuse_fingerprint = reuse_fingerprint and ttl_days is not None
+        self.hits = 0
+        self.fingerprint_hits = 0
+        self.misses = 0
+        self.deduped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_days is not None or self.negative_ttl_days is not None
+
+    def plan(self, hits) -> tuple[list[tuple[list, dict]], dict[str, list]]:
+        """
+        Split a batch into (group, cached resolution) pairs and the groups still to
+        resolve, by out_url.
+        """
+        groups = group_hits_by_url(hits)
+        self.deduped += len(hits) - len(groups)
+
+        cached = get_url_resolutions(self.conn, list(groups)) if self.enabled else {}
+        ready = []
+        pending = {}
+        for out_url, group in groups.items():
+            resolution = cached.get(out_url)
+            if resolution is None and self.reuse_fingerprint:
+                resolution = self._from_fingerprint(group)
+                if resolution is not None:
+                    self.fingerprint_hits += 1
+
+            if resolution is not None:
+                self.hits += 1
+                ready.append((group, resolution))
+            else:
+                if self.enabled:
+                    self.misses += 1
+                pending[out_url] = group
+        return ready, pending
+
+    def _from_fingerprint(self, group: list) -> dict | None:
+        for hit in group:
+            if hit["fingerprint"]:
+                return get_canonical_by_fingerprint(self.conn, hit["fingerprint"], self.ttl_days)
+        return None
+
+    def record(self, out_url: str, resolution: dict) -> None:
+        """Cache a fresh resolution. No commit here."""
+        ttl = {"ok": self.ttl_days, "error": self.negative_ttl_days}.get(resolution["outcome"])
+        if ttl is None or not out_url.strip():
+            return
+        put_url_resolution(self.conn, out_url, resolution, ttl)
+
+    def finish(self) -> int:
+        """Drop expired entries. Return number of purged rows."""
+        if not self.enabled:
+            return 0
+        purged = purge_expired_url_resolutions(self.conn)
+        self.conn.commit()
+        return purged
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cache_hits": self.hits,
+            "cache_fingerprint_hits": self.fingerprint_hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "deduped": self.deduped,
+        }
@@ -4,24 +4,35 @@ import logging
 import random
 import sqlite3
 import time
+from functools import partial
 
 import requests
 from tqdm import tqdm
 
+from hiring_compass_au.infra.rate_limit import AsyncQuotaBudget
 from hiring_compass_au.infra.storage.hit_store import (
     count_urls_to_canonicalize,
     get_batch_url_to_canonicalize,
-    update_job_hit_canonicalization,
+    update_job_hits_canonicalization,
+)
+from hiring_compass_au.services.job_alerts.enrichment.async_canonicalizer import (
+    HostBackoff,
+    run_url_canonicalization_batch_concurrent,
+)
+from hiring_compass_au.services.job_alerts.enrichment.resolution_cache import (
+    EMPTY_OUT_URL,
+    ResolutionCache,
+    apply_resolution,
+    resolution_ok,
 )
 from hiring_compass_au.services.job_alerts.enrichment.url_canonicalizer import (
-    CanonicalizeError,
+    USER_AGENT,
+    canonicalize_failure,
     resolve_to_canonical,
 )
 
 logger = logging.getLogger(__name__)
 
-RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
-
 
 def run_url_canonicalization_batch(
     conn: sqlite3,
@@ -29,112 +40,54 @@ def run_url_canonicalization_batch(
     limit: int = 200,
     timeout: float = 15.0,
     *,
+    cache: ResolutionCache | None = None,
     global_bar=None,
 ) -> tuple[int, int, int, int]:
     """
     Fetch a batch of pending/retry hits, resolve -> canonicalize, update DB status fields.
+    Each distinct out_url is resolved once per batch; URLs found in `cache` are not
+    requested at all.
     Assumes:
       - get_url_to_canonicalize(conn, limit) returns rows with at least: id, out_url
-      - update_job_hit_canonicalization() applies attempt_count/next_retry_at/last_attempt_at
+      - update_job_hits_canonicalization() applies attempt_count/next_retry_at/last_attempt_at
+        for the whole batch, in one statement before the commit
     """
     hits = get_batch_url_to_canonicalize(conn, limit=limit)
 
     if not hits:
         return 0, 0, 0, 0
 
-    ok = retry = err = 0
+    cache = cache or ResolutionCache(conn, ttl_days=None, negative_ttl_days=None)
+    counts = {"ok": 0, "retry": 0, "error": 0}
+    outcomes: list[tuple[int, dict]] = []
 
     try:
-        for hit in hits:
-            hit_id = hit["hit_id"]
-            out_url = hit["out_url"]
-            sleep_s = 0.2 + random.uniform(0, 0.2)
+        ready, pending = cache.plan(hits)
+        for group, resolution in ready:
+            apply_resolution(outcomes, group, resolution, counts, global_bar)
 
+        for out_url, group in pending.items():
             if not out_url.strip():
-                update_job_hit_canonicalization(
-                    conn,
-                    hit_id,
-                    outcome="error",
-                    http_status=None,
-                    canonical_url=None,
-                    external_job_id=None,
-                    canon_error="Empty out_url",
-                )
-                err += 1
+                apply_resolution(outcomes, group, EMPTY_OUT_URL, counts, global_bar)
                 continue
 
+            sleep_s = 0.2 + random.uniform(0, 0.2)
             try:
-                external_job_id, canonical_url, http_status = resolve_to_canonical(
-                    session, out_url, timeout=timeout
-                )
-                update_job_hit_canonicalization(
-                    conn,
-                    hit_id,
-                    external_job_id=external_job_id,
-                    canonical_url=canonical_url,
-                    http_status=http_status,
-                    canon_error=None,
-                    outcome="ok",
-                )
-                ok += 1
-
-            except (requests.Timeout, requests.ConnectionError) as e:
-                logger.warning("Retryable network error for out_url=%s: %s", out_url, e)
-                sleep_s = max(sleep_s, 2 + random.uniform(0, 2))
-                update_job_hit_canonicalization(
-                    conn,
-                    hit_id,
-                    external_job_id=None,
-                    canonical_url=None,
-                    http_status=None,
-                    canon_error=f"{type(e).__name__}: {e}",
-                    outcome="retry",
-                )
-                retry += 1
-
-            except CanonicalizeError as e:
-                http_status = getattr(e, "http_status", None)
-                if http_status in RETRYABLE_HTTP_STATUSES:
-                    sleep_s = max(sleep_s, 2 + random.uniform(0, 2))
-                    outcome = "retry"
-                    logger.info("Canonicalizable error due to http_status=%s", http_status)
-                    retry += 1
-                else:
-                    outcome = "error"
-                    logger.warning("Non-canonicalizable out_url=%s: %s", out_url, e)
-                    err += 1
-
-                update_job_hit_canonicalization(
-                    conn,
-                    hit_id,
-                    http_status=http_status,
-                    canonical_url=None,
-                    external_job_id=None,
-                    canon_error=str(e),
-                    outcome=outcome,
-                )
-
+                resolution = resolution_ok(*resolve_to_canonical(session, out_url, timeout=timeout))
+                if resolution["http_status"] is None:
+                    sleep_s = 0  # decoded offline, SEEK was not contacted
             except Exception as e:
-                logger.exception("Unexpected error for out_url=%s", out_url)
-                sleep_s = max(sleep_s, 2 + random.uniform(0, 2))
-                update_job_hit_canonicalization(
-                    conn,
-                    hit_id,
-                    http_status=None,
-                    canonical_url=None,
-                    external_job_id=None,
-                    canon_error=f"Unexpected: {type(e).__name__}: {e}",
-                    outcome="retry",
-                )
-                retry += 1
+                resolution = canonicalize_failure(e, out_url)
+                if resolution["outcome"] == "retry":
+                    sleep_s = max(sleep_s, 2 + random.uniform(0, 2))
 
-            finally:
-                time.sleep(sleep_s)
-                if global_bar is not None:
-                    global_bar.update(1)
+            cache.record(out_url, resolution)
+            apply_resolution(outcomes, group, resolution, counts, global_bar)
+            time.sleep(sleep_s)
 
+        update_job_hits_canonicalization(conn, outcomes)
         conn.commit()
-        return ok, retry, err, len(hits)
+        return counts["ok"], counts["retry"], counts["error"], len(hits)
 
     except Exception:
         conn.rollback()
@@ -148,18 +101,53 @@ def run_url_canonicalization(
     timeout: float = 15.0,
     max_batches: int | None = None,
     progress: bool = False,
+    engine: str = "sync",
+    concurrency: int = 16,
+    per_host_concurrency: int = 8,
+    rate_per_s: float | None = 20,
+    cache_ttl_days: float | None = 30,
+    cache_negative_ttl_days: float | None = 7,
+    cache_reuse_fingerprint: bool = False,
+    stats: dict | None = None,
 ) -> tuple[int, int, int, int]:
+    """
+    Canonicalize pending/retry hits batch by batch.
+    engine="sync" resolves one URL at a time with a politeness sleep; engine="async" keeps
+    up to `concurrency` requests in flight (`per_host_concurrency` per host, at most
+    `rate_per_s` requests per second, a host paused after a retry outcome), see
+    async_canonicalizer.
+    Resolutions are cached across runs (see ResolutionCache); cache counters are reported
+    in `stats` when given.
+    """
     total_start = count_urls_to_canonicalize(conn)
 
     if total_start == 0:
         logger.info("URL canonicalization: up-to-date")
         return 0, 0, 0, 0
 
-    session = requests.Session()
-    session.headers.update(
-        {"User-Agent": "Mozilla/5.0 (compatible; HiringCompassAU/0.1; +https://example.invalid)"}
+    if engine == "async":
+        run_batch = partial(
+            run_url_canonicalization_batch_concurrent,
+            concurrency=concurrency,
+            per_host_concurrency=per_host_concurrency,
+            # shared by all batches: a throttled host stays paused in the next batch and
+            # the request rate holds across batch boundaries
+            rate=AsyncQuotaBudget(rate_per_s) if rate_per_s else None,
+            backoff=HostBackoff(),
+        )
+    elif engine == "sync":
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        run_batch = partial(run_url_canonicalization_batch, session=session)
+    else:
+        raise ValueError(f"Unknown canonicalization engine: {engine} (expected sync or async)")
+
+    cache = ResolutionCache(
+        conn,
+        ttl_days=cache_ttl_days,
+        negative_ttl_days=cache_negative_ttl_days,
+        reuse_fingerprint=cache_reuse_fingerprint,
     )
-
     batches = 0
     ok = retry = err = 0
     treated = 0
@@ -175,11 +163,11 @@ def run_url_canonicalization(
             if max_batches is not None and batches >= max_batches:
                 break
 
-            ok_b, retry_b, err_b, treated_b = run_url_canonicalization_batch(
+            ok_b, retry_b, err_b, treated_b = run_batch(
                 conn,
-                session,
                 limit=batch_size,
                 timeout=timeout,
+                cache=cache,
                 global_bar=global_bar,
             )
 
@@ -211,11 +199,20 @@ def run_url_canonicalization(
         if global_bar is not None:
             global_bar.close()
 
+    cache.finish()
+    cache_stats = cache.stats()
+    if stats is not None:
+        stats.update(cache_stats)
+
     logger.info(
-        "URL canonicalization finished: ok=%d retry=%d error=%d (total_start=%d)",
+        "URL canonicalization finished: ok=%d retry=%d error=%d (total_start=%d) "
+        "cache_hits=%d cache_misses=%d deduped=%d",
         ok,
         retry,
         err,
         total_start,
+        cache_stats["cache_hits"],
+        cache_stats["cache_misses"],
+        cache_stats["deduped"],
     )
     return total_start, ok, retry, err
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import logging
 import re
-from urllib.parse import urlparse, urlunparse
+from collections.abc import Callable
+from urllib.parse import parse_qsl, unquote, urlparse, urlunparse
 
+import httpx
 import requests
 
 logger = logging.getLogger(__name__)
 
 SEEK_JOB_PATH_RE = re.compile(r"^/job/(?P<job_id>\d+)(?:/.*)?$")
 
+USER_AGENT = "Mozilla/5.0 (compatible; HiringCompassAU/0.1; +https://example.invalid)"
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+# transient transport failures of the sync (requests) and async (httpx) engines
+RETRYABLE_NETWORK_ERRORS = (
+    requests.Timeout,
+    requests.ConnectionError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+
+
+SEEK_HOST_SUFFIX = "seek.com.au"
+SEEK_JOB_BASE_URL = "https://www.seek.com.au"
+# destination found inside decoded tracking data, absolute or as a bare path
+EMBEDDED_JOB_URL_RE = re.compile(
+    r"(?P<url>https?://[\w.-]*seek\.com\.au/job/\d+)|(?<![\w/])(?P<path>/job/\d+)(?![\d])"
+)
+REDIRECT_QUERY_KEYS = ("url", "u", "redirect", "redirect_url", "target", "dest", "destination")
+# base64url chunks shorter than this cannot hold a /job/<id> path
+MIN_ENCODED_LEN = 12
+
 
 class CanonicalizeError(Exception):
     def __init__(self, message: str, http_status: int | None = None):
@@ -31,6 +57,21 @@ def head_location(
     return r.status_code, r.headers.get("Location")
 
 
+async def head_location_async(
+    client: httpx.AsyncClient,
+    out_url: str,
+    timeout: float = 15.0,
+) -> tuple[int, str | None]:
+    """head_location() for the async engine (same HEAD then GET fallback)."""
+    r = await client.head(out_url, follow_redirects=False, timeout=timeout)
+    loc = r.headers.get("Location")
+    if loc:
+        return r.status_code, loc
+
+    r = await client.get(out_url, follow_redirects=False, timeout=timeout)
+    return r.status_code, r.headers.get("Location")
+
+
 def canonicalize_seek_location(location_url: str) -> tuple[str, str]:
     """
     location_url is expected to be a SEEK job URL (after redirect).
@@ -47,14 +88,110 @@ def canonicalize_seek_location(location_url: str) -> tuple[str, str]:
     return job_id, canonical_url
 
 
+# ---- Offline decoders ----
+# A decoder returns the destination a tracking URL embeds, or None. decode_offline() only
+# trusts a destination that canonicalize_seek_location() accepts on a SEEK host.
+
+
+def _find_embedded_job_url(text: str) -> str | None:
+    m = EMBEDDED_JOB_URL_RE.search(text)
+    if not m:
+        return None
+    return m.group("url") or SEEK_JOB_BASE_URL + m.group("path")
+
+
+def decode_query_destination(out_url: str) -> str | None:
+    """Destination carried in a redirect query parameter (?url=..., ?u=..., ...)."""
+    for key, value in parse_qsl(urlparse(out_url).query):
+        if key.lower() in REDIRECT_QUERY_KEYS:
+            found = _find_embedded_job_url(unquote(value))
+            if found:
+                return found
+    return None
+
+
+def decode_base64_path(out_url: str) -> str | None:
+    """Destination inside a base64url-encoded path segment of the tracking token."""
+    for segment in urlparse(out_url).path.split("/"):
+        if len(segment) < MIN_ENCODED_LEN:
+            continue
+        try:
+            raw = base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+        except (binascii.Error, ValueError):
+            continue
+        found = _find_embedded_job_url(raw.decode("utf-8", errors="ignore"))
+        if found:
+            return found
+    return None
+
+
+OFFLINE_DECODERS: tuple[Callable[[str], str | None], ...] = (
+    decode_query_destination,
+    decode_base64_path,
+)
+
+
+def decode_offline(
+    out_url: str,
+    decoders=OFFLINE_DECODERS,
+) -> tuple[str, str] | None:
+    """(job_id, canonical_url) recovered without any request, or None."""
+    for decoder in decoders:
+        try:
+            location = decoder(out_url)
+        except Exception:
+            logger.debug("Offline decoder %s failed on %s", decoder.__name__, out_url)
+            continue
+        if not location:
+            continue
+
+        host = (urlparse(location).hostname or "").lower()
+        if host != SEEK_HOST_SUFFIX and not host.endswith("." + SEEK_HOST_SUFFIX):
+            continue
+        try:
+            return canonicalize_seek_location(location)
+        except ValueError:
+            continue
+    return None
+
+
 def resolve_to_canonical(
-    session: requests.Session, out_url: str, timeout: float = 15.0
-) -> tuple[str, str, int]:
+    session: requests.Session,
+    out_url: str,
+    timeout: float = 15.0,
+    decoders=OFFLINE_DECODERS,
+) -> tuple[str, str, int | None]:
     """
     out_url = url from email (tracking).
-    Returns (job_id, canonical_url, http_status).
+    Returns (job_id, canonical_url, http_status); http_status is None when the destination
+    was decoded offline (no request made).
     """
+    decoded = decode_offline(out_url, decoders)
+    if decoded is not None:
+        return (*decoded, None)
+
     http_status, location = head_location(session, out_url, timeout=timeout)
+    return canonical_from_location(out_url, http_status, location)
+
+
+async def resolve_to_canonical_async(
+    client: httpx.AsyncClient,
+    out_url: str,
+    timeout: float = 15.0,
+    decoders=OFFLINE_DECODERS,
+) -> tuple[str, str, int | None]:
+    """resolve_to_canonical() for the async engine."""
+    decoded = decode_offline(out_url, decoders)
+    if decoded is not None:
+        return (*decoded, None)
+
+    http_status, location = await head_location_async(client, out_url, timeout=timeout)
+    return canonical_from_location(out_url, http_status, location)
+
+
+def canonical_from_location(
+    out_url: str, http_status: int, location: str | None
+) -> tuple[str, str, int]:
     if not location:
         raise CanonicalizeError(
             f"No Location header (status={http_status}) for out_url={out_url}",
@@ -66,3 +203,31 @@ def resolve_to_canonical(
         raise CanonicalizeError(str(e), http_status=http_status) from e
 
     return job_id, canonical_url, http_status
+
+
+def canonicalize_failure(e: Exception, out_url: str) -> dict:
+    """
+    Map a resolve failure to update_job_hit_canonicalization fields:
+    network errors and retryable HTTP statuses -> retry, other CanonicalizeError -> error,
+    anything unexpected -> retry.
+    """
+    if isinstance(e, RETRYABLE_NETWORK_ERRORS):
+        logger.warning("Retryable network error for out_url=%s: %s", out_url, e)
+        return {"outcome": "retry", "http_status": None, "canon_error": f"{type(e).__name__}: {e}"}
+
+    if isinstance(e, CanonicalizeError):
+        http_status = getattr(e, "http_status", None)
+        if http_status in RETRYABLE_HTTP_STATUSES:
+            logger.info("Canonicalizable error due to http_status=%s", http_status)
+            outcome = "retry"
+        else:
+            logger.warning("Non-canonicalizable out_url=%s: %s", out_url, e)
+            outcome = "error"
+        return {"outcome": outcome, "http_status": http_status, "canon_error": str(e)}
+
+    logger.error("Unexpected error for out_url=%s", out_url, exc_info=e)
+    return {
+        "outcome": "retry",
+        "http_status": None,
+        "canon_error": f"Unexpected: {type(e).__name__}: {e}",
+    }
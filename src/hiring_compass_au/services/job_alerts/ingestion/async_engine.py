@@ -0,0 +1,430 @@
+import asyncio
+import logging
+import sqlite3
+import time
+
+import httpx
+
+from hiring_compass_au.infra.rate_limit import AsyncQuotaBudget
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore
+from hiring_compass_au.infra.storage.db import compute_backoff_minutes
+from hiring_compass_au.infra.storage.mail_store import (
+    clear_index_checkpoint,
+    filter_non_fetched_ids,
+    get_non_fetched_email_senders,
+    mark_unsupported_emails,
+    save_index_checkpoint,
+    train_html_zdict,
+    update_fetched_email_metadata,
+    upsert_indexed_emails,
+)
+from hiring_compass_au.services.job_alerts.ingestion.mail_fetch import (
+    FETCH_PROFILES,
+    extract_fields,
+    fetch_error_fields,
+    message_get_params,
+    response_size,
+)
+from hiring_compass_au.services.job_alerts.ingestion.mail_index import plan_index_listings
+from hiring_compass_au.services.job_alerts.ingestion.quota import (
+    MESSAGES_GET_UNITS,
+    MESSAGES_LIST_UNITS,
+)
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import is_supported_sender
+
+logger = logging.getLogger(__name__)
+
+GMAIL_API_URL = "https://gmail.googleapis.com/gmail/v1/users/me"
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+# Gmail also reports rate limits as 403 with one of these reasons
+RETRYABLE_403_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+MAX_ATTEMPTS = 5
+
+
+def retry_delay_s(attempt: int, retry_after: str | None = None) -> float:
+    """
+    Delay before retry number `attempt` (1, 2, 3, ...).
+    Same doubling and cap as compute_backoff_minutes, counted in seconds: Gmail rate limits
+    clear within seconds. A Retry-After header given in seconds wins.
+    """
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return float(compute_backoff_minutes(attempt))
+
+
+def is_retryable_response(resp: httpx.Response) -> bool:
+    """429/5xx, or a 403 whose error reason is a rate limit."""
+    if resp.status_code in RETRYABLE_HTTP_STATUSES:
+        return True
+    if resp.status_code != 403:
+        return False
+    try:
+        errors = resp.json().get("error", {}).get("errors") or []
+    except ValueError:
+        return False
+    return any(e.get("reason") in RETRYABLE_403_REASONS for e in errors)
+
+
+def _refresh_creds(creds) -> None:
+    from google.auth.transport.requests import Request
+
+    creds.refresh(Request())
+
+
+class GoogleCredentialsAuth(httpx.Auth):
+    """
+    Bearer auth from google.oauth2 credentials, refreshed when expired.
+    The async flow refreshes in a worker thread, once for all concurrent requests.
+    """
+
+    def __init__(self, creds):
+        self.creds = creds
+        self._lock = asyncio.Lock()
+
+    def auth_flow(self, request):
+        if not self.creds.valid:
+            _refresh_creds(self.creds)
+        request.headers["Authorization"] = f"Bearer {self.creds.token}"
+        yield request
+
+    async def async_auth_flow(self, request):
+        if not self.creds.valid:
+            async with self._lock:
+                if not self.creds.valid:
+                    await asyncio.to_thread(_refresh_creds, self.creds)
+        request.headers["Authorization"] = f"Bearer {self.creds.token}"
+        yield request
+
+
+class GmailAsyncClient:
+    """
+    Minimal Gmail REST client: quota accounting and retry/backoff on 429/5xx,
+    rate-limit 403s and transport errors (timeouts included).
+    """
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        quota: AsyncQuotaBudget | None = None,
+        *,
+        max_attempts: int = MAX_ATTEMPTS,
+        sleep=asyncio.sleep,
+    ):
+        self.http = http
+        self.quota = quota
+        self.max_attempts = max_attempts
+        self._sleep = sleep
+        self.retries = 0
+        self.quota_wait_s = 0.0
+
+    async def get_json(self, path: str, params: dict, units: int) -> dict:
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.quota is not None:
+                self.quota_wait_s += await self.quota.acquire(units)
+
+            try:
+                resp = await self.http.get(path, params=params)
+            except httpx.TransportError as e:
+                if attempt >= self.max_attempts:
+                    raise
+                delay = retry_delay_s(attempt)
+                logger.warning("Gmail %s failed (%r), retry %d in %.1fs", path, e, attempt, delay)
+                self.retries += 1
+                await self._sleep(delay)
+                continue
+
+            if is_retryable_response(resp) and attempt < self.max_attempts:
+                delay = retry_delay_s(attempt, resp.headers.get("Retry-After"))
+                logger.warning(
+                    "Gmail %s returned %d, retry %d in %.1fs",
+                    path,
+                    resp.status_code,
+                    attempt,
+                    delay,
+                )
+                self.retries += 1
+                await self._sleep(delay)
+                continue
+
+            resp.raise_for_status()
+            return resp.json()
+
+    async def list_messages(self, query: str, page_token: str | None = None) -> dict:
+        params = {"q": query, "maxResults": 500}
+        if page_token:
+            params["pageToken"] = page_token
+        return await self.get_json("messages", params, MESSAGES_LIST_UNITS)
+
+    async def get_message(self, message_id: str, profile: str = "full") -> dict:
+        return await self.get_json(
+            f"messages/{message_id}", message_get_params(profile), MESSAGES_GET_UNITS
+        )
+
+
+async def _list_query_into_queue(
+    client: GmailAsyncClient,
+    conn: sqlite3.Connection,
+    from_email: str,
+    query: str,
+    token: str | None,
+    pages_done: int,
+    queue: asyncio.Queue,
+    seen: set[str],
+    totals: dict,
+    check_headers: bool,
+) -> None:
+    if token is not None:
+        logger.info("Resuming index for %s after %d page(s)", from_email, pages_done)
+    logger.info("Indexing emails with query: %s", query)
+
+    while True:
+        resp = await client.list_messages(query, token)
+        token = resp.get("nextPageToken")
+        messages = resp.get("messages", [])
+        pages_done += 1
+
+        if token is not None:
+            save_index_checkpoint(conn, from_email, query, token, pages_done)
+        totals["inserted"] += upsert_indexed_emails(conn, messages, from_email)
+        conn.commit()
+        totals["found"] += len(messages)
+
+        # Hand the new ids to the fetchers while the next page is listed
+        page_ids = [m["id"] for m in messages if m["id"] not in seen]
+        for message_id in filter_non_fetched_ids(conn, page_ids):
+            seen.add(message_id)
+            await queue.put((message_id, check_headers))
+
+        if token is None:
+            break
+
+
+async def _list_into_queue(
+    client: GmailAsyncClient,
+    conn: sqlite3.Connection,
+    senders: list[str],
+    queue: asyncio.Queue,
+    seen: set[str],
+    totals: dict,
+    metadata_first: bool,
+) -> None:
+    # Leftovers from previous runs first (history listings included), they do not need
+    # any listing; with metadata_first, headers are read first when the sender is unknown
+    # or has no parser
+    for message_id, sender in get_non_fetched_email_senders(conn):
+        seen.add(message_id)
+        await queue.put((message_id, metadata_first and not is_supported_sender(sender)))
+
+    for from_email in senders:
+        check_headers = metadata_first and not is_supported_sender(from_email)
+        # Planned before this sender's fetches move the after: bound of its query
+        for query, token, pages_done in plan_index_listings(conn, from_email):
+            try:
+                await _list_query_into_queue(
+                    client,
+                    conn,
+                    from_email,
+                    query,
+                    token,
+                    pages_done,
+                    queue,
+                    seen,
+                    totals,
+                    check_headers,
+                )
+            except httpx.HTTPStatusError as e:
+                if token is None or e.response.status_code != 400:
+                    raise
+                logger.warning("Stale index checkpoint for %s, restarting listing", from_email)
+                await _list_query_into_queue(
+                    client, conn, from_email, query, None, 0, queue, seen, totals, check_headers
+                )
+            clear_index_checkpoint(conn, from_email)
+
+
+async def _get_fields(client: GmailAsyncClient, message_id: str, profile: str, stats: dict):
+    t0 = time.monotonic()
+    message = await client.get_message(message_id, profile)
+    stats["calls"] += 1
+    stats["latency_s"] += time.monotonic() - t0
+    stats["response_bytes"] += response_size(message)
+    return extract_fields(message, profile)
+
+
+async def _fetch_from_queue(
+    client: GmailAsyncClient,
+    queue: asyncio.Queue,
+    profile: str,
+    on_row,
+    on_unsupported,
+    stats: dict,
+) -> None:
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+
+        message_id, check_headers = item
+        d = {"message_id": message_id}
+        try:
+            if check_headers:
+                headers = await _get_fields(client, message_id, "metadata", stats)
+                if not is_supported_sender(headers.get("from_email")):
+                    on_unsupported({"message_id": message_id, **headers})
+                    continue
+            d.update(await _get_fields(client, message_id, profile, stats))
+        except Exception as e:
+            d.update(fetch_error_fields(e))
+            logger.error("Failed to fetch message_id=%s: %r", message_id, e)
+        on_row(d)
+
+
+async def run_mail_ingest_async(
+    client: GmailAsyncClient,
+    conn: sqlite3.Connection,
+    senders: list[str],
+    *,
+    concurrency: int = 8,
+    batch_size: int = 50,
+    profile: str = "full",
+    blob_store: HtmlBlobStore | None = None,
+    metadata_first: bool = False,
+) -> dict:
+    """
+    List and fetch in one event loop: a producer pages through messages.list and queues
+    ids as soon as each page is stored, `concurrency` fetchers drain the queue.
+    Every DB write happens on the loop thread (single writer), fetched rows are
+    persisted every batch_size rows.
+    metadata_first works per message as in run_mail_fetch: headers-only call first when
+    the sender is unknown or has no parser, no body for the senders without a parser.
+    """
+    if profile not in FETCH_PROFILES:
+        raise ValueError(f"Unknown fetch profile: {profile} (expected one of {FETCH_PROFILES})")
+
+    totals = {"found": 0, "inserted": 0, "ok": 0, "error": 0, "persisted": 0, "unsupported": 0}
+    stats = {"calls": 0, "response_bytes": 0, "latency_s": 0.0}
+    seen: set[str] = set()
+    pending: list[dict] = []
+    unsupported: list[dict] = []
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency) * batch_size)
+
+    def flush() -> None:
+        if unsupported:
+            totals["unsupported"] += mark_unsupported_emails(conn, unsupported)
+            unsupported.clear()
+        if not pending:
+            return
+        rows = pending[:]
+        pending.clear()
+        persisted = update_fetched_email_metadata(conn, rows, blob_store=blob_store)
+        totals["persisted"] += persisted
+        if persisted != len(rows):
+            logger.warning(
+                "Fetch batch persisted less than fetched: fetched=%d persisted=%d",
+                len(rows),
+                persisted,
+            )
+
+    def on_row(d: dict) -> None:
+        totals["error" if d.get("error") else "ok"] += 1
+        pending.append(d)
+        if len(pending) >= batch_size:
+            flush()
+
+    def on_unsupported(d: dict) -> None:
+        unsupported.append(d)
+        if len(unsupported) >= batch_size:
+            flush()
+
+    async def produce() -> None:
+        await _list_into_queue(client, conn, senders, queue, seen, totals, metadata_first)
+        # Sentinels only after a complete listing: on failure every task is cancelled
+        # instead, nobody would drain a full queue.
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(produce())]
+    tasks += [
+        asyncio.create_task(
+            _fetch_from_queue(client, queue, profile, on_row, on_unsupported, stats)
+        )
+        for _ in range(concurrency)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # keep what was fetched even when listing failed (index checkpoints make the
+        # next run list the missing pages)
+        try:
+            flush()
+        except Exception:
+            logger.exception("Could not persist the fetched rows after failure")
+        raise
+    flush()
+
+    if totals["persisted"] and blob_store is None:
+        dict_id = train_html_zdict(conn)
+        if dict_id:
+            logger.info("Trained html_raw compression dictionary %d", dict_id)
+
+    calls = stats["calls"]
+    result = {
+        "found": totals["found"],
+        "inserted": totals["inserted"],
+        "to_fetch": len(seen) - totals["unsupported"],
+        "unsupported": totals["unsupported"],
+        "ok": totals["ok"],
+        "error": totals["error"],
+        "persisted": totals["persisted"],
+        "profile": profile,
+        "response_bytes": stats["response_bytes"],
+        "latency_ms_mean": round(1000 * stats["latency_s"] / calls, 1) if calls else None,
+        "retries": client.retries,
+        "quota_wait_s": round(client.quota_wait_s, 3),
+    }
+    logger.info(
+        "Async mail ingest finished: found=%d inserted=%d ok=%d error=%d persisted=%d retries=%d",
+        result["found"],
+        result["inserted"],
+        result["ok"],
+        result["error"],
+        result["persisted"],
+        result["retries"],
+    )
+    return result
+
+
+def run_mail_ingest(
+    creds,
+    conn: sqlite3.Connection,
+    senders: list[str],
+    *,
+    concurrency: int = 8,
+    quota_units_per_s: float | None = None,
+    timeout_s: float = 30,
+    **kwargs,
+) -> dict:
+    """Blocking entry point of the async engine (index + fetch), see run_mail_ingest_async."""
+
+    async def _main() -> dict:
+        quota = AsyncQuotaBudget(quota_units_per_s) if quota_units_per_s else None
+        async with httpx.AsyncClient(
+            base_url=GMAIL_API_URL + "/",
+            auth=GoogleCredentialsAuth(creds),
+            timeout=timeout_s,
+            limits=httpx.Limits(max_connections=concurrency),
+        ) as http:
+            client = GmailAsyncClient(http, quota)
+            return await run_mail_ingest_async(
+                client, conn, senders, concurrency=concurrency, **kwargs
+            )
+
+    return asyncio.run(_main())
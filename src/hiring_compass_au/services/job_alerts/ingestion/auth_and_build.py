@@ -1,18 +1,40 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 logger = logging.getLogger(__name__)
 
 
+def save_token(token_path: Path, creds: Credentials) -> None:
+    """
+    Write creds to token_path with an atomic replace: an interrupted write never leaves
+    a truncated token behind.
+    """
+    token_json = creds.to_json()
+    token_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=token_path.parent, prefix=".token-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(token_json)
+        os.replace(tmp, token_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
 def authenticate_gmail(
     client_secret_path: Path,
     token_path: Path,
@@ -67,15 +89,26 @@ def authenticate_gmail(
                 host=oauth_host, port=oauth_port, open_browser=oauth_open_browser
             )
 
-        token_path.parent.mkdir(parents=True, exist_ok=True)
-        token_path.write_text(creds.to_json(), encoding="utf-8")
+        # Only reached when credentials were refreshed or newly granted
+        save_token(token_path, creds)
         logger.info("Saved Gmail token to %s", token_path)
 
     return creds
 
 
+@lru_cache(maxsize=1)
+def _gmail_discovery_doc() -> dict | None:
+    """Gmail discovery document bundled with google-api-python-client, parsed once."""
+    doc = get_static_doc("gmail", "v1")
+    return json.loads(doc) if doc else None
+
+
 def build_gmail_service(creds: Credentials):
     logger.info("Building Gmail service client")
+    doc = _gmail_discovery_doc()
+    if doc is not None:
+        # no discovery request, and no re-parse for the per-worker services
+        return build_from_document(doc, credentials=creds)
     return build("gmail", "v1", credentials=creds, cache_discovery=False)
 
 
@@ -1,15 +1,54 @@
 import base64
+import json
 import logging
 import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email import policy
+from email.parser import BytesParser
 from email.utils import parseaddr
 
+from hiring_compass_au.infra.rate_limit import QuotaBudget
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore
 from hiring_compass_au.infra.storage.mail_store import (
-    get_non_fetched_email_list,
+    get_non_fetched_email_senders,
+    mark_unsupported_emails,
+    train_html_zdict,
     update_fetched_email_metadata,
 )
+from hiring_compass_au.services.job_alerts.ingestion.quota import (
+    MESSAGES_GET_UNITS,
+    cap_workers_to_budget,
+)
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import is_supported_sender
 
 logger = logging.getLogger(__name__)
 
+# Gmail rejects batch requests with more than 100 calls
+GMAIL_BATCH_MAX_REQUESTS = 100
+# fetched batches in flight (running or waiting for the writer), per worker thread
+FETCH_WINDOW_PER_WORKER = 2
+
+# Fetch profiles:
+# - full: format=full, whole resource
+# - lean: format=full restricted (fields mask) to what extract_message_fields reads
+# - raw:  format=raw (RFC 822 source) decoded locally by extract_raw_message_fields
+FETCH_PROFILES = ("full", "lean", "raw")
+
+_LEAN_PART_FIELDS = "mimeType,filename,body(data,attachmentId)"
+LEAN_FIELDS = (
+    "internalDate,"
+    f"payload(headers(name,value),{_LEAN_PART_FIELDS},"
+    f"parts({_LEAN_PART_FIELDS},parts({_LEAN_PART_FIELDS},parts)))"
+)
+RAW_FIELDS = "internalDate,raw"
+
+# Pre-pass of metadata_first: headers only, enough to pick a parser
+METADATA_HEADERS = ["From", "Subject"]
+METADATA_FIELDS = "internalDate,payload/headers"
+
 
 def _decode_base64url(data: str) -> str:
     # Gmail envoie du base64url parfois sans padding (=)
@@ -17,6 +56,16 @@ def _decode_base64url(data: str) -> str:
     return base64.urlsafe_b64decode(data.encode("utf-8")).decode("utf-8", errors="replace")
 
 
+def _html_body(html_parts: list[str]) -> str | None:
+    """
+    Body stored for a message, identical across fetch profiles: the longest html part,
+    without the line break the MIME serialisation may leave before the boundary.
+    """
+    if not html_parts:
+        return None
+    return max(html_parts, key=len).rstrip("\r\n")
+
+
 def _walk_parts(payload: dict):
     # DFS sur la structure MIME
     stack = [payload]
@@ -27,17 +76,31 @@ def _walk_parts(payload: dict):
             stack.append(p)
 
 
-def load_message(service, message_id) -> dict:
-    message = (
-        service.users()
-        .messages()
-        .get(
-            userId="me",
-            id=message_id,
-            format="full",
-        )
-        .execute()
-    )
+def message_get_params(profile: str = "full") -> dict:
+    """messages.get query parameters of a fetch profile."""
+    if profile == "full":
+        return {"format": "full"}
+    if profile == "lean":
+        return {"format": "full", "fields": LEAN_FIELDS}
+    if profile == "raw":
+        return {"format": "raw", "fields": RAW_FIELDS}
+    if profile == "metadata":
+        return {
+            "format": "metadata",
+            "metadataHeaders": METADATA_HEADERS,
+            "fields": METADATA_FIELDS,
+        }
+
+    raise ValueError(f"Unknown fetch profile: {profile} (expected one of {FETCH_PROFILES})")
+
+
+def _get_message_request(service, message_id, profile: str = "full"):
+    params = message_get_params(profile)
+    return service.users().messages().get(userId="me", id=message_id, **params)
+
+
+def load_message(service, message_id, profile: str = "full") -> dict:
+    message = _get_message_request(service, message_id, profile).execute()
     return message
 
 
@@ -75,10 +138,7 @@ def extract_message_fields(message: dict):
         data = body.get("data")
         if data:
             html_parts.append(_decode_base64url(data))
-    if html_parts:
-        html_raw = max(html_parts, key=len)
-    else:
-        html_raw = None
+    html_raw = _html_body(html_parts)
 
     message_fields = {
         "from_email": from_email,
@@ -91,6 +151,60 @@ def extract_message_fields(message: dict):
     return message_fields
 
 
+def extract_raw_message_fields(message: dict):
+    """Same output as extract_message_fields, from a format=raw message."""
+    internal_date_ms = int(message.get("internalDate")) if message.get("internalDate") else None
+
+    raw = message.get("raw") or ""
+    raw = raw + "=" * (-len(raw) % 4)
+    mime = BytesParser(policy=policy.default).parsebytes(base64.urlsafe_b64decode(raw))
+
+    from_email = None
+    if mime["From"] is not None:
+        _, from_email = parseaddr(str(mime["From"]))
+    subject = str(mime["Subject"]) if mime["Subject"] is not None else None
+
+    html_parts = []
+    for part in mime.walk():
+        if part.get_content_type() != "text/html" or part.get_filename():
+            continue
+        data = part.get_payload(decode=True)
+        if data:
+            charset = part.get_content_charset() or "utf-8"
+            try:
+                html_parts.append(data.decode(charset, errors="replace"))
+            except LookupError:
+                html_parts.append(data.decode("utf-8", errors="replace"))
+
+    return {
+        "from_email": from_email,
+        "subject": subject,
+        "internal_date_ms": internal_date_ms,
+        "html_raw": _html_body(html_parts),
+        "error": None,
+    }
+
+
+def extract_fields(message: dict, profile: str) -> dict:
+    if profile == "raw":
+        return extract_raw_message_fields(message)
+    return extract_message_fields(message)
+
+
+def response_size(message: dict) -> int:
+    # size of the JSON resource as sent by Gmail (before transport compression)
+    return len(json.dumps(message, separators=(",", ":")))
+
+
+def _new_fetch_stats() -> dict:
+    return {"calls": 0, "response_bytes": 0, "latency_s": 0.0}
+
+
+def _merge_fetch_stats(total: dict, part: dict) -> None:
+    for k, v in part.items():
+        total[k] = total.get(k, 0) + v
+
+
 def chunked(iterable, size: int):
     batch = []
     for x in iterable:
@@ -102,10 +216,263 @@ def chunked(iterable, size: int):
         yield batch
 
 
+def fetch_error_fields(e: Exception) -> dict:
+    return {
+        "from_email": None,
+        "subject": None,
+        "internal_date_ms": None,
+        "html_raw": None,
+        "error": f"Fetched error: {repr(e)}",
+    }
+
+
+def fetch_message_rows(
+    service,
+    id_batch: list[str],
+    quota: QuotaBudget | None = None,
+    *,
+    profile: str = "full",
+    stats: dict | None = None,
+) -> list[dict]:
+    """Fetch messages one `messages.get` call at a time."""
+    rows = []
+
+    for message_id in id_batch:
+        d = {"message_id": message_id}
+
+        try:
+            if quota is not None:
+                quota.acquire(MESSAGES_GET_UNITS)
+            t0 = time.monotonic()
+            message = load_message(service, message_id, profile=profile)
+            if stats is not None:
+                stats["calls"] += 1
+                stats["latency_s"] += time.monotonic() - t0
+                stats["response_bytes"] += response_size(message)
+            d.update(extract_fields(message, profile))
+        except Exception as e:
+            d.update(fetch_error_fields(e))
+            logger.exception("Failed to fetch message_id=%s", message_id)
+
+        rows.append(d)
+
+    return rows
+
+
+def fetch_message_rows_batched(
+    service,
+    id_batch: list[str],
+    quota: QuotaBudget | None = None,
+    *,
+    profile: str = "full",
+    stats: dict | None = None,
+) -> list[dict]:
+    """
+    Fetch messages through Gmail HTTP batch requests (one round trip per
+    GMAIL_BATCH_MAX_REQUESTS ids). Per-message failures become error rows,
+    exactly like fetch_message_rows.
+    """
+    responses: dict[str, tuple[dict | None, Exception | None]] = {}
+
+    def _on_response(request_id, response, exception):
+        responses[request_id] = (response, exception)
+
+    for sub_batch in chunked(id_batch, GMAIL_BATCH_MAX_REQUESTS):
+        batch = service.new_batch_http_request(callback=_on_response)
+        for message_id in sub_batch:
+            if quota is not None:
+                # each call of a batch is billed like a standalone request
+                quota.acquire(MESSAGES_GET_UNITS)
+            batch.add(_get_message_request(service, message_id, profile), request_id=message_id)
+
+        t0 = time.monotonic()
+        try:
+            batch.execute()
+            if stats is not None:
+                stats["calls"] += len(sub_batch)
+                stats["latency_s"] += time.monotonic() - t0
+        except Exception as e:
+            # Transport-level failure: every call without a response failed with it
+            logger.exception("Gmail batch request failed (%d messages)", len(sub_batch))
+            for message_id in sub_batch:
+                responses.setdefault(message_id, (None, e))
+
+    rows = []
+    for message_id in id_batch:
+        d = {"message_id": message_id}
+        message, exception = responses.get(
+            message_id, (None, RuntimeError("No response in Gmail batch"))
+        )
+
+        try:
+            if exception is not None:
+                raise exception
+            if stats is not None:
+                stats["response_bytes"] += response_size(message)
+            d.update(extract_fields(message, profile))
+        except Exception as e:
+            d.update(fetch_error_fields(e))
+            logger.error("Failed to fetch message_id=%s: %r", message_id, e)
+
+        rows.append(d)
+
+    return rows
+
+
+_worker_state = threading.local()
+
+
+def _init_fetch_worker(service_factory: Callable[[], object]) -> None:
+    # googleapiclient/httplib2 services are not thread-safe: one per worker thread
+    _worker_state.service = service_factory()
+
+
+def _fetch_batch(
+    service, id_batch: list[str], batch_requests: bool, quota: QuotaBudget | None, profile: str
+) -> tuple[list[dict], dict]:
+    fetch_rows = fetch_message_rows_batched if batch_requests else fetch_message_rows
+    stats = _new_fetch_stats()
+    rows = fetch_rows(service, id_batch, quota=quota, profile=profile, stats=stats)
+    return rows, stats
+
+
+def _fetch_batch_in_worker(
+    id_batch: list[str], batch_requests: bool, quota: QuotaBudget | None, profile: str
+) -> tuple[list[dict], dict]:
+    return _fetch_batch(_worker_state.service, id_batch, batch_requests, quota, profile)
+
+
+def _iter_fetched_batches(
+    service,
+    id_batches,
+    *,
+    batch_requests: bool,
+    workers: int,
+    service_factory: Callable[[], object] | None,
+    quota: QuotaBudget | None,
+    profile: str,
+):
+    if workers <= 1:
+        for id_batch in id_batches:
+            yield _fetch_batch(service, id_batch, batch_requests, quota, profile)
+        return
+
+    if service_factory is None:
+        raise ValueError("service_factory is required when workers > 1")
+
+    logger.info("Fetching with %d worker threads", workers)
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="gmail-fetch",
+        initializer=_init_fetch_worker,
+        initargs=(service_factory,),
+    ) as executor:
+        # bounded look-ahead: batches are submitted as earlier ones complete
+        window = workers * FETCH_WINDOW_PER_WORKER
+        batches = iter(id_batches)
+        pending = set()
+        try:
+            while True:
+                for id_batch in batches:
+                    pending.add(
+                        executor.submit(
+                            _fetch_batch_in_worker, id_batch, batch_requests, quota, profile
+                        )
+                    )
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # writer failed or stopped early: do not fetch the remaining batches
+            for future in pending:
+                future.cancel()
+
+
+def _skip_unsupported_by_metadata(
+    conn: sqlite3.Connection,
+    service,
+    to_fetch: list[str],
+    batch_size: int,
+    *,
+    batch_requests: bool,
+    workers: int,
+    service_factory: Callable[[], object] | None,
+    quota: QuotaBudget | None,
+    fetch_stats: dict,
+) -> tuple[list[str], int]:
+    """
+    Read From/Subject only and mark messages no parser handles as parsed_unsupported.
+    Returns (ids whose body must be fetched, unsupported count). Messages whose metadata
+    call failed stay in the full fetch.
+    """
+    supported = []
+    unsupported_total = 0
+
+    metadata_batches = _iter_fetched_batches(
+        service,
+        chunked(to_fetch, batch_size),
+        batch_requests=batch_requests,
+        workers=workers,
+        service_factory=service_factory,
+        quota=quota,
+        profile="metadata",
+    )
+    for rows, batch_stats in metadata_batches:
+        _merge_fetch_stats(fetch_stats, batch_stats)
+        unsupported = [
+            r for r in rows if not r.get("error") and not is_supported_sender(r.get("from_email"))
+        ]
+        unsupported_total += mark_unsupported_emails(conn, unsupported)
+
+        skipped = {r["message_id"] for r in unsupported}
+        supported.extend(r["message_id"] for r in rows if r["message_id"] not in skipped)
+
+    logger.info(
+        "Metadata pre-pass: %d supported, %d unsupported (no body fetched)",
+        len(supported),
+        unsupported_total,
+    )
+    return supported, unsupported_total
+
+
 def run_mail_fetch(
-    service, conn: sqlite3.Connection, batch_size: int = 50
+    service,
+    conn: sqlite3.Connection,
+    batch_size: int = 50,
+    *,
+    batch_requests: bool = False,
+    workers: int = 1,
+    service_factory: Callable[[], object] | None = None,
+    quota_units_per_s: float | None = None,
+    profile: str = "full",
+    stats: dict | None = None,
+    blob_store: HtmlBlobStore | None = None,
+    metadata_first: bool = False,
 ) -> tuple[int, int, int, int]:
-    to_fetch = get_non_fetched_email_list(conn)
+    """
+    Fetch every indexed message and persist it batch by batch.
+
+    With workers > 1, each worker thread fetches whole batches with its own service
+    (built by service_factory) while this thread remains the only DB writer.
+    quota_units_per_s caps the Gmail quota spent by all workers together.
+    profile selects what is downloaded (see FETCH_PROFILES); when a stats dict is given
+    it is filled with the profile, the response bytes and the mean call latency.
+    With a blob_store, bodies are written there instead of emails.html_raw.
+    With metadata_first, a headers-only pass first marks messages without a registered
+    parser as parsed_unsupported; only the others are counted in to_fetch and downloaded.
+    The pass is decided per message: a message indexed by the from:(sender) listing of a
+    sender with a parser is downloaded directly.
+    """
+    if profile not in FETCH_PROFILES:
+        raise ValueError(f"Unknown fetch profile: {profile} (expected one of {FETCH_PROFILES})")
+
+    pending = get_non_fetched_email_senders(conn)
+    to_fetch = [message_id for message_id, _ in pending]
     total = len(to_fetch)
 
     if total:
@@ -118,30 +485,43 @@ def run_mail_fetch(
     fetch_errors_total = 0
     persisted_total = 0
 
-    for id_batch in chunked(to_fetch, batch_size):
-        rows = []
+    quota = None
+    if quota_units_per_s:
+        quota = QuotaBudget(quota_units_per_s)
+        workers = cap_workers_to_budget(workers, quota_units_per_s, MESSAGES_GET_UNITS)
+
+    fetch_stats = _new_fetch_stats()
+    unsupported_total = 0
+    # sender unknown (history listing) or without a parser: headers first
+    to_check = [m for m, sender in pending if not is_supported_sender(sender)]
+    if metadata_first and to_check:
+        checked, unsupported_total = _skip_unsupported_by_metadata(
+            conn,
+            service,
+            to_check,
+            batch_size,
+            batch_requests=batch_requests,
+            workers=workers,
+            service_factory=service_factory,
+            quota=quota,
+            fetch_stats=fetch_stats,
+        )
+        to_fetch = [m for m, sender in pending if is_supported_sender(sender)] + checked
+        total = len(to_fetch)
+
+    fetched_batches = _iter_fetched_batches(
+        service,
+        chunked(to_fetch, batch_size),
+        batch_requests=batch_requests,
+        workers=workers,
+        service_factory=service_factory,
+        quota=quota,
+        profile=profile,
+    )
 
-        for message_id in id_batch:
-            d = {"message_id": message_id}
-
-            try:
-                message = load_message(service, message_id)
-                d.update(extract_message_fields(message))
-            except Exception as e:
-                d.update(
-                    {
-                        "from_email": None,
-                        "subject": None,
-                        "internal_date_ms": None,
-                        "html_raw": None,
-                        "error": f"Fetched error: {repr(e)}",
-                    }
-                )
-                logger.exception("Failed to fetch message_id=%s", message_id)
-
-            rows.append(d)
-
-        updated_rows_b = update_fetched_email_metadata(conn, rows)
+    for rows, batch_stats in fetched_batches:
+        _merge_fetch_stats(fetch_stats, batch_stats)
+        updated_rows_b = update_fetched_email_metadata(conn, rows, blob_store=blob_store)
 
         fetched_ok_b = sum(1 for r in rows if not r.get("error"))
         fetch_errors_b = len(rows) - fetched_ok_b
@@ -157,12 +537,31 @@ def run_mail_fetch(
                 updated_rows_b,
             )
 
+    if persisted_total and blob_store is None:
+        dict_id = train_html_zdict(conn)
+        if dict_id:
+            logger.info("Trained html_raw compression dictionary %d", dict_id)
+
+    calls = fetch_stats["calls"]
+    latency_ms_mean = round(1000 * fetch_stats["latency_s"] / calls, 1) if calls else None
     logger.info(
-        "Mail fetch finished: ok=%d error=%d persisted=%d",
+        "Mail fetch finished: ok=%d error=%d persisted=%d profile=%s bytes=%d latency=%sms",
         fetched_ok_total,
         fetch_errors_total,
         persisted_total,
+        profile,
+        fetch_stats["response_bytes"],
+        latency_ms_mean,
     )
+    if stats is not None:
+        stats.update(
+            {
+                "profile": profile,
+                "response_bytes": fetch_stats["response_bytes"],
+                "latency_ms_mean": latency_ms_mean,
+                "unsupported": unsupported_total,
+            }
+        )
     if persisted_total != total:
         logger.warning(
             "Mail fetch persisted less than to_fetch: to_fetched=%d persisted=%d "
@@ -1,18 +1,30 @@
 import logging
 import sqlite3
 
+from googleapiclient.errors import HttpError
+
 from hiring_compass_au.infra.storage.mail_store import (
+    clear_index_checkpoint,
+    get_history_id,
+    get_index_checkpoint,
     get_last_internal_date_ms,
+    save_index_checkpoint,
+    set_history_id,
     upsert_indexed_emails,
 )
 
 logger = logging.getLogger(__name__)
 
+# Our own drafts/sent mails also show up as messageAdded history records
+HISTORY_IGNORED_LABELS = {"DRAFT", "SENT"}
 
-def list_message_refs(service, query):
-    all = []
-    token = None
-    i = 0
+
+def list_message_refs(service, query, page_token=None):
+    """
+    Yield (messages, next_page_token) for each page of the query, starting at page_token.
+    next_page_token is None on the last page.
+    """
+    token = page_token
     logger.info("Indexing emails with query: %s", query)
 
     while True:
@@ -27,30 +39,205 @@ def list_message_refs(service, query):
             )
             .execute()
         )
-        all.extend(resp.get("messages", []))
         token = resp.get("nextPageToken", None)
-        i += 1
+        yield resp.get("messages", []), token
         if token is None:
             break
-    logger.info("%s page(s) fetched", i)
-    return all
 
 
-def run_mail_index(from_email, service, conn: sqlite3.Connection):
+def _is_invalid_page_token(e: HttpError) -> bool:
+    resp = getattr(e, "resp", None)
+    return getattr(resp, "status", None) == 400
+
+
+def _index_pages(conn, service, from_email, query, page_token, pages_done) -> tuple[int, int, int]:
+    found = 0
+    inserted = 0
+
+    for messages, next_token in list_message_refs(service, query, page_token=page_token):
+        pages_done += 1
+        if next_token is not None:
+            save_index_checkpoint(conn, from_email, query, next_token, pages_done)
+        inserted += upsert_indexed_emails(conn, messages, from_email)
+        conn.commit()
+        found += len(messages)
+
+    return found, inserted, pages_done
+
+
+def build_index_query(conn: sqlite3.Connection, from_email: str) -> str:
     last_internal_date_ms = get_last_internal_date_ms(conn, from_email)
 
     if last_internal_date_ms is not None:
         after_seconds = last_internal_date_ms // 1000 - 3600
-        query = f"from:({from_email}) after:{after_seconds}"
-    else:
-        query = f"from:({from_email})"
-    messages = list_message_refs(service, query)
-    inserted = upsert_indexed_emails(conn, messages)
+        return f"from:({from_email}) after:{after_seconds}"
+    return f"from:({from_email})"
+
+
+def plan_index_listings(
+    conn: sqlite3.Connection, from_email: str
+) -> list[tuple[str, str | None, int]]:
+    """
+    Listings to run for a sender, as (query, page_token, pages_done).
+
+    An interrupted listing is finished first with its own query: fetches made since then
+    move the after: bound of build_index_query(), which would skip the pages it had not
+    listed yet. The current query then runs from its first page, unless it is the same.
+    """
+    query = build_index_query(conn, from_email)
+    checkpoint = get_index_checkpoint(conn, from_email)
+    if checkpoint is None:
+        return [(query, None, 0)]
+
+    listings = [(checkpoint["query"], checkpoint["page_token"], checkpoint["pages_done"])]
+    if checkpoint["query"] != query:
+        listings.append((query, None, 0))
+    return listings
+
+
+def _index_listing(conn, service, from_email, query, page_token, pages_done):
+    if page_token is not None:
+        logger.info("Resuming index for %s after %d page(s)", from_email, pages_done)
+    try:
+        return _index_pages(conn, service, from_email, query, page_token, pages_done)
+    except HttpError as e:
+        if page_token is None or not _is_invalid_page_token(e):
+            raise
+        logger.warning("Stale index checkpoint for %s, restarting listing", from_email)
+        return _index_pages(conn, service, from_email, query, None, 0)
+
+
+def run_mail_index(from_email, service, conn: sqlite3.Connection):
+    # Each page is upserted as it arrives; the next page token is committed with it so that
+    # an interrupted index resumes where it stopped (see plan_index_listings).
+    found = inserted = pages_done = 0
+    for query, page_token, pages_before in plan_index_listings(conn, from_email):
+        listing_found, listing_inserted, listing_pages = _index_listing(
+            conn, service, from_email, query, page_token, pages_before
+        )
+        clear_index_checkpoint(conn, from_email)
+        found += listing_found
+        inserted += listing_inserted
+        pages_done += listing_pages
+
+    logger.info("%s page(s) fetched", pages_done)
 
     logger.info(
         "Mail index for %s: found %d messages, inserted %d new",
         from_email,
-        len(messages),
+        found,
         inserted,
     )
-    return inserted, len(messages)
+    return inserted, found
+
+
+def get_current_history_id(service) -> str:
+    profile = service.users().getProfile(userId="me").execute()
+    return str(profile["historyId"])
+
+
+def list_history_added_refs(service, start_history_id: str) -> tuple[list[dict], str]:
+    """
+    Page through users.history.list from start_history_id.
+    Returns (refs of added messages, latest historyId).
+    Raises HttpError 404 when start_history_id is too old for Gmail.
+    """
+    refs = []
+    seen = set()
+    token = None
+    latest_history_id = start_history_id
+
+    while True:
+        resp = (
+            service.users()
+            .history()
+            .list(
+                userId="me",
+                startHistoryId=start_history_id,
+                historyTypes=["messageAdded"],
+                pageToken=token,
+                maxResults=500,
+            )
+            .execute()
+        )
+        for record in resp.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message = added.get("message") or {}
+                msg_id = message.get("id")
+                if not msg_id or msg_id in seen:
+                    continue
+                if HISTORY_IGNORED_LABELS & set(message.get("labelIds") or []):
+                    continue
+                seen.add(msg_id)
+                refs.append(message)
+
+        latest_history_id = resp.get("historyId", latest_history_id)
+        token = resp.get("nextPageToken", None)
+        if token is None:
+            break
+
+    return refs, str(latest_history_id)
+
+
+def _is_history_expired(e: HttpError) -> bool:
+    resp = getattr(e, "resp", None)
+    return getattr(resp, "status", None) == 404
+
+
+def index_history_added(service, conn: sqlite3.Connection) -> tuple[int, int] | None:
+    """
+    Index the messages added since the stored historyId, whatever their sender: the
+    sender is read in the fetch step (metadata pre-pass), which drops the messages no
+    parser handles. The historyId returned by history.list becomes the new checkpoint.
+
+    Returns (inserted, found), or None when there is no usable historyId (none stored
+    yet, or expired: 404) and the sender queries must be listed instead.
+    """
+    history_id = get_history_id(conn)
+    if history_id is None:
+        return None
+
+    try:
+        added, latest_history_id = list_history_added_refs(service, history_id)
+    except HttpError as e:
+        if not _is_history_expired(e):
+            raise
+        logger.warning("Gmail historyId %s expired, falling back to query index", history_id)
+        return None
+
+    inserted = upsert_indexed_emails(conn, added)
+    set_history_id(conn, latest_history_id)
+    logger.info(
+        "Mail index: %d message(s) added since historyId %s, inserted %d new",
+        len(added),
+        history_id,
+        inserted,
+    )
+    return inserted, len(added)
+
+
+def run_mail_index_incremental(
+    senders: list[str], service, conn: sqlite3.Connection
+) -> tuple[int, int, str]:
+    """
+    Index through the Gmail history API instead of listing every sender query.
+
+    - known historyId: the added messages are upserted from history.list alone
+    - no historyId yet or historyId expired (404): per-sender query listings, with the
+      historyId read (getProfile) before listing so nothing arriving meanwhile is skipped
+    Returns (inserted, found, mode) with mode in {"history", "query"}.
+    """
+    indexed = index_history_added(service, conn)
+    if indexed is not None:
+        return *indexed, "history"
+
+    new_history_id = get_current_history_id(service)
+    inserted_total = 0
+    found_total = 0
+    for sender in senders:
+        inserted, found = run_mail_index(from_email=sender, service=service, conn=conn)
+        inserted_total += inserted
+        found_total += found
+
+    set_history_id(conn, new_history_id)
+    return inserted_total, found_total, "query"
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+# Gmail API per-user quota: 250 units/s, cost per method call
+GMAIL_USER_QUOTA_UNITS_PER_S = 250
+MESSAGES_GET_UNITS = 5
+MESSAGES_LIST_UNITS = 5
+
+
+def cap_workers_to_budget(workers: int, units_per_s: float, units_per_call: int) -> int:
+    """Never start more workers than the per-second budget has calls for."""
+    return max(1, min(workers, int(units_per_s // units_per_call)))
@@ -0,0 +1,68 @@
+"""
+HTML engines for the mail parsers.
+
+An engine turns an HTML document into the <a href> nodes of the document. Nodes expose
+node.get(attr, default) like a BeautifulSoup Tag, and iter_subtree_events(node) walks the
+subtree of a node once (script/style/template content and comments excluded).
+
+"bs4" (BeautifulSoup + html.parser) is the only engine: it keeps the markup as written,
+which the SEEK card heuristics rely on. An engine is only added here when it yields the
+same hits as bs4 on every input; HTML5 tree builders (lexbor/selectolax, html5lib) move
+misnested cards out of their <a>, and lxml closes an <a> before a nested <table>.
+"""
+
+from collections.abc import Callable, Iterator
+from functools import cache
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+DEFAULT_ENGINE = "bs4"
+
+# Subtree events: (START, tag name, style attribute of <div> or None), (TEXT, text, None),
+# (END, tag name, None)
+START, TEXT, END = "start", "text", "end"
+
+# Strings bs4 reads as text (Comment, Script, Stylesheet, TemplateString... are left out)
+_BS4_TEXT_TYPES = (NavigableString, CData)
+
+
+def iter_anchors_bs4(html: str) -> Iterator:
+    soup = BeautifulSoup(html, "html.parser")
+    yield from soup.find_all("a", href=True)
+
+
+def iter_subtree_events(tag) -> Iterator[tuple]:
+    """
+    Walk the subtree of tag (tag itself excluded) once, in document order.
+    Text events are the raw text nodes a BeautifulSoup get_text() would read.
+    """
+    stack = [iter(tag.contents)]
+    names = []
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            if names:
+                yield END, names.pop(), None
+            continue
+
+        if isinstance(child, Tag):
+            style = child.get("style") if child.name == "div" else None
+            yield START, child.name, style
+            names.append(child.name)
+            stack.append(iter(child.contents))
+        elif type(child) in _BS4_TEXT_TYPES:
+            yield TEXT, str(child), None
+
+
+HTML_ENGINES: dict[str, Callable[[str], Iterator]] = {
+    "bs4": iter_anchors_bs4,
+}
+
+
+@cache
+def get_anchor_iterator(engine: str = DEFAULT_ENGINE) -> Callable[[str], Iterator]:
+    """Anchor iterator of an engine; an unknown engine is an error, never a fallback."""
+    if engine not in HTML_ENGINES:
+        raise ValueError(f"Unknown HTML engine: {engine} (expected one of {list(HTML_ENGINES)})")
+    return HTML_ENGINES[engine]
@@ -1,18 +1,25 @@
 from collections.abc import Iterator
 
+from hiring_compass_au.services.job_alerts.parsers.html_engines import DEFAULT_ENGINE
 from hiring_compass_au.services.job_alerts.parsers.seek_mail_parser import parse_seek_email
 
 PARSER_CONFIGS = {
     "jobmail@s.seek.com.au": {
         "source": "seek",
         "parser_name": "seek_mail_parser",
-        "parser_version": "v1",
+        "parser_version": "v2",  # v2: card template fingerprints (re-parse back-fills them)
         "fn": parse_seek_email,
+        "engine": "bs4",  # see html_engines
         "hits_expected": (12, 20),
     },
 }
 
 
+def is_supported_sender(from_email: str | None) -> bool:
+    """True when a parser is registered for this sender (headers are enough to decide)."""
+    return from_email in PARSER_CONFIGS
+
+
 def parse_email(from_email, html_raw) -> tuple[Iterator[dict] | None, dict | None]:
     """
     Dispatch to a parser based on email metadata.
@@ -23,5 +30,5 @@ def parse_email(from_email, html_raw) -> tuple[Iterator[dict] | None, dict | Non
     if not parser_cfg:
         return None, None
 
-    it = parser_cfg["fn"](html_raw)
+    it = parser_cfg["fn"](html_raw, engine=parser_cfg.get("engine", DEFAULT_ENGINE))
     return it, parser_cfg
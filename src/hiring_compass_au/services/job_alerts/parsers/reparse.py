@@ -0,0 +1,214 @@
+"""
+Re-parse emails whose parser_name/parser_version differ from PARSER_CONFIGS.
+
+    python -m hiring_compass_au.services.job_alerts.parsers.reparse [--workers N] [--dry-run]
+
+Emails are read in keyset pages (message_id order) and parsed in parallel; for each one the
+new hits are diffed against email_job_hits and only new or changed rows are written.
+Hits the new parser no longer produces are reported as stale, never deleted (they may
+already be canonicalized or promoted).
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+
+from hiring_compass_au.config.settings import WorkspaceSettings
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore
+from hiring_compass_au.infra.storage.db import get_connection
+from hiring_compass_au.infra.storage.hit_store import (
+    get_email_job_hit_contents,
+    hit_content,
+    upsert_email_job_hits,
+)
+from hiring_compass_au.infra.storage.mail_store import get_emails_to_reparse, update_parsed_email
+from hiring_compass_au.infra.storage.migrations import apply_migrations
+from hiring_compass_au.infra.storage.schema import init_all_tables
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import PARSER_CONFIGS
+from hiring_compass_au.services.job_alerts.parsers.runner import (
+    ParseCommitter,
+    email_template,
+    iter_parse_results,
+)
+from hiring_compass_au.services.job_alerts.settings import JobAlertsSettings
+from hiring_compass_au.workspace import WorkspacePaths
+
+logger = logging.getLogger(__name__)
+
+
+def iter_emails_to_reparse(conn: sqlite3.Connection, page_size: int = 500):
+    for from_email, parser_cfg in PARSER_CONFIGS.items():
+        after_message_id = ""
+        while True:
+            page = get_emails_to_reparse(
+                conn,
+                from_email,
+                parser_cfg["parser_name"],
+                parser_cfg["parser_version"],
+                after_message_id=after_message_id,
+                limit=page_size,
+            )
+            if not page:
+                break
+            yield from page
+            after_message_id = page[-1]["message_id"]
+
+
+def diff_hits(existing: dict[str, tuple], valid_hits: list[dict], parser_cfg: dict) -> dict:
+    """
+    Compare new hits with stored contents (by out_url).
+    Returns {"new": [hits], "changed": [hits], "unchanged": int, "stale": int}.
+    """
+    by_url = {h["out_url"]: h for h in valid_hits}
+    new = []
+    changed = []
+    unchanged = 0
+    for out_url, hit in by_url.items():
+        stored = existing.get(out_url)
+        if stored is None:
+            new.append(hit)
+        elif stored != hit_content(hit, parser_cfg):
+            changed.append(hit)
+        else:
+            unchanged += 1
+
+    return {
+        "new": new,
+        "changed": changed,
+        "unchanged": unchanged,
+        "stale": len(existing.keys() - by_url.keys()),
+    }
+
+
+def _persist_reparse_result(
+    conn: sqlite3.Connection,
+    result: dict,
+    totals: dict,
+    committer: ParseCommitter,
+    dry_run: bool,
+) -> None:
+    message_id = result["message_id"]
+    error = result.get("error")
+
+    if error is None and not result["supported"]:
+        totals["skipped"] += 1
+        return
+
+    if error is None:
+        committer.begin_email()
+        try:
+            parser_cfg = result["parser_cfg"]
+            diff = diff_hits(
+                get_email_job_hit_contents(conn, message_id), result["valid_hits"], parser_cfg
+            )
+            if not dry_run:
+                upsert_email_job_hits(
+                    conn=conn,
+                    message_id=message_id,
+                    valid_hits=diff["new"] + diff["changed"],
+                    parser_cfg=parser_cfg,
+                )
+                update_parsed_email(
+                    conn=conn,
+                    message_id=message_id,
+                    parser_cfg=parser_cfg,
+                    hit_parsed_count=len(result["valid_hits"]),
+                    parsed_confidence=result["parsed_confidence"],
+                    template=email_template(result["valid_hits"]),
+                )
+            committer.email_done()
+
+            totals["hits_new"] += len(diff["new"])
+            totals["hits_changed"] += len(diff["changed"])
+            totals["hits_unchanged"] += diff["unchanged"]
+            totals["hits_stale"] += diff["stale"]
+            return
+
+        except Exception as e:
+            committer.email_failed()
+            logger.exception("Re-parse failed for message_id=%s", message_id)
+            error = str(e)
+    else:
+        logger.error("Re-parse failed for message_id=%s\n%s", message_id, result["traceback"])
+
+    if not dry_run:
+        committer.begin_email()
+        update_parsed_email(conn, message_id, error=error)
+        committer.email_done()
+    totals["error"] += 1
+
+
+def run_mail_reparse(
+    conn: sqlite3.Connection,
+    *,
+    blob_store: HtmlBlobStore | None = None,
+    workers: int = 1,
+    page_size: int = 500,
+    dry_run: bool = False,
+) -> dict:
+    """Re-parse outdated emails and write only the hits that changed (one commit per page)."""
+    committer = ParseCommitter(conn, commit_every=page_size)
+    totals = {
+        "emails": 0,
+        "hits_new": 0,
+        "hits_changed": 0,
+        "hits_unchanged": 0,
+        "hits_stale": 0,
+        "error": 0,
+        "skipped": 0,
+    }
+
+    emails = iter_emails_to_reparse(conn, page_size)
+    for result in iter_parse_results(emails, blob_store, workers):
+        totals["emails"] += 1
+        _persist_reparse_result(conn, result, totals, committer, dry_run)
+    committer.flush()
+
+    logger.info(
+        "Mail re-parse finished%s: emails=%d new=%d changed=%d unchanged=%d stale=%d error=%d",
+        " (dry run)" if dry_run else "",
+        totals["emails"],
+        totals["hits_new"],
+        totals["hits_changed"],
+        totals["hits_unchanged"],
+        totals["hits_stale"],
+        totals["error"],
+    )
+    return totals
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Re-parse emails parsed by an outdated parser.")
+    p.add_argument("--workers", type=int, default=None, help="default: HC_PARSE_WORKERS")
+    p.add_argument("--page-size", type=int, default=500)
+    p.add_argument("--dry-run", action="store_true", help="report the diff, write nothing")
+    args = p.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+    )
+
+    ws = WorkspaceSettings()
+    cfg = JobAlertsSettings()
+    paths = WorkspacePaths(root=ws.root)
+    # read-only here: bodies stored as blobs stay readable with html_blob_store off
+    blob_store = HtmlBlobStore(paths.blobs)
+
+    with get_connection(ws.db_path, sqlite3.Row) as conn:
+        init_all_tables(conn)
+        apply_migrations(conn)
+        totals = run_mail_reparse(
+            conn,
+            blob_store=blob_store,
+            workers=args.workers or cfg.parse_workers,
+            page_size=args.page_size,
+            dry_run=args.dry_run,
+        )
+
+    print(json.dumps(totals))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
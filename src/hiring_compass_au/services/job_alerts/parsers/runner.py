@@ -1,15 +1,34 @@
+import hashlib
 import logging
 import sqlite3
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore, html_sha256
 from hiring_compass_au.infra.storage.hit_store import upsert_email_job_hits
 from hiring_compass_au.infra.storage.mail_store import (
     get_fetched_emails_to_parse,
     update_parsed_email,
 )
-from hiring_compass_au.services.job_alerts.parsers.parser_registry import parse_email
+from hiring_compass_au.infra.storage.parse_cache_store import (
+    evict_parse_cache,
+    get_cached_parse,
+    put_cached_parse,
+    touch_cached_parses,
+)
+from hiring_compass_au.services.job_alerts.parsers.html_engines import DEFAULT_ENGINE
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import (
+    PARSER_CONFIGS,
+    parse_email,
+)
 
 logger = logging.getLogger(__name__)
 
+# parse results waiting for the writer, per worker process
+PARSE_WINDOW_PER_WORKER = 4
+
 
 def compute_parsed_confidence(hit_confidences: list[int], hits_expected=None) -> int:
     n = len(hit_confidences)
@@ -40,68 +59,384 @@ def compute_parsed_confidence(hit_confidences: list[int], hits_expected=None) ->
     return int(max(0, min(100, round(score))))
 
 
-def run_mail_parse(conn: sqlite3.Connection) -> tuple[int, int, int, int, int, float | None]:
-    mail_total = 0
-    unsupported_total = 0
-    hits_upserted_total = 0
-    empty_total = 0
-    error_total = 0
-    emails_updated_total = 0
-    confidence_sum = 0
-    mail_supported_ok_total = 0
+def email_template(valid_hits: list[dict]) -> str | None:
+    """Fingerprint of an email layout: its distinct card templates, None when unknown."""
+    templates = sorted({h["template"] for h in valid_hits if h.get("template")})
+    if not templates:
+        return None
+    return hashlib.sha1("|".join(templates).encode()).hexdigest()[:16]
 
-    for message in get_fetched_emails_to_parse(conn):
-        mail_total += 1
-        message_id = message["message_id"]
-        from_email = message["from_email"]
-        html_raw = message["html_raw"]
-        parser_cfg = None
 
-        try:
-            it, parser_cfg = parse_email(from_email, html_raw)
+def _load_html(message: dict, blob_store: HtmlBlobStore | None) -> str:
+    html_raw = message["html_raw"]
+    if html_raw is not None:
+        return html_raw
 
-            if it is None:
-                emails_updated_total += update_parsed_email(conn, message_id, supported=False)
-                conn.commit()
-                unsupported_total += 1
-                continue
+    digest = message.get("html_sha256")
+    if blob_store is None:
+        raise ValueError(f"HTML body is in the blob store ({digest}) but no blob store is set")
+    return blob_store.read_html(digest)
 
-            hits = list(it)
-            valid_hits = [h for h in hits if h.get("out_url")]
 
-            hit_confidences = [int(h.get("hit_confidence") or 0) for h in valid_hits]
-            parsed_confidence = compute_parsed_confidence(
-                hit_confidences,
-                hits_expected=parser_cfg.get("hits_expected"),
-            )
-            confidence_sum += parsed_confidence
-            mail_supported_ok_total += 1
+def _parse_message(message_id: str, from_email: str, html_raw: str) -> dict:
+    """
+    Parse one email without touching the DB (runs in a worker process when workers > 1).
+    Returns a result dict for _persist_parse_result.
+    """
+    try:
+        it, parser_cfg = parse_email(from_email, html_raw)
+        if it is None:
+            return {"message_id": message_id, "supported": False}
+
+        hits = list(it)
+        valid_hits = [h for h in hits if h.get("out_url")]
+
+        hit_confidences = [int(h.get("hit_confidence") or 0) for h in valid_hits]
+        parsed_confidence = compute_parsed_confidence(
+            hit_confidences,
+            hits_expected=parser_cfg.get("hits_expected"),
+        )
+        return {
+            "message_id": message_id,
+            "supported": True,
+            # the parser function stays out of the (pickled) result
+            "parser_cfg": {k: v for k, v in parser_cfg.items() if k != "fn"},
+            "valid_hits": valid_hits,
+            "parsed_confidence": parsed_confidence,
+        }
+    except Exception as e:
+        return _error_result(message_id, e)
+
+
+def _error_result(message_id: str, e: Exception) -> dict:
+    return {"message_id": message_id, "error": str(e), "traceback": traceback.format_exc()}
+
+
+class ParseResultCache:
+    """
+    Parse results kept in the parse_cache table, keyed by
+    (sha256(html), parser_name, parser_version/engine): identical bodies (duplicate
+    deliveries, replays, backfills) are parsed once per parser version and HTML engine.
+
+    lookup() runs before parsing, in the writer thread; store() writes a fresh result
+    inside the email's transaction and forget() drops the key of a result that is not
+    stored (error, unsupported). Entries are evicted by age and count in finish().
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        max_age_days: int | None = None,
+        max_entries: int | None = None,
+    ):
+        self.conn = conn
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._miss_keys: dict[str, tuple[str, str, str]] = {}
+        self._used_keys: list[tuple[str, str, str]] = []
+
+    def lookup(self, message: dict, html_raw: str) -> dict | None:
+        """Cached parse result of this email, or None (it must be parsed)."""
+        parser_cfg = PARSER_CONFIGS.get(message["from_email"])
+        if parser_cfg is None:
+            return None
+
+        digest = message.get("html_sha256") or html_sha256(html_raw)
+        engine = parser_cfg.get("engine", DEFAULT_ENGINE)
+        key = (digest, parser_cfg["parser_name"], f"{parser_cfg['parser_version']}/{engine}")
+        cached = get_cached_parse(self.conn, *key)
+        if cached is None:
+            self.misses += 1
+            self._miss_keys[message["message_id"]] = key
+            return None
+
+        self.hits += 1
+        self._used_keys.append(key)
+        return {
+            "message_id": message["message_id"],
+            "supported": True,
+            "parser_cfg": {k: v for k, v in parser_cfg.items() if k != "fn"},
+            **cached,
+        }
+
+    def store(self, result: dict) -> None:
+        key = self._miss_keys.pop(result["message_id"], None)
+        if key is None:
+            return
+        put_cached_parse(
+            self.conn,
+            *key,
+            valid_hits=result["valid_hits"],
+            parsed_confidence=result["parsed_confidence"],
+        )
+
+    def forget(self, message_id: str) -> None:
+        self._miss_keys.pop(message_id, None)
+
+    def finish(self) -> int:
+        """Record the used entries and evict old ones. Return number of evicted entries."""
+        touch_cached_parses(self.conn, self._used_keys)
+        self._used_keys.clear()
+        evicted = evict_parse_cache(self.conn, self.max_age_days, self.max_entries)
+        self.conn.commit()
+        return evicted
+
+
+class ParseCommitter:
+    """
+    Transaction policy of the parse writer.
+
+    Default (commit_every=1, no commit_interval_ms): one commit per email, a failure rolls
+    back the email.
+    Otherwise emails are grouped: the group is committed after commit_every emails (when
+    > 1) or once it is older than commit_interval_ms, whichever comes first; with only
+    commit_interval_ms set, time alone closes the group. Each email runs in a SAVEPOINT,
+    so a failure only rolls back that email's writes, the rest of the group is kept.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        commit_every: int = 1,
+        commit_interval_ms: int | None = None,
+        *,
+        clock=time.monotonic,
+    ):
+        self.conn = conn
+        self.commit_every = max(1, commit_every)
+        self.commit_interval_s = commit_interval_ms / 1000 if commit_interval_ms else None
+        self.grouped = self.commit_every > 1 or self.commit_interval_s is not None
+        self._clock = clock
+        self._pending = 0
+        self._group_started = None
+        self.commits = 0
+
+    def begin_email(self) -> None:
+        if not self.grouped:
+            return
+        if not self.conn.in_transaction:
+            # SAVEPOINT outside a transaction would commit on RELEASE
+            self.conn.execute("BEGIN")
+            self._group_started = self._clock()
+        self.conn.execute("SAVEPOINT parse_email")
+
+    def email_done(self) -> None:
+        if not self.grouped:
+            self._commit()
+            return
+        self.conn.execute("RELEASE SAVEPOINT parse_email")
+        self._pending += 1
+        count_reached = self.commit_every > 1 and self._pending >= self.commit_every
+        if count_reached or self._interval_elapsed():
+            self._commit()
+
+    def email_failed(self) -> None:
+        if not self.grouped:
+            self.conn.rollback()
+            return
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK TO SAVEPOINT parse_email")
+            self.conn.execute("RELEASE SAVEPOINT parse_email")
+
+    def flush(self) -> None:
+        if self.conn.in_transaction:
+            self._commit()
+
+    def _interval_elapsed(self) -> bool:
+        if self.commit_interval_s is None or self._group_started is None:
+            return False
+        return self._clock() - self._group_started >= self.commit_interval_s
+
+    def _commit(self) -> None:
+        self.conn.commit()
+        self.commits += 1
+        self._pending = 0
+        self._group_started = None
+
+
+def _persist_parse_result(
+    conn: sqlite3.Connection,
+    result: dict,
+    totals: dict,
+    committer: ParseCommitter | None = None,
+    cache: ParseResultCache | None = None,
+) -> None:
+    """Write one parse result (hits + email status). Single writer."""
+    committer = committer or ParseCommitter(conn)
+    message_id = result["message_id"]
+    error = result.get("error")
+
+    if error is None:
+        committer.begin_email()
+        try:
+            if not result["supported"]:
+                totals["emails_updated"] += update_parsed_email(conn, message_id, supported=False)
+                committer.email_done()
+                totals["unsupported"] += 1
+                return
+
+            parser_cfg = result["parser_cfg"]
+            totals["confidence_sum"] += result["parsed_confidence"]
+            totals["supported_ok"] += 1
 
             hit_parsed_count = upsert_email_job_hits(
                 conn=conn,
                 message_id=message_id,
-                valid_hits=valid_hits,
+                valid_hits=result["valid_hits"],
                 parser_cfg=parser_cfg,
             )
-            emails_updated_total += update_parsed_email(
+            totals["emails_updated"] += update_parsed_email(
                 conn=conn,
                 message_id=message_id,
                 parser_cfg=parser_cfg,
                 hit_parsed_count=hit_parsed_count,
-                parsed_confidence=parsed_confidence,
+                parsed_confidence=result["parsed_confidence"],
+                template=email_template(result["valid_hits"]),
             )
-            conn.commit()
-            hits_upserted_total += hit_parsed_count
+            if cache is not None:
+                cache.store(result)
+            committer.email_done()
+            totals["hits_upserted"] += hit_parsed_count
             if hit_parsed_count == 0:
-                empty_total += 1
+                totals["empty"] += 1
+            return
 
         except Exception as e:
-            conn.rollback()
+            committer.email_failed()
             logger.exception("Parsing failed for message_id=%s", message_id)
+            error = str(e)
+    else:
+        logger.error("Parsing failed for message_id=%s\n%s", message_id, result["traceback"])
+
+    committer.begin_email()
+    totals["emails_updated"] += update_parsed_email(conn, message_id, error=error)
+    committer.email_done()
+    totals["error"] += 1
+
+
+def iter_parse_results(
+    messages,
+    blob_store: HtmlBlobStore | None,
+    workers: int,
+    cache: ParseResultCache | None = None,
+):
+    """
+    Yield parse results in message order, parsing in `workers` processes when > 1.
+    Emails found in `cache` are not parsed again.
+    """
+    if workers <= 1:
+        for message in messages:
+            try:
+                html_raw = _load_html(message, blob_store)
+                cached = cache.lookup(message, html_raw) if cache is not None else None
+            except Exception as e:
+                yield _error_result(message["message_id"], e)
+                continue
+            if cached is not None:
+                yield cached
+                continue
+            yield _parse_message(message["message_id"], message["from_email"], html_raw)
+        return
+
+    logger.info("Parsing with %d worker processes", workers)
+    # bounded look-ahead: the archive is never loaded in memory at once
+    window = workers * PARSE_WINDOW_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        for message in messages:
+            try:
+                html_raw = _load_html(message, blob_store)
+                cached = cache.lookup(message, html_raw) if cache is not None else None
+                if cached is not None:
+                    pending.append(cached)
+                else:
+                    pending.append(
+                        executor.submit(
+                            _parse_message, message["message_id"], message["from_email"], html_raw
+                        )
+                    )
+            except Exception as e:
+                pending.append(_error_result(message["message_id"], e))
+
+            if len(pending) >= window:
+                yield _pending_result(pending.popleft())
+
+        while pending:
+            yield _pending_result(pending.popleft())
+
+
+def _pending_result(item) -> dict:
+    return item.result() if isinstance(item, Future) else item
+
+
+def run_mail_parse(
+    conn: sqlite3.Connection,
+    *,
+    blob_store: HtmlBlobStore | None = None,
+    workers: int = 1,
+    commit_every: int = 1,
+    commit_interval_ms: int | None = None,
+    cache: bool = False,
+    cache_max_age_days: int | None = None,
+    cache_max_entries: int | None = None,
+    stats: dict | None = None,
+) -> tuple[int, int, int, int, int, float | None]:
+    """
+    Parse every fetched email and store its hits.
+    With workers > 1, parse_email runs in a process pool while this thread stays the only
+    DB writer (same accounting as the serial mode).
+    commit_every / commit_interval_ms group commits, see ParseCommitter.
+    cache=True reuses results of identical bodies, see ParseResultCache; the hit/miss
+    counts are reported in `stats` when given.
+    """
+    committer = ParseCommitter(conn, commit_every, commit_interval_ms)
+    parse_cache = ParseResultCache(conn, cache_max_age_days, cache_max_entries) if cache else None
+    totals = {
+        "emails": 0,
+        "unsupported": 0,
+        "hits_upserted": 0,
+        "empty": 0,
+        "error": 0,
+        "emails_updated": 0,
+        "confidence_sum": 0,
+        "supported_ok": 0,
+    }
+
+    messages = get_fetched_emails_to_parse(conn)
+    for result in iter_parse_results(messages, blob_store, workers, parse_cache):
+        totals["emails"] += 1
+        _persist_parse_result(conn, result, totals, committer, parse_cache)
+        if parse_cache is not None:
+            parse_cache.forget(result["message_id"])
+    committer.flush()
+
+    if parse_cache is not None:
+        evicted = parse_cache.finish()
+        logger.info(
+            "Parse cache: hits=%d misses=%d evicted=%d",
+            parse_cache.hits,
+            parse_cache.misses,
+            evicted,
+        )
+        if stats is not None:
+            stats.update(
+                {
+                    "cache_hits": parse_cache.hits,
+                    "cache_misses": parse_cache.misses,
+                    "cache_evicted": evicted,
+                }
+            )
 
-            emails_updated_total += update_parsed_email(conn, message_id, error=str(e))
-            conn.commit()
-            error_total += 1
+    mail_total = totals["emails"]
+    unsupported_total = totals["unsupported"]
+    hits_upserted_total = totals["hits_upserted"]
+    empty_total = totals["empty"]
+    error_total = totals["error"]
+    emails_updated_total = totals["emails_updated"]
+    confidence_sum = totals["confidence_sum"]
+    mail_supported_ok_total = totals["supported_ok"]
 
     confidence_mean = (
         confidence_sum / mail_supported_ok_total if mail_supported_ok_total > 0 else None
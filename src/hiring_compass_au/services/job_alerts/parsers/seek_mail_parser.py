@@ -1,13 +1,19 @@
 import hashlib
 import re
 from collections.abc import Iterator
-
-from bs4 import BeautifulSoup
+from functools import lru_cache
 
 from hiring_compass_au.domain.normalizers.normalize_job_fields import (
     normalize_space,
-    parse_location_raw,
-    parse_salary_raw,
+    parse_location_many,
+    parse_salary_many,
+)
+from hiring_compass_au.services.job_alerts.parsers.html_engines import (
+    DEFAULT_ENGINE,
+    START,
+    TEXT,
+    get_anchor_iterator,
+    iter_subtree_events,
 )
 
 # ---- Constants / patterns ----
@@ -31,10 +37,6 @@ SALARY_HINT_RE = re.compile(
 # ---- Small utils ----
 
 
-def _style_lower(tag) -> str:
-    return (tag.get("style") or "").lower()
-
-
 def is_noise_line(s: str) -> bool:
     s = s.strip()
     return bool(POSTED_ON_RE.match(s)) or s.lower().startswith("posted on ")
@@ -44,40 +46,66 @@ def norm(s: str | None) -> str:
     return normalize_space((s or "").lower())
 
 
-# ---- Anchor selection ----
+# ---- Card scan ----
 
 
-def is_seek_job_anchor(a) -> bool:
-    """Heuristic filter for SEEK job-card anchors.
+def scan_job_card(a, max_len: int = 120) -> dict:
+    """Walk a candidate anchor subtree once and precompute what the extractors need.
+
+    Text nodes are stripped and numbered in document order; each <div> keeps the range of
+    text nodes it contains, so its get_text(" ", strip=True) is a join of that range.
+    Prefix sums of the text lengths give the length of a div text without building it,
+    long blocks (> max_len, email boilerplate) are never joined.
 
-    Returns True if the <a> tag looks like a SEEK tracking link AND contains
-    enough short <div> text blocks to resemble a job card (vs. header/footer links).
+    Returns a dict with:
+    - div_text_count: number of <div> with some text
+    - cands: list of (lowercased style, text) for <div> with a short text, document order
     """
+    parts: list[str] = []
+    offsets = [0]  # offsets[i] = total length of parts[:i]
+    divs: list[list] = []  # [style, first part, end part] in document order
+    open_divs: list[list] = []
+
+    for kind, value, style in iter_subtree_events(a):
+        if kind == TEXT:
+            text = value.strip()
+            if text:
+                parts.append(text)
+                offsets.append(offsets[-1] + len(text))
+        elif value == "div":
+            if kind == START:
+                div = [(style or "").lower(), len(parts), None]
+                divs.append(div)
+                open_divs.append(div)
+            else:
+                open_divs.pop()[2] = len(parts)
+
+    div_text_count = 0
+    cands = []
+    for style, first, last in divs:
+        n = last - first
+        if n == 0:
+            continue
+        div_text_count += 1
 
-    href = a.get("href", "")
-    if SEEK_TRACKING_PREFIX not in href:
-        return False
+        # joined with single spaces
+        if offsets[last] - offsets[first] + n - 1 > max_len:
+            continue
+        cands.append((style, " ".join(parts[first:last])))
+
+    return {"div_text_count": div_text_count, "cands": cands}
 
-    div_texts = [d.get_text(" ", strip=True) for d in a.find_all("div")]
-    div_texts = [t for t in div_texts if t]
-    return len(div_texts) >= 3
+
+# ---- Anchor selection ----
 
 
-def collect_candidate_texts(a, max_len: int = 120):
-    """Collect short text snippets inside a job-card anchor.
+def is_seek_job_card(href: str, card: dict) -> bool:
+    """Heuristic filter for SEEK job-card anchors.
 
-    Returns a list of (div_tag, text) extracted from <div> elements within the anchor.
-    Long blocks are ignored to reduce noise from email boilerplate.
+    True if the href looks like a SEEK tracking link AND the anchor contains enough
+    <div> text blocks to resemble a job card (vs. header/footer links).
     """
-    cands = []
-    for d in a.find_all("div"):
-        txt = d.get_text(" ", strip=True)
-        if not txt:
-            continue
-        if len(txt) > max_len:
-            continue
-        cands.append((d, txt))
-    return cands
+    return SEEK_TRACKING_PREFIX in href and card["div_text_count"] >= 3
 
 
 # ---- Field extraction ----
@@ -89,8 +117,7 @@ def extract_title(cands):
     Looks for a <div> whose style contains the configured TITLE_STYLE_MARKER.
     Returns None if no suitable title is found.
     """
-    for d, txt in cands:
-        style = _style_lower(d)
+    for style, txt in cands:
         if all(m in style for m in TITLE_STYLE_MARKER):
             if is_noise_line(txt):
                 continue
@@ -104,8 +131,7 @@ def extract_company(cands):
     Looks for a <div> whose style contains the configured COMPANY_STYLE_MARKER.
     Returns None if no suitable company is found.
     """
-    for d, txt in cands:
-        style = _style_lower(d)
+    for style, txt in cands:
         if all(m in style for m in COMPANY_STYLE_MARKER):
             if is_noise_line(txt):
                 continue
@@ -139,18 +165,6 @@ def best_location(texts, title=None, company=None):
     return min(locs, key=penalty)
 
 
-def extract_location(texts, title=None, company=None):
-    """Parse a location string into structured fields.
-
-    Uses best_location() to select a candidate, then attempts to parse
-    'Suburb, City STATE' or 'City STATE'. Falls back to state-only extraction when needed.
-
-    Returns a dict with keys: suburb, city, state, location_raw (all may be None).
-    """
-    location_text = best_location(texts, title, company)
-    return parse_location_raw(location_text)
-
-
 def best_salary(texts, location_raw=None):
     """Pick the most likely salary/compensation line among candidate texts.
 
@@ -171,18 +185,6 @@ def best_salary(texts, location_raw=None):
     return min(hinted, key=len) if hinted else None
 
 
-def extract_salary(texts, location_raw=None):
-    """Extract salary range and period from candidate texts.
-
-    Selects a salary line via best_salary(), normalizes whitespace, detects period,
-    and parses 1 or 2 monetary values when present.
-
-    Returns a dict with keys: salary_min, salary_max, salary_period, salary_raw.
-    """
-    salary_text = best_salary(texts, location_raw)
-    return parse_salary_raw(salary_text)
-
-
 def compute_hit_confidence(hit: dict) -> int:
     """
     Confidence that this extracted payload is a real job-card and reasonably parsed.
@@ -274,35 +276,56 @@ def compute_hit_confidence(hit: dict) -> int:
     return int(score)
 
 
-def extract_job_from_anchor(a) -> dict:
-    """Extract a single job ad payload from a SEEK job-card anchor.
+# ---- Template skeletons ----
 
-    Builds candidate snippets, extracts title/company/location/salary heuristically,
-    and returns a dict suitable for downstream storage/ranking.
-    """
-    hit = {}
-    href = a.get("href", "")
-    cands = collect_candidate_texts(a)
-    texts = [txt for _, txt in cands]
-    texts = [t for t in texts if not is_noise_line(t)]
 
-    title = extract_title(cands)
-    company = extract_company(cands)
+def card_skeleton(card: dict) -> tuple:
+    """Layout of a scanned card without its text: div count and candidate styles."""
+    return (card["div_text_count"], *(style for style, _ in card["cands"]))
+
 
-    location_dict = extract_location(texts, title=title, company=company)
-    location_raw = location_dict["location_raw"]
+@lru_cache(maxsize=1024)
+def template_fingerprint(skeleton: tuple) -> str:
+    return hashlib.sha1(repr(skeleton).encode()).hexdigest()[:16]
 
-    salary_dict = extract_salary(texts, location_raw=location_raw)
-    salary_period = salary_dict["salary_period"]
 
-    fingerprint = None
-    if title and company and location_raw:
-        fingerprint = hashlib.sha1(
-            f"{norm(title)}|{norm(company)}|{norm(location_raw)}|{norm(salary_period)}".encode()
-        ).hexdigest()[:16]
+def extract_jobs_from_cards(cards: list[tuple[str, dict]]) -> list[dict]:
+    """Extract the job ad payloads of an email's scanned SEEK job cards.
 
-    hit.update(
-        {
+    Finds title/company/location/salary of each card heuristically; the location and
+    salary lines of the whole email are then normalized in one batch (cards of an alert
+    repeat them). Returns dicts suitable for downstream storage/ranking, with the card
+    template fingerprint.
+    """
+    picked = []
+    for href, card in cards:
+        cands = card["cands"]
+        texts = [txt for _, txt in cands if not is_noise_line(txt)]
+        title = extract_title(cands)
+        company = extract_company(cands)
+        location_text = best_location(texts, title, company)
+        # same value as parse_location_raw(location_text)["location_raw"]
+        location_raw = normalize_space(location_text) or None
+        salary_text = best_salary(texts, location_raw)
+        picked.append((href, card, texts, title, company, location_text, salary_text))
+
+    locations = parse_location_many(p[5] for p in picked)
+    salaries = parse_salary_many(p[6] for p in picked)
+
+    hits = []
+    for (href, card, texts, title, company, _, _), location_dict, salary_dict in zip(
+        picked, locations, salaries, strict=True
+    ):
+        location_raw = location_dict["location_raw"]
+        salary_period = salary_dict["salary_period"]
+
+        fingerprint = None
+        if title and company and location_raw:
+            fingerprint = hashlib.sha1(
+                f"{norm(title)}|{norm(company)}|{norm(location_raw)}|{norm(salary_period)}".encode()
+            ).hexdigest()[:16]
+
+        hit = {
             "title": title,
             "company": company,
             **location_dict,
@@ -310,26 +333,36 @@ def extract_job_from_anchor(a) -> dict:
             "out_url": href,
             "debug_lines": texts,
             "fingerprint": fingerprint,
+            "template": template_fingerprint(card_skeleton(card)),
         }
-    )
 
-    # TODO ajouter le hit_context
+        # TODO ajouter le hit_context
 
-    hit["hit_confidence"] = compute_hit_confidence(hit)
+        hit["hit_confidence"] = compute_hit_confidence(hit)
+        hits.append(hit)
 
-    return hit
+    return hits
 
 
-def parse_seek_email(html) -> Iterator[dict]:
+def parse_seek_email(html, engine: str = DEFAULT_ENGINE) -> Iterator[dict]:
     """Parse a SEEK job alert email HTML and yield extracted job ads.
 
     Scans the document for SEEK job-card anchors and yields one dict per job card.
+    engine selects the HTML backend (see html_engines).
     """
     if not html or not str(html).strip():
         return
 
-    soup = BeautifulSoup(html, "html.parser")
+    iter_anchors = get_anchor_iterator(engine)
+
+    cards = []
+    for a in iter_anchors(str(html)):
+        href = a.get("href", "")
+        if SEEK_TRACKING_PREFIX not in href:
+            continue
+
+        card = scan_job_card(a)
+        if is_seek_job_card(href, card):
+            cards.append((href, card))
 
-    for a in soup.find_all("a", href=True):
-        if is_seek_job_anchor(a):
-            yield extract_job_from_anchor(a)
+    yield from extract_jobs_from_cards(cards)
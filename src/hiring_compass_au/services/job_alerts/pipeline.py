@@ -1,14 +1,24 @@
 import logging
 import sqlite3
 import time
+from functools import partial
 from pathlib import Path
 
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore
+from hiring_compass_au.infra.storage.mail_store import set_history_id
 from hiring_compass_au.services.job_alerts.enrichment.runner import run_url_canonicalization
+from hiring_compass_au.services.job_alerts.ingestion.async_engine import run_mail_ingest
 from hiring_compass_au.services.job_alerts.ingestion.auth_and_build import (
-    authenticate_and_build_service,
+    authenticate_gmail,
+    build_gmail_service,
 )
 from hiring_compass_au.services.job_alerts.ingestion.mail_fetch import run_mail_fetch
-from hiring_compass_au.services.job_alerts.ingestion.mail_index import run_mail_index
+from hiring_compass_au.services.job_alerts.ingestion.mail_index import (
+    get_current_history_id,
+    index_history_added,
+    run_mail_index,
+    run_mail_index_incremental,
+)
 from hiring_compass_au.services.job_alerts.parsers.runner import run_mail_parse
 from hiring_compass_au.services.job_alerts.promote.runner import run_promote_job_ad
 
@@ -34,10 +44,33 @@ def run_job_alert_pipeline(
     canonicalize: bool = True,
     promote: bool = True,
     senders: list[str] | None = None,
+    index_use_history: bool = False,
+    ingest_engine: str = "sync",
+    ingest_concurrency: int = 8,
     fetch_batch_size: int = 50,
+    fetch_batch_requests: bool = False,
+    fetch_workers: int = 1,
+    fetch_profile: str = "full",
+    fetch_metadata_first: bool = False,
+    parse_workers: int = 1,
+    parse_commit_every: int = 1,
+    parse_commit_interval_ms: int | None = None,
+    parse_cache: bool = False,
+    parse_cache_max_age_days: int | None = None,
+    parse_cache_max_entries: int | None = None,
+    gmail_quota_units_per_s: int | None = None,
+    html_blob_dir: Path | None = None,
+    html_blob_store: bool = False,
     canon_batch_size: int = 200,
     canon_timeout_s: float = 15,
     canon_max_batches: int | None = None,
+    canon_engine: str = "sync",
+    canon_concurrency: int = 16,
+    canon_per_host_concurrency: int = 8,
+    canon_rate_per_s: float | None = 20,
+    canon_cache_ttl_days: float | None = 30,
+    canon_cache_negative_ttl_days: float | None = 7,
+    canon_cache_reuse_fingerprint: bool = False,
     progress: bool = True,
 ) -> dict:
     senders = senders or ["jobmail@s.seek.com.au"]
@@ -52,17 +85,24 @@ def run_job_alert_pipeline(
         "durations_s": {},
     }
 
+    # Bodies already in html_blob_dir stay readable whatever html_blob_store says;
+    # the flag only decides where fetched bodies are written.
+    blob_store = HtmlBlobStore(html_blob_dir) if html_blob_dir else None
+    fetch_blob_store = blob_store if html_blob_store else None
+
     service = None
     if index or fetch:
         t0 = time.monotonic()
         try:
-            service = authenticate_and_build_service(
-                gmail_client_secret_path,
-                gmail_token_path,
-                gmail_oauth_host,
-                gmail_oauth_port,
-                gmail_oauth_open_browser,
+            logger.info("Authenticating Gmail")
+            creds = authenticate_gmail(
+                client_secret_path=gmail_client_secret_path,
+                token_path=gmail_token_path,
+                oauth_host=gmail_oauth_host,
+                oauth_port=gmail_oauth_port,
+                oauth_open_browser=gmail_oauth_open_browser,
             )
+            service = build_gmail_service(creds)
         except Exception as e:
             _record_stage_error(results, "gmail_auth", e)
             e.hc_results = results
@@ -70,18 +110,77 @@ def run_job_alert_pipeline(
         finally:
             results["durations_s"]["gmail_auth"] = round(time.monotonic() - t0, 3)
 
-        if index:
+        async_ingest = ingest_engine == "async" and fetch
+        # history listings index the messages of every sender: headers before any body
+        metadata_first = fetch_metadata_first or (index and index_use_history)
+        if async_ingest:
+            # index (when enabled) and fetch run concurrently in one event loop
+            t0 = time.monotonic()
+            try:
+                logger.info("Start async ingest (index=%s)", index)
+                listed_senders = senders if index else []
+                history_indexed = None
+                new_history_id = None
+                if index and index_use_history:
+                    # no listing at all when history.list gives the added messages
+                    history_indexed = index_history_added(service, conn)
+                    if history_indexed is not None:
+                        listed_senders = []
+                    else:
+                        new_history_id = get_current_history_id(service)
+                ingest = run_mail_ingest(
+                    creds,
+                    conn,
+                    listed_senders,
+                    concurrency=ingest_concurrency,
+                    quota_units_per_s=gmail_quota_units_per_s,
+                    batch_size=fetch_batch_size,
+                    profile=fetch_profile,
+                    blob_store=fetch_blob_store,
+                    metadata_first=metadata_first,
+                )
+                if new_history_id is not None:
+                    set_history_id(conn, new_history_id)
+                if index:
+                    history_inserted, history_found = history_indexed or (0, 0)
+                    results["index"] = {
+                        "senders": senders,
+                        "mode": "history" if history_indexed is not None else "async",
+                        "found": ingest.pop("found") + history_found,
+                        "inserted": ingest.pop("inserted") + history_inserted,
+                    }
+                else:
+                    ingest.pop("found")
+                    ingest.pop("inserted")
+                results["fetch"] = ingest
+            except Exception as e:
+                _record_stage_error(results, "ingest", e)
+                e.hc_results = results
+                raise
+            finally:
+                results["durations_s"]["ingest"] = round(time.monotonic() - t0, 3)
+
+        if index and not async_ingest:
             t0 = time.monotonic()
             try:
                 inserted_total = 0
                 found_total = 0
                 logger.info("Start indexing emails (%d sender(s))", len(senders))
-                for sender in senders:
-                    inserted, found = run_mail_index(from_email=sender, service=service, conn=conn)
-                    inserted_total += inserted
-                    found_total += found
+                if index_use_history:
+                    inserted_total, found_total, index_mode = run_mail_index_incremental(
+                        senders=senders, service=service, conn=conn
+                    )
+                else:
+                    index_mode = "query"
+                    for sender in senders:
+                        inserted, found = run_mail_index(
+                            from_email=sender, service=service, conn=conn
+                        )
+                        inserted_total += inserted
+                        found_total += found
                 results["index"] = {
                     "senders": senders,
+                    "mode": index_mode,
                     "found": found_total,
                     "inserted": inserted_total,
                 }
@@ -92,18 +191,30 @@ def run_job_alert_pipeline(
             finally:
                 results["durations_s"]["index"] = round(time.monotonic() - t0, 3)
 
-        if fetch:
+        if fetch and not async_ingest:
             t0 = time.monotonic()
             try:
                 logger.info("Start fetching emails")
+                fetch_stats: dict = {}
                 to_fetch, ok, error, persisted = run_mail_fetch(
-                    service=service, conn=conn, batch_size=fetch_batch_size
+                    service=service,
+                    conn=conn,
+                    batch_size=fetch_batch_size,
+                    batch_requests=fetch_batch_requests,
+                    workers=fetch_workers,
+                    service_factory=partial(build_gmail_service, creds),
+                    quota_units_per_s=gmail_quota_units_per_s,
+                    profile=fetch_profile,
+                    stats=fetch_stats,
+                    blob_store=fetch_blob_store,
+                    metadata_first=metadata_first,
                 )
                 results["fetch"] = {
                     "to_fetch": to_fetch,
                     "ok": ok,
                     "error": error,
                     "persisted": persisted,
+                    **fetch_stats,
                 }
             except Exception as e:
                 _record_stage_error(results, "fetch", e)
@@ -116,7 +227,18 @@ def run_job_alert_pipeline(
         t0 = time.monotonic()
         try:
             logger.info("Start parsing emails")
-            emails, hits_upserted, empty, error, unsupported, confidence = run_mail_parse(conn=conn)
+            parse_stats: dict = {}
+            emails, hits_upserted, empty, error, unsupported, confidence = run_mail_parse(
+                conn=conn,
+                blob_store=blob_store,
+                workers=parse_workers,
+                commit_every=parse_commit_every,
+                commit_interval_ms=parse_commit_interval_ms,
+                cache=parse_cache,
+                cache_max_age_days=parse_cache_max_age_days,
+                cache_max_entries=parse_cache_max_entries,
+                stats=parse_stats,
+            )
             results["parse"] = {
                 "emails": emails,
                 "hits_upserted": hits_upserted,
@@ -124,6 +246,7 @@ def run_job_alert_pipeline(
                 "error": error,
                 "unsupported": unsupported,
                 "confidence_mean": confidence,
+                **parse_stats,
             }
         except Exception as e:
             _record_stage_error(results, "parse", e)
@@ -136,11 +259,20 @@ def run_job_alert_pipeline(
         t0 = time.monotonic()
         try:
             logger.info("Start canonicalize url")
+            canon_stats: dict = {}
             total_start, ok, retry, error = run_url_canonicalization(
                 conn=conn,
                 batch_size=canon_batch_size,
                 timeout=canon_timeout_s,
                 max_batches=canon_max_batches,
+                engine=canon_engine,
+                concurrency=canon_concurrency,
+                per_host_concurrency=canon_per_host_concurrency,
+                rate_per_s=canon_rate_per_s,
+                cache_ttl_days=canon_cache_ttl_days,
+                cache_negative_ttl_days=canon_cache_negative_ttl_days,
+                cache_reuse_fingerprint=canon_cache_reuse_fingerprint,
+                stats=canon_stats,
                 progress=progress,
             )
             results["canonicalize"] = {
@@ -148,6 +280,7 @@ def run_job_alert_pipeline(
                 "ok": ok,
                 "retry": retry,
                 "error": error,
+                **canon_stats,
             }
         except Exception as e:
             _record_stage_error(results, "canonicalize", e)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -40,11 +41,33 @@ class JobAlertsSettings(BaseSettings):
     gmail_oauth_open_browser: bool = True
 
     senders: list[str] = ["jobmail@s.seek.com.au"]
+    index_use_history: bool = False
+    ingest_engine: Literal["sync", "async"] = "sync"
+    ingest_concurrency: int = 8
     fetch_batch_size: int = 50
+    fetch_batch_requests: bool = False
+    fetch_workers: int = 1
+    fetch_profile: Literal["full", "lean", "raw"] = "full"
+    fetch_metadata_first: bool = False
+    gmail_quota_units_per_s: int = 250
+    html_blob_store: bool = False
+    parse_workers: int = 1
+    parse_commit_every: int = 1
+    parse_commit_interval_ms: int | None = None
+    parse_cache: bool = False
+    parse_cache_max_age_days: int | None = 90
+    parse_cache_max_entries: int | None = 100_000
 
     canon_batch_size: int = 200
     canon_timeout_s: float = 15
     canon_max_batches: int | None = None
+    canon_engine: Literal["sync", "async"] = "sync"
+    canon_concurrency: int = 16
+    canon_per_host_concurrency: int = 8
+    canon_rate_per_s: float | None = 20
+    canon_cache_ttl_days: float | None = 30
+    canon_cache_negative_ttl_days: float | None = 7
+    canon_cache_reuse_fingerprint: bool = False
     progress: bool = False
 
     @field_validator("senders", mode="before")
@@ -37,6 +37,10 @@ class WorkspacePaths:
     def data(self) -> Path:
         return self.root / "data"
 
+    @property
+    def blobs(self) -> Path:
+        return self.data / "blobs"
+
     @property
     def db_path(self) -> Path:
         return self.data / "local" / "state.sqlite"
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from hiring_compass_au.infra.storage.hit_store import (
+    count_urls_to_canonicalize,
+    get_batch_url_to_canonicalize,
+    get_promote_pending_job_hits,
+)
+from hiring_compass_au.infra.storage.migrations import (
+    migration_0005_email_job_hits_queue_indexes,
+    migration_0006_email_job_hits_fingerprint_index,
+)
+from hiring_compass_au.infra.storage.url_resolution_store import get_canonical_by_fingerprint
+
+apply_queue_indexes = migration_0005_email_job_hits_queue_indexes.apply
+
+
+def _query_plans(conn, fn) -> list[str]:
+    """EXPLAIN QUERY PLAN details of the email_job_hits SELECTs run by fn(conn)."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        result = fn(conn)
+        if hasattr(result, "fetchall"):
+            result.fetchall()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = []
+    for sql in statements:
+        if sql.lstrip().upper().startswith("SELECT") and "email_job_hits" in sql:
+            plans.extend(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+    assert plans
+    return plans
+
+
+def test_queue_queries_use_partial_indexes(conn):
+    cases = {
+        "idx_email_job_hits_canon_queue": [
+            count_urls_to_canonicalize,
+            lambda c: get_batch_url_to_canonicalize(c, limit=50),
+        ],
+        "idx_email_job_hits_promote_queue": [get_promote_pending_job_hits],
+    }
+    for index, fns in cases.items():
+        for fn in fns:
+            plans = _query_plans(conn, fn)
+            assert not any(p.startswith("SCAN email_job_hits") for p in plans), plans
+            assert any(f"USING INDEX {index}" in p for p in plans), plans
+
+
+def test_queue_indexes_migration_is_idempotent_and_replaces_stale_definition(conn):
+    # new databases get the indexes from the schema, with the same definitions
+    assert apply_queue_indexes(conn) is False
+
+    conn.execute("DROP INDEX idx_email_job_hits_canon_queue")
+    assert apply_queue_indexes(conn) is True
+    assert apply_queue_indexes(conn) is False
+
+    conn.execute("DROP INDEX idx_email_job_hits_promote_queue")
+    conn.execute("CREATE INDEX idx_email_job_hits_promote_queue ON email_job_hits(promote_status)")
+    assert apply_queue_indexes(conn) is True
+
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'idx_email_job_hits_promote_queue'"
+    ).fetchone()[0]
+    assert "WHERE promote_status = 'pending'" in sql
+
+
+def test_fingerprint_lookup_uses_partial_index(conn):
+    plans = _query_plans(conn, lambda c: get_canonical_by_fingerprint(c, "fp", 30))
+
+    assert not any(p.startswith("SCAN email_job_hits") for p in plans), plans
+    assert any("USING INDEX idx_email_job_hits_fingerprint" in p for p in plans), plans
+
+
+def test_fingerprint_index_migration_creates_missing_index_once(conn):
+    apply_fingerprint_index = migration_0006_email_job_hits_fingerprint_index.apply
+    assert apply_fingerprint_index(conn) is False
+
+    conn.execute("DROP INDEX idx_email_job_hits_fingerprint")
+    assert apply_fingerprint_index(conn) is True
+    assert apply_fingerprint_index(conn) is False
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime
+
+import pytest
+
 from hiring_compass_au.infra.storage.hit_store import (
     update_job_hit_canonicalization,
+    update_job_hits_canonicalization,
     update_promoted_job_hits,
     upsert_email_job_hits,
 )
@@ -126,3 +131,61 @@ def test_update_promoted_job_hits_returns_rowcount(conn):
 
     updated = update_promoted_job_hits(conn, hits_upserted=[hit_ids[0]], hits_failed=[hit_ids[1]])
     assert updated == 2
+
+
+def test_update_job_hits_canonicalization_applies_batch_with_sql_backoff(conn):
+    _insert_indexed_email(conn)
+    conn.executemany(
+        "INSERT INTO email_job_hits(message_id, out_url, source, attempt_count) "
+        "VALUES ('m', ?, 'seek', ?)",
+        [("u1", 0), ("u2", 3), ("u3", 20), ("u4", 1)],
+    )
+    ids = {
+        r["out_url"]: r["hit_id"]
+        for r in conn.execute("SELECT hit_id, out_url FROM email_job_hits").fetchall()
+    }
+    ok = {
+        "outcome": "ok",
+        "external_job_id": "1",
+        "canonical_url": "https://www.seek.com.au/job/1",
+        "http_status": 302,
+        "canon_error": "stale",
+    }
+    retry = {"outcome": "retry", "http_status": 503, "canon_error": "HTTP 503"}
+
+    updated = update_job_hits_canonicalization(
+        conn,
+        [
+            (ids["u1"], ok),
+            (ids["u2"], retry),
+            (ids["u3"], retry),
+            (ids["u4"], {"outcome": "error", "http_status": 404, "canon_error": "404"}),
+        ],
+    )
+    assert updated == 4
+
+    rows = {
+        r["out_url"]: r
+        for r in conn.execute(
+            "SELECT out_url, canonical_status, canonical_url, canon_error, attempt_count, "
+            "next_retry_at, last_attempt_at, promote_status FROM email_job_hits"
+        ).fetchall()
+    }
+    assert rows["u1"]["canonical_status"] == "ok"
+    assert rows["u1"]["canonical_url"] == "https://www.seek.com.au/job/1"
+    assert rows["u1"]["canon_error"] is None
+    assert rows["u1"]["next_retry_at"] is None
+    assert rows["u4"]["promote_status"] == "rejected"
+    assert [rows[u]["attempt_count"] for u in ("u1", "u2", "u3", "u4")] == [1, 4, 21, 2]
+
+    def delay_minutes(row) -> float:
+        retry_at = datetime.fromisoformat(row["next_retry_at"])
+        return (retry_at - datetime.fromisoformat(row["last_attempt_at"])).total_seconds() / 60
+
+    assert delay_minutes(rows["u2"]) == 16
+    assert delay_minutes(rows["u3"]) == 24 * 60
+
+
+def test_update_job_hits_canonicalization_rejects_unknown_outcome(conn):
+    with pytest.raises(ValueError):
+        update_job_hits_canonicalization(conn, [(1, {"outcome": "maybe"})])
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from hiring_compass_au.infra.storage import mail_store
+from hiring_compass_au.infra.storage.blob_store import HtmlBlobStore, html_sha256
+from hiring_compass_au.services.job_alerts import pipeline as pipeline_mod
+from hiring_compass_au.services.job_alerts.parsers import runner as runner_mod
+
+
+def _insert_indexed(conn, message_ids):
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES (?, ?, 'indexed', '2026-01-01T00:00:00+00:00')",
+        [(m, f"t-{m}") for m in message_ids],
+    )
+    conn.commit()
+
+
+def test_blob_store_writes_identical_bodies_once(tmp_path):
+    store = HtmlBlobStore(tmp_path)
+    html = "<html>Café</html>"
+
+    d1 = store.put(html)
+    d2 = store.put(html)
+
+    assert d1 == d2 == html_sha256(html)
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [d1]
+    assert store.read_html(d1) == html
+
+
+def test_fetch_with_blob_store_keeps_only_digest_and_parse_reads_blob(conn, tmp_path, monkeypatch):
+    store = HtmlBlobStore(tmp_path)
+    html = "<html>same body</html>"
+    _insert_indexed(conn, ["m1", "m2"])
+
+    mail_store.update_fetched_email_metadata(
+        conn,
+        [
+            {"message_id": m, "internal_date_ms": i, "from_email": "a@b.com", "html_raw": html}
+            for i, m in enumerate(["m1", "m2"])
+        ],
+        blob_store=store,
+    )
+
+    rows = conn.execute("SELECT html_raw, html_sha256 FROM emails").fetchall()
+    assert [(r["html_raw"], r["html_sha256"]) for r in rows] == [(None, html_sha256(html))] * 2
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+    seen = []
+
+    def fake_parse_email(_from_email, html_raw):
+        seen.append(html_raw)
+        return None, None
+
+    monkeypatch.setattr(runner_mod, "parse_email", fake_parse_email)
+    result = runner_mod.run_mail_parse(conn, blob_store=store)
+
+    assert seen == [html, html]
+    assert result[4] == 2  # unsupported
+
+
+def test_blob_bodies_stay_readable_when_blob_writes_are_turned_off(conn, tmp_path, monkeypatch):
+    html = "<html>stored as blob</html>"
+    _insert_indexed(conn, ["m1"])
+    mail_store.update_fetched_email_metadata(
+        conn,
+        [{"message_id": "m1", "from_email": "a@b.com", "html_raw": html}],
+        blob_store=HtmlBlobStore(tmp_path),
+    )
+
+    seen = []
+
+    def fake_parse_email(_from_email, html_raw):
+        seen.append(html_raw)
+        return None, None
+
+    monkeypatch.setattr(runner_mod, "parse_email", fake_parse_email)
+    results = pipeline_mod.run_job_alert_pipeline(
+        conn,
+        Path("ignored"),
+        Path("ignored"),
+        "127.0.0.1",
+        0,
+        False,
+        index=False,
+        fetch=False,
+        canonicalize=False,
+        promote=False,
+        html_blob_dir=tmp_path,
+        html_blob_store=False,
+        progress=False,
+    )
+
+    assert seen == [html]
+    assert results["parse"]["error"] == 0
+    row = conn.execute("SELECT status FROM emails WHERE message_id='m1'").fetchone()
+    assert row["status"] == "parsed_unsupported"
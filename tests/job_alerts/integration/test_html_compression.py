@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import sqlite3
+
+from hiring_compass_au.infra.storage import mail_store
+from hiring_compass_au.infra.storage.html_codec import is_compressed_html
+from hiring_compass_au.infra.storage.migrations import apply_migrations
+from hiring_compass_au.infra.storage.migrations import (
+    migration_0003_compress_html_raw as migration_0003,
+)
+from hiring_compass_au.infra.storage.schema import init_all_tables
+
+
+def _html(i: int) -> str:
+    card = '<td style="padding:0 0 8px 0;font-family:Arial"><a href="https://x/{}">Job {}</a></td>'
+    return "<html><body><table>" + "".join(card.format(i, j) for j in range(5)) + "</table></html>"
+
+
+def _insert_text_rows(conn, n: int) -> None:
+    now = "2026-01-01T00:00:00+00:00"
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, internal_date_ms, "
+        "from_email, html_raw) VALUES (?, ?, 'fetched', ?, ?, 'a@b.com', ?)",
+        [(f"m{i}", f"t{i}", now, i, _html(i)) for i in range(n)],
+    )
+    conn.commit()
+
+
+def test_fetched_html_is_stored_compressed_and_read_back(conn):
+    conn.execute(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES ('m1', 't1', 'indexed', '2026-01-01T00:00:00+00:00')"
+    )
+    mail_store.update_fetched_email_metadata(
+        conn,
+        [
+            {
+                "message_id": "m1",
+                "internal_date_ms": 1,
+                "from_email": "a@b.com",
+                "html_raw": _html(1),
+            }
+        ],
+    )
+    conn.commit()
+
+    stored = conn.execute("SELECT html_raw FROM emails WHERE message_id='m1'").fetchone()[0]
+    assert is_compressed_html(stored)
+
+    rows = list(mail_store.get_fetched_emails_to_parse(conn))
+    assert [r["html_raw"] for r in rows] == [_html(1)]
+
+
+def test_migration_compresses_legacy_text_rows_with_trained_dict(conn, monkeypatch):
+    monkeypatch.setattr(migration_0003, "PAGE_SIZE", 7)
+    _insert_text_rows(conn, 25)
+
+    assert migration_0003.apply(conn) is True
+    conn.commit()
+
+    assert conn.execute("SELECT COUNT(*) FROM html_zdicts").fetchone()[0] == 1
+    types = conn.execute("SELECT DISTINCT typeof(html_raw) FROM emails").fetchall()
+    assert [t[0] for t in types] == ["blob"]
+
+    rows = list(mail_store.get_fetched_emails_to_parse(conn))
+    assert [r["html_raw"] for r in rows] == [_html(i) for i in range(25)]
+
+    # Nothing left to do on a second run
+    assert migration_0003.apply(conn) is False
+
+
+def test_migration_skips_dictionary_for_small_mailboxes(conn):
+    _insert_text_rows(conn, 3)
+
+    assert migration_0003.apply(conn) is True
+    assert conn.execute("SELECT COUNT(*) FROM html_zdicts").fetchone()[0] == 0
+    rows = list(mail_store.get_fetched_emails_to_parse(conn))
+    assert [r["html_raw"] for r in rows] == [_html(i) for i in range(3)]
+
+
+def _fetch_rows(conn, ids) -> None:
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES (?, ?, 'indexed', '2026-01-01T00:00:00+00:00')",
+        [(f"m{i}", f"t{i}") for i in ids],
+    )
+    mail_store.update_fetched_email_metadata(
+        conn,
+        [
+            {
+                "message_id": f"m{i}",
+                "internal_date_ms": i,
+                "from_email": "a@b.com",
+                "html_raw": _html(i),
+            }
+            for i in ids
+        ],
+    )
+
+
+def test_new_database_trains_dictionary_once_enough_bodies_are_fetched(conn):
+    _fetch_rows(conn, range(5))
+    assert mail_store.train_html_zdict(conn) == 0
+
+    _fetch_rows(conn, range(5, 25))
+    dict_id = mail_store.train_html_zdict(conn)
+    assert dict_id == 1
+    # trained once only
+    assert mail_store.train_html_zdict(conn) == 0
+
+    _fetch_rows(conn, [25])
+    stored = conn.execute("SELECT html_raw FROM emails WHERE message_id = 'm25'").fetchone()[0]
+    assert stored[4:8] == dict_id.to_bytes(4, "big")
+
+    rows = list(mail_store.get_fetched_emails_to_parse(conn))
+    assert [r["html_raw"] for r in rows] == [_html(i) for i in range(26)]
+
+
+def test_migrations_vacuum_after_compressing_html(tmp_path):
+    conn = sqlite3.connect(tmp_path / "mail.db")
+    try:
+        init_all_tables(conn)
+        _insert_text_rows(conn, 200)
+        pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+
+        assert apply_migrations(conn) is True
+
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert conn.execute("PRAGMA page_count").fetchone()[0] < pages_before
+    finally:
+        conn.close()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import base64
+
+from hiring_compass_au.infra.storage.html_codec import decompress_html
+from hiring_compass_au.services.job_alerts.ingestion import mail_fetch as mail_fetch_mod
+
+
+def _message(message_id: str) -> dict:
+    html = base64.urlsafe_b64encode(f"<html>{message_id}</html>".encode()).decode()
+    return {
+        "id": message_id,
+        "internalDate": "1000",
+        "payload": {
+            "mimeType": "text/html",
+            "headers": [
+                {"name": "From", "value": "SEEK <jobmail@s.seek.com.au>"},
+                {"name": "Subject", "value": "New jobs"},
+            ],
+            "body": {"data": html},
+        },
+    }
+
+
+class FakeRequest:
+    def __init__(self, message_id):
+        self.message_id = message_id
+
+    def execute(self):
+        raise AssertionError("batch mode must not execute requests one by one")
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([request_id for request_id, _ in self.requests])
+        for request_id, request in self.requests:
+            if request.message_id == "m2":
+                self.callback(request_id, None, RuntimeError("boom"))
+            else:
+                self.callback(request_id, _message(request.message_id), None)
+
+
+class FakeService:
+    def __init__(self):
+        self.batches = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format, fields=None):
+        return FakeRequest(id)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+
+def test_run_mail_fetch_batch_requests_maps_errors_to_fetch_error(conn):
+    now = "2026-01-01T00:00:00+00:00"
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) VALUES (?, ?, 'indexed', ?)",
+        [("m1", "t1", now), ("m2", "t2", now), ("m3", "t3", now)],
+    )
+    conn.commit()
+
+    service = FakeService()
+    result = mail_fetch_mod.run_mail_fetch(
+        service=service, conn=conn, batch_size=2, batch_requests=True
+    )
+    assert result == (3, 2, 1, 3)
+    assert service.batches == [["m1", "m2"], ["m3"]]
+
+    rows = conn.execute(
+        "SELECT message_id, status, from_email, html_raw, error FROM emails ORDER BY message_id"
+    ).fetchall()
+    by_id = {r["message_id"]: r for r in rows}
+    assert by_id["m1"]["status"] == "fetched"
+    assert by_id["m1"]["from_email"] == "jobmail@s.seek.com.au"
+    assert decompress_html(by_id["m1"]["html_raw"]) == "<html>m1</html>"
+    assert by_id["m2"]["status"] == "fetch_error"
+    assert "boom" in by_id["m2"]["error"]
+
+
+def test_fetch_message_rows_batched_splits_at_gmail_batch_limit(monkeypatch):
+    monkeypatch.setattr(mail_fetch_mod, "GMAIL_BATCH_MAX_REQUESTS", 2)
+    service = FakeService()
+
+    rows = mail_fetch_mod.fetch_message_rows_batched(service, ["m1", "m3", "m4"])
+
+    assert service.batches == [["m1", "m3"], ["m4"]]
+    assert [r["message_id"] for r in rows] == ["m1", "m3", "m4"]
+    assert all(r["error"] is None for r in rows)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import base64
+
+from hiring_compass_au.services.job_alerts.ingestion import mail_fetch as mail_fetch_mod
+
+SENDERS = {"m1": "jobmail@s.seek.com.au", "m2": "news@example.com", "m3": "jobmail@s.seek.com.au"}
+
+
+class FakeRequest:
+    def __init__(self, service, message_id, format):
+        self.service = service
+        self.message_id = message_id
+        self.format = format
+
+    def execute(self):
+        self.service.calls.append((self.format, self.message_id))
+        headers = [
+            {"name": "From", "value": f"Sender <{SENDERS[self.message_id]}>"},
+            {"name": "Subject", "value": f"Subject {self.message_id}"},
+        ]
+        if self.format == "metadata":
+            return {"internalDate": "1000", "payload": {"headers": headers}}
+
+        html = base64.urlsafe_b64encode(f"<html>{self.message_id}</html>".encode()).decode()
+        return {
+            "internalDate": "1000",
+            "payload": {"mimeType": "text/html", "headers": headers, "body": {"data": html}},
+        }
+
+
+class FakeService:
+    def __init__(self):
+        self.calls = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format, fields=None, metadataHeaders=None):
+        return FakeRequest(self, id, format)
+
+
+def test_metadata_first_skips_body_of_unsupported_senders(conn):
+    now = "2026-01-01T00:00:00+00:00"
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) VALUES (?, ?, 'indexed', ?)",
+        [("m1", "t1", now), ("m2", "t2", now), ("m3", "t3", now)],
+    )
+    conn.commit()
+
+    service = FakeService()
+    stats: dict = {}
+    result = mail_fetch_mod.run_mail_fetch(
+        service=service, conn=conn, batch_size=2, metadata_first=True, stats=stats
+    )
+
+    assert result == (2, 2, 0, 2)
+    assert stats["unsupported"] == 1
+    assert [c for c in service.calls if c[0] == "metadata"] == [
+        ("metadata", "m1"),
+        ("metadata", "m2"),
+        ("metadata", "m3"),
+    ]
+    assert [c for c in service.calls if c[0] == "full"] == [("full", "m1"), ("full", "m3")]
+
+    rows = conn.execute(
+        "SELECT message_id, status, from_email, subject, html_raw, fetched_at FROM emails "
+        "ORDER BY message_id"
+    ).fetchall()
+    by_id = {r["message_id"]: r for r in rows}
+    assert by_id["m2"]["status"] == "parsed_unsupported"
+    assert by_id["m2"]["from_email"] == "news@example.com"
+    assert by_id["m2"]["subject"] == "Subject m2"
+    assert by_id["m2"]["html_raw"] is None
+    assert by_id["m2"]["fetched_at"] is not None
+    assert by_id["m1"]["status"] == by_id["m3"]["status"] == "fetched"
+
+    # nothing left for the next run
+    result = mail_fetch_mod.run_mail_fetch(service=service, conn=conn, metadata_first=True)
+    assert result == (0, 0, 0, 0)
+
+
+def test_metadata_first_is_decided_per_message(conn):
+    now = "2026-01-01T00:00:00+00:00"
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, from_email, status, indexed_at) "
+        "VALUES (?, ?, ?, 'indexed', ?)",
+        [
+            ("m1", "t1", "jobmail@s.seek.com.au", now),  # from:(sender) listing
+            ("m2", "t2", None, now),  # sender unknown until its headers are read
+            ("m3", "t3", None, now),
+        ],
+    )
+    conn.commit()
+
+    service = FakeService()
+    result = mail_fetch_mod.run_mail_fetch(service=service, conn=conn, metadata_first=True)
+
+    assert result == (2, 2, 0, 2)
+    assert [c for c in service.calls if c[0] == "metadata"] == [
+        ("metadata", "m2"),
+        ("metadata", "m3"),
+    ]
+    assert sorted(c[1] for c in service.calls if c[0] == "full") == ["m1", "m3"]
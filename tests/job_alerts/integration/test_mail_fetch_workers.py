@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+
+from hiring_compass_au.services.job_alerts.ingestion import mail_fetch as mail_fetch_mod
+
+
+def test_run_mail_fetch_workers_use_one_service_per_thread(conn, monkeypatch):
+    now = "2026-01-01T00:00:00+00:00"
+    ids = [f"m{i}" for i in range(10)]
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES (?, 't', 'indexed', ?)",
+        [(message_id, now) for message_id in ids],
+    )
+    conn.commit()
+
+    built = []
+    lock = threading.Lock()
+
+    def service_factory():
+        service = {"thread": threading.get_ident()}
+        with lock:
+            built.append(service)
+        return service
+
+    def fake_load(service, message_id, profile="full"):
+        # every call must go through the service owned by the calling thread
+        assert service["thread"] == threading.get_ident()
+        if message_id == "m3":
+            raise RuntimeError("boom")
+        return {"id": message_id}
+
+    def fake_extract(message):
+        return {
+            "from_email": "jobmail@s.seek.com.au",
+            "subject": message["id"],
+            "internal_date_ms": 1,
+            "html_raw": "<html></html>",
+            "error": None,
+        }
+
+    monkeypatch.setattr(mail_fetch_mod, "load_message", fake_load)
+    monkeypatch.setattr(mail_fetch_mod, "extract_message_fields", fake_extract)
+
+    result = mail_fetch_mod.run_mail_fetch(
+        service=None,
+        conn=conn,
+        batch_size=2,
+        workers=3,
+        service_factory=service_factory,
+        quota_units_per_s=1000,
+    )
+    assert result == (10, 9, 1, 10)
+    assert 1 <= len(built) <= 3
+
+    statuses = dict(conn.execute("SELECT message_id, status FROM emails").fetchall())
+    assert statuses["m3"] == "fetch_error"
+    assert sum(1 for s in statuses.values() if s == "fetched") == 9
+
+
+def _iter_batches(id_batches):
+    return mail_fetch_mod._iter_fetched_batches(
+        None,
+        id_batches,
+        batch_requests=False,
+        workers=2,
+        service_factory=dict,
+        quota=None,
+        profile="full",
+    )
+
+
+def test_fetch_workers_submit_batches_as_earlier_ones_complete(monkeypatch):
+    pulled = []
+
+    def id_batches():
+        for i in range(100):
+            pulled.append(i)
+            yield [f"m{i}"]
+
+    monkeypatch.setattr(
+        mail_fetch_mod, "_fetch_batch", lambda _service, id_batch, *_args: (id_batch, {})
+    )
+
+    batches = _iter_batches(id_batches())
+    next(batches)
+    assert len(pulled) == 2 * mail_fetch_mod.FETCH_WINDOW_PER_WORKER
+    batches.close()
+    assert len(pulled) < 100
+
+    rows = [row for rows, _ in _iter_batches(id_batches()) for row in rows]
+    assert sorted(rows) == sorted(f"m{i}" for i in range(100))
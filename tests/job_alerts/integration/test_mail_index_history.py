@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from hiring_compass_au.infra.storage.mail_store import (
+    get_history_id,
+    get_non_fetched_email_senders,
+    set_history_id,
+)
+from hiring_compass_au.services.job_alerts.ingestion.mail_index import (
+    run_mail_index_incremental,
+)
+
+
+class FakeCall:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeService:
+    def __init__(self, history=None, profile_history_id="200", messages=()):
+        self.history_result = history
+        self.profile_history_id = profile_history_id
+        self.messages_result = list(messages)
+        self.calls = []
+
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        self.calls.append("getProfile")
+        return FakeCall({"historyId": self.profile_history_id})
+
+    def history(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, pageToken=None, maxResults=None, **kwargs):
+        if "startHistoryId" in kwargs:
+            self.calls.append("history.list")
+            return FakeCall(self.history_result)
+        self.calls.append("messages.list")
+        return FakeCall({"messages": self.messages_result})
+
+
+def test_first_run_uses_query_path_and_stores_history_id(conn):
+    service = FakeService(messages=[{"id": "m1", "threadId": "t1"}])
+
+    inserted, found, mode = run_mail_index_incremental(["jobmail@s.seek.com.au"], service, conn)
+
+    assert (inserted, found, mode) == (1, 1, "query")
+    assert service.calls == ["getProfile", "messages.list"]
+    assert get_history_id(conn) == "200"
+
+
+def test_no_added_message_costs_a_single_history_call(conn):
+    set_history_id(conn, "100")
+    service = FakeService(history={"historyId": "150"})
+
+    inserted, found, mode = run_mail_index_incremental(["jobmail@s.seek.com.au"], service, conn)
+
+    assert (inserted, found, mode) == (0, 0, "history")
+    assert service.calls == ["history.list"]
+    assert get_history_id(conn) == "150"
+
+
+def test_drafts_do_not_trigger_a_query(conn):
+    set_history_id(conn, "100")
+    history = {
+        "historyId": "150",
+        "history": [{"messagesAdded": [{"message": {"id": "d1", "labelIds": ["DRAFT"]}}]}],
+    }
+    service = FakeService(history=history)
+
+    _, _, mode = run_mail_index_incremental(["jobmail@s.seek.com.au"], service, conn)
+
+    assert mode == "history"
+    assert "messages.list" not in service.calls
+
+
+def test_added_messages_are_indexed_from_history_alone(conn):
+    set_history_id(conn, "100")
+    history = {
+        "historyId": "150",
+        "history": [
+            {"messagesAdded": [{"message": {"id": "m1", "threadId": "t1", "labelIds": ["INBOX"]}}]},
+            {"messagesAdded": [{"message": {"id": "m2", "threadId": "t2", "labelIds": ["INBOX"]}}]},
+        ],
+    }
+    service = FakeService(history=history)
+
+    inserted, found, mode = run_mail_index_incremental(["jobmail@s.seek.com.au"], service, conn)
+
+    assert (inserted, found, mode) == (2, 2, "history")
+    assert service.calls == ["history.list"]  # no sender listing, no getProfile
+    assert get_history_id(conn) == "150"
+    # the sender is read in the fetch step
+    assert get_non_fetched_email_senders(conn) == [("m1", None), ("m2", None)]
+
+
+def test_expired_history_falls_back_to_query(conn):
+    set_history_id(conn, "100")
+    expired = HttpError(resp=httplib2.Response({"status": 404}), content=b"")
+    service = FakeService(
+        history=expired, profile_history_id="300", messages=[{"id": "m1", "threadId": "t1"}]
+    )
+
+    _, found, mode = run_mail_index_incremental(["jobmail@s.seek.com.au"], service, conn)
+
+    assert (found, mode) == (1, "query")
+    assert service.calls == ["history.list", "getProfile", "messages.list"]
+    assert get_history_id(conn) == "300"
+    assert get_non_fetched_email_senders(conn) == [("m1", "jobmail@s.seek.com.au")]
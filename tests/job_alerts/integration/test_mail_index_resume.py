@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+from hiring_compass_au.infra.storage.mail_store import get_index_checkpoint
+from hiring_compass_au.services.job_alerts.ingestion.mail_index import run_mail_index
+
+PAGES = {
+    None: {"messages": [{"id": "m1", "threadId": "t1"}], "nextPageToken": "p2"},
+    "p2": {"messages": [{"id": "m2", "threadId": "t2"}], "nextPageToken": "p3"},
+    "p3": {"messages": [{"id": "m3", "threadId": "t3"}]},
+}
+
+
+class FakeCall:
+    def __init__(self, service, token):
+        self.service = service
+        self.token = token
+
+    def execute(self):
+        if self.token == self.service.fail_on:
+            raise RuntimeError("crash")
+        return PAGES[self.token]
+
+
+class FakeService:
+    def __init__(self, fail_on="__never__"):
+        self.fail_on = fail_on
+        self.tokens = []
+        self.calls = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, q, pageToken, maxResults):
+        self.tokens.append(pageToken)
+        self.calls.append((q, pageToken))
+        return FakeCall(self, pageToken)
+
+
+def _indexed_ids(conn):
+    return [r[0] for r in conn.execute("SELECT message_id FROM emails ORDER BY message_id")]
+
+
+def test_run_mail_index_upserts_each_page_and_resumes_after_crash(conn):
+    sender = "jobmail@s.seek.com.au"
+
+    with pytest.raises(RuntimeError):
+        run_mail_index(sender, FakeService(fail_on="p3"), conn)
+
+    # pages listed before the crash are persisted with the checkpoint of the next page
+    assert _indexed_ids(conn) == ["m1", "m2"]
+    checkpoint = get_index_checkpoint(conn, sender)
+    assert checkpoint["page_token"] == "p3"
+    assert checkpoint["pages_done"] == 2
+
+    service = FakeService()
+    inserted, found = run_mail_index(sender, service, conn)
+
+    assert service.tokens == ["p3"]
+    assert (inserted, found) == (1, 1)
+    assert _indexed_ids(conn) == ["m1", "m2", "m3"]
+    assert get_index_checkpoint(conn, sender) is None
+
+
+def test_run_mail_index_finishes_interrupted_listing_after_a_fetch(conn):
+    sender = "jobmail@s.seek.com.au"
+    with pytest.raises(RuntimeError):
+        run_mail_index(sender, FakeService(fail_on="p2"), conn)
+
+    # m1 fetched meanwhile: the current query now carries an after: bound
+    conn.execute(
+        "UPDATE emails SET status = 'fetched', from_email = ?, internal_date_ms = ? "
+        "WHERE message_id = 'm1'",
+        (sender, 1_700_000_000_000),
+    )
+    conn.commit()
+
+    service = FakeService()
+    inserted, found = run_mail_index(sender, service, conn)
+
+    # older pages are listed with the interrupted query, then the current one from the top
+    assert service.calls == [
+        (f"from:({sender})", "p2"),
+        (f"from:({sender})", "p3"),
+        (f"from:({sender}) after:1699996400", None),
+        (f"from:({sender}) after:1699996400", "p2"),
+        (f"from:({sender}) after:1699996400", "p3"),
+    ]
+    assert inserted == 2
+    assert found == 5
+    assert _indexed_ids(conn) == ["m1", "m2", "m3"]
+    assert get_index_checkpoint(conn, sender) is None
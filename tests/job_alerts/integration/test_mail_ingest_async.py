@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import sqlite3
+import threading
+
+import httpx
+import pytest
+
+from hiring_compass_au.infra.storage.mail_store import upsert_indexed_emails
+from hiring_compass_au.services.job_alerts.ingestion import async_engine
+
+
+def _message(message_id: str) -> dict:
+    html = base64.urlsafe_b64encode(f"<html>{message_id}</html>".encode()).decode()
+    return {
+        "id": message_id,
+        "internalDate": "1000",
+        "payload": {
+            "mimeType": "text/html",
+            "headers": [{"name": "From", "value": "SEEK <jobmail@s.seek.com.au>"}],
+            "body": {"data": html},
+        },
+    }
+
+
+class FakeGmail:
+    """messages.list in two pages, messages.get answers 429 once for m2."""
+
+    def __init__(self):
+        self.calls = []
+        self.throttled = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.rsplit("/", 1)[-1]
+
+        if path == "messages":
+            token = request.url.params.get("pageToken")
+            self.calls.append(("list", token))
+            # listing is slow: other coroutines run meanwhile
+            for _ in range(5):
+                await asyncio.sleep(0)
+            self.calls.append(("listed", token))
+            if token is None:
+                return httpx.Response(
+                    200,
+                    json={
+                        "messages": [
+                            {"id": "m1", "threadId": "t1"},
+                            {"id": "m2", "threadId": "t2"},
+                        ],
+                        "nextPageToken": "p2",
+                    },
+                )
+            return httpx.Response(200, json={"messages": [{"id": "m3", "threadId": "t3"}]})
+
+        self.calls.append(("get", path))
+        await asyncio.sleep(0)
+        if path == "m2" and path not in self.throttled:
+            self.throttled.add(path)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if path == "m3":
+            return httpx.Response(404, json={"error": {"code": 404}})
+        return httpx.Response(200, json=_message(path))
+
+
+def _run(conn, gmail: FakeGmail, timeout_s: float = 10, **kwargs) -> dict:
+    async def ingest():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(gmail), base_url=async_engine.GMAIL_API_URL + "/"
+        ) as http:
+            client = async_engine.GmailAsyncClient(http, sleep=_no_sleep)
+            return await async_engine.run_mail_ingest_async(
+                client, conn, ["jobmail@s.seek.com.au"], **kwargs
+            )
+
+    async def main():
+        return await asyncio.wait_for(ingest(), timeout_s)
+
+    return asyncio.run(main())
+
+
+async def _no_sleep(_seconds):
+    return None
+
+
+def test_async_ingest_fetches_while_listing_and_retries_throttled_calls(conn):
+    gmail = FakeGmail()
+
+    result = _run(conn, gmail, concurrency=2, batch_size=2)
+
+    assert result["found"] == 3
+    assert result["inserted"] == 3
+    assert (result["to_fetch"], result["ok"], result["error"], result["persisted"]) == (3, 2, 1, 3)
+    assert result["retries"] == 1
+
+    # first page ids are fetched before the last page is listed
+    assert gmail.calls.index(("get", "m1")) < gmail.calls.index(("listed", "p2"))
+
+    rows = conn.execute("SELECT message_id, status FROM emails ORDER BY message_id").fetchall()
+    assert [(r["message_id"], r["status"]) for r in rows] == [
+        ("m1", "fetched"),
+        ("m2", "fetched"),
+        ("m3", "fetch_error"),
+    ]
+    assert conn.execute("SELECT COUNT(*) FROM mail_index_checkpoints").fetchone()[0] == 0
+
+
+def test_retry_delay_follows_backoff_schedule_in_seconds():
+    assert async_engine.retry_delay_s(1) == 2.0
+    assert async_engine.retry_delay_s(3) == 8.0
+    assert async_engine.retry_delay_s(30) == 1440.0
+    assert async_engine.retry_delay_s(1, retry_after="7") == 7.0
+
+
+def test_async_ingest_fails_fast_when_a_fetcher_raises(conn, monkeypatch):
+    def failing_update(*_args, **_kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(async_engine, "update_fetched_email_metadata", failing_update)
+
+    # a one-slot queue stays full while the fetcher fails
+    with pytest.raises(sqlite3.OperationalError):
+        _run(conn, FakeGmail(), timeout_s=5, concurrency=1, batch_size=1)
+
+
+class InterruptedGmail(FakeGmail):
+    """Records the list queries; listing the second page fails once."""
+
+    def __init__(self, fail_second_page: bool):
+        super().__init__()
+        self.fail_second_page = fail_second_page
+        self.queries = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/messages"):
+            token = request.url.params.get("pageToken")
+            self.queries.append((request.url.params.get("q"), token))
+            if token == "p2" and self.fail_second_page:
+                # let the fetchers store the first page before failing
+                for _ in range(10):
+                    await asyncio.sleep(0)
+                return httpx.Response(403, json={"error": {"code": 403}})
+        return await super().__call__(request)
+
+
+def test_async_ingest_resumes_interrupted_listing_after_fetching_newer_mail(conn):
+    sender = "jobmail@s.seek.com.au"
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(conn, InterruptedGmail(fail_second_page=True), concurrency=2, batch_size=1)
+
+    # first page fetched: the current query now has an after: bound
+    fetched = conn.execute("SELECT COUNT(*) FROM emails WHERE status = 'fetched'").fetchone()[0]
+    assert fetched >= 1
+    checkpoint = conn.execute("SELECT query, page_token FROM mail_index_checkpoints").fetchone()
+    assert tuple(checkpoint) == (f"from:({sender})", "p2")
+
+    gmail = InterruptedGmail(fail_second_page=False)
+    _run(conn, gmail, concurrency=2, batch_size=1)
+
+    assert gmail.queries[0] == (f"from:({sender})", "p2")
+    assert gmail.queries[1][0].startswith(f"from:({sender}) after:")
+    ids = conn.execute("SELECT message_id FROM emails ORDER BY message_id").fetchall()
+    assert [r[0] for r in ids] == ["m1", "m2", "m3"]
+    assert conn.execute("SELECT COUNT(*) FROM mail_index_checkpoints").fetchone()[0] == 0
+
+
+class HistoryGmail:
+    """Nothing new to list; headers say h1 is from SEEK and h2 from an unknown sender."""
+
+    def __init__(self):
+        self.gets = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.rsplit("/", 1)[-1]
+        if path == "messages":
+            return httpx.Response(200, json={})
+
+        self.gets.append((path, request.url.params.get("format")))
+        message = _message(path)
+        if path == "h2":
+            message["payload"]["headers"] = [{"name": "From", "value": "news@example.com"}]
+        return httpx.Response(200, json=message)
+
+
+def test_async_ingest_reads_headers_first_only_for_unknown_senders(conn):
+    upsert_indexed_emails(conn, [{"id": "h1"}, {"id": "h2"}])
+    upsert_indexed_emails(conn, [{"id": "s1"}], from_email="jobmail@s.seek.com.au")
+    gmail = HistoryGmail()
+
+    result = _run(conn, gmail, metadata_first=True)
+
+    assert sorted(gmail.gets) == [
+        ("h1", "full"),
+        ("h1", "metadata"),
+        ("h2", "metadata"),
+        ("s1", "full"),
+    ]
+    assert result["unsupported"] == 1
+    assert result["to_fetch"] == 2
+    rows = conn.execute("SELECT message_id, status FROM emails ORDER BY message_id").fetchall()
+    assert [(r["message_id"], r["status"]) for r in rows] == [
+        ("h1", "fetched"),
+        ("h2", "parsed_unsupported"),
+        ("s1", "fetched"),
+    ]
+
+
+def _get_json(handler, path: str = "messages/m1"):
+    async def main():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url=async_engine.GMAIL_API_URL + "/"
+        ) as http:
+            client = async_engine.GmailAsyncClient(http, sleep=_no_sleep)
+            return await client.get_json(path, {}, 5), client.retries
+
+    return asyncio.run(main())
+
+
+def test_get_json_retries_rate_limit_403_and_transport_errors():
+    responses = iter(
+        [
+            httpx.Response(403, json={"error": {"errors": [{"reason": "userRateLimitExceeded"}]}}),
+            httpx.ConnectTimeout("timed out"),
+            httpx.Response(200, json={"id": "m1"}),
+        ]
+    )
+
+    def handler(request):
+        outcome = next(responses)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert _get_json(handler) == ({"id": "m1"}, 2)
+
+
+def test_get_json_does_not_retry_other_403():
+    def handler(request):
+        return httpx.Response(403, json={"error": {"errors": [{"reason": "forbidden"}]}})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _get_json(handler)
+
+
+class ExpiredCreds:
+    def __init__(self):
+        self.valid = False
+        self.token = None
+        self.refresh_threads = []
+
+    def refresh(self, _request):
+        self.refresh_threads.append(threading.current_thread())
+        self.valid = True
+        self.token = "fresh"
+
+
+def test_async_auth_refreshes_once_off_the_event_loop(monkeypatch):
+    creds = ExpiredCreds()
+    monkeypatch.setattr(async_engine, "_refresh_creds", lambda c: c.refresh(None))
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={})
+
+    async def main():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            base_url=async_engine.GMAIL_API_URL + "/",
+            auth=async_engine.GoogleCredentialsAuth(creds),
+        ) as http:
+            await asyncio.gather(*(http.get("messages") for _ in range(4)))
+
+    asyncio.run(main())
+    assert seen == ["Bearer fresh"] * 4
+    assert len(creds.refresh_threads) == 1
+    assert creds.refresh_threads[0] is not threading.main_thread()
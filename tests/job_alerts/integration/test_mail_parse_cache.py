@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hiring_compass_au.services.job_alerts.parsers.runner as runner_mod
+from hiring_compass_au.infra.storage.parse_cache_store import (
+    evict_parse_cache,
+    put_cached_parse,
+)
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import PARSER_CONFIGS
+
+CARD = """
+<a href="https://email.s.seek.com.au/uni/ss/c/{key}">
+  <div style="color:#2e3849; font-size:16px; font-weight:700;">Data Engineer</div>
+  <div style="color:#5a6881; font-size:14px; font-weight:400;">Acme Pty Ltd</div>
+  <div>Sydney NSW</div>
+</a>
+"""
+HTML = "<html><body>" + CARD.format(key="a") + CARD.format(key="b") + "</body></html>"
+
+
+def _seed(conn, ids) -> None:
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, html_raw, from_email, "
+        "internal_date_ms) VALUES (?, ?, 'fetched', 'x', ?, 'jobmail@s.seek.com.au', ?)",
+        [(m, m, HTML, i) for i, m in enumerate(ids)],
+    )
+    conn.commit()
+
+
+def _count_parses(monkeypatch) -> list:
+    calls = []
+    real_parse_email = runner_mod.parse_email
+
+    def counting_parse_email(from_email, html_raw):
+        calls.append(from_email)
+        return real_parse_email(from_email, html_raw)
+
+    monkeypatch.setattr(runner_mod, "parse_email", counting_parse_email)
+    return calls
+
+
+def _hits(conn):
+    rows = conn.execute(
+        "SELECT message_id, out_url, title, debug_lines, hit_confidence FROM email_job_hits "
+        "ORDER BY 1, 2"
+    ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_identical_bodies_are_parsed_once_per_parser_version(conn, monkeypatch):
+    calls = _count_parses(monkeypatch)
+    _seed(conn, ["m1", "m2", "m3"])
+
+    stats = {}
+    result = runner_mod.run_mail_parse(conn, cache=True, stats=stats)
+
+    assert result[:5] == (3, 6, 0, 0, 0)
+    assert len(calls) == 1
+    assert stats == {"cache_hits": 2, "cache_misses": 1, "cache_evicted": 0}
+    hits = _hits(conn)
+    assert [h[1:] for h in hits if h[0] == "m1"] == [h[1:] for h in hits if h[0] == "m3"]
+
+    # same cached result as a real parse
+    _seed(conn, ["m4"])
+    runner_mod.run_mail_parse(conn)
+    assert [h[1:] for h in _hits(conn) if h[0] == "m4"] == [h[1:] for h in hits if h[0] == "m1"]
+
+    # a new parser version does not read the old entries
+    parser_cfg = PARSER_CONFIGS["jobmail@s.seek.com.au"]
+    version = parser_cfg["parser_version"]
+    monkeypatch.setitem(parser_cfg, "parser_version", version + "-next")
+    _seed(conn, ["m5"])
+    stats = {}
+    runner_mod.run_mail_parse(conn, cache=True, stats=stats)
+    assert (stats["cache_hits"], stats["cache_misses"]) == (0, 1)
+    assert conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0] == 2
+
+    # the HTML engine is part of the key
+    versions = {r[0] for r in conn.execute("SELECT parser_version FROM parse_cache")}
+    assert versions == {f"{v}/{parser_cfg['engine']}" for v in (version, version + "-next")}
+
+
+def test_failed_parses_leave_no_pending_cache_key(conn, monkeypatch):
+    caches = []
+
+    class RecordingCache(runner_mod.ParseResultCache):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            caches.append(self)
+
+    def failing_parse_email(from_email, html_raw):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(runner_mod, "ParseResultCache", RecordingCache)
+    monkeypatch.setattr(runner_mod, "parse_email", failing_parse_email)
+    _seed(conn, ["m1", "m2"])
+
+    stats = {}
+    result = runner_mod.run_mail_parse(conn, cache=True, stats=stats)
+
+    assert result[3] == 2  # errors
+    assert stats["cache_misses"] == 2
+    assert caches[0]._miss_keys == {}
+    assert conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0] == 0
+
+
+def test_evict_parse_cache_by_age_then_size(conn):
+    for i in range(4):
+        put_cached_parse(conn, f"sha{i}", "seek_mail_parser", "v1", [], 10)
+    conn.execute(
+        "UPDATE parse_cache SET last_used_at = '2000-01-01T00:00:00+00:00' "
+        "WHERE html_sha256 = 'sha0'"
+    )
+    conn.execute(
+        "UPDATE parse_cache SET last_used_at = '2099-01-01T00:00:00+00:00' "
+        "WHERE html_sha256 = 'sha1'"
+    )
+
+    assert evict_parse_cache(conn, max_age_days=30) == 1
+    assert evict_parse_cache(conn, max_entries=2) == 1
+
+    rows = conn.execute("SELECT html_sha256 FROM parse_cache").fetchall()
+    kept = {r[0] for r in rows}
+    assert len(kept) == 2 and "sha1" in kept and "sha0" not in kept
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sqlite3
+
+import hiring_compass_au.services.job_alerts.parsers.runner as runner_mod
+from hiring_compass_au.infra.storage.schema import init_all_tables
+
+PARSER_CFG = {"source": "seek", "parser_name": "seek_mail_parser", "parser_version": "v1"}
+
+
+def _seed(conn, n: int) -> None:
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, html_raw, from_email, "
+        "internal_date_ms) VALUES (?, ?, 'fetched', 'x', '<html/>', 'jobmail@s.seek.com.au', ?)",
+        [(f"m{i}", f"t{i}", i) for i in range(n)],
+    )
+    conn.commit()
+
+
+def _run(conn, monkeypatch, **kwargs):
+    def fake_parse_email(_from_email, _html_raw):
+        hits = iter([{"out_url": "u1", "hit_confidence": 90}, {"out_url": "u2"}])
+        return hits, PARSER_CFG
+
+    real_update = runner_mod.update_parsed_email
+
+    def failing_update(conn, message_id, *args, **kw):
+        # fails after the hits of m2 were written
+        if message_id == "m2" and not kw.get("error"):
+            raise RuntimeError("disk full")
+        return real_update(conn, message_id, *args, **kw)
+
+    monkeypatch.setattr(runner_mod, "parse_email", fake_parse_email)
+    monkeypatch.setattr(runner_mod, "update_parsed_email", failing_update)
+
+    commits = []
+    conn.set_trace_callback(lambda sql: commits.append(sql) if sql == "COMMIT" else None)
+    result = runner_mod.run_mail_parse(conn, **kwargs)
+    conn.set_trace_callback(None)
+    return result, len(commits)
+
+
+def _state(conn):
+    emails = conn.execute("SELECT message_id, status FROM emails ORDER BY message_id").fetchall()
+    hits = conn.execute("SELECT message_id, out_url FROM email_job_hits ORDER BY 1, 2").fetchall()
+    return [tuple(r) for r in emails], [tuple(r) for r in hits]
+
+
+def test_group_commit_rolls_back_only_the_failing_email(conn, monkeypatch):
+    _seed(conn, 5)
+
+    result, commits = _run(conn, monkeypatch, commit_every=3)
+
+    assert result[:5] == (5, 8, 0, 1, 0)
+    assert commits == 2  # 3 emails, then the last 2 at flush
+    emails, hits = _state(conn)
+    assert ("m2", "parsed_error") in emails
+    assert sum(1 for _, status in emails if status == "parsed") == 4
+    assert [h for h in hits if h[0] == "m2"] == []
+    assert len(hits) == 8
+
+
+def test_group_commit_matches_per_email_commit(conn, monkeypatch, tmp_path):
+    _seed(conn, 4)
+    per_email, per_email_commits = _run(conn, monkeypatch)
+
+    other = sqlite3.connect(tmp_path / "grouped.sqlite")
+    other.row_factory = sqlite3.Row
+    init_all_tables(other)
+    _seed(other, 4)
+    grouped, grouped_commits = _run(other, monkeypatch, commit_every=100)
+
+    assert grouped == per_email
+    assert _state(other) == _state(conn)
+    assert (per_email_commits, grouped_commits) == (4, 1)
+    other.close()
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_commit_interval_closes_the_group_early():
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    clock = Clock()
+    committer = runner_mod.ParseCommitter(conn, 100, 50, clock=clock)
+
+    for i in range(3):
+        committer.begin_email()
+        conn.execute("INSERT INTO t VALUES (?)", (i,))
+        clock.now += 0.03
+        committer.email_done()
+
+    # 2nd email is 60ms after the group opened
+    assert committer.commits == 1
+    assert conn.in_transaction
+    committer.flush()
+    assert committer.commits == 2
+
+
+def test_commit_interval_alone_groups_emails_by_time():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    clock = Clock()
+    # commit_every keeps its default
+    committer = runner_mod.ParseCommitter(conn, commit_interval_ms=50, clock=clock)
+    assert committer.grouped
+
+    for i in range(5):
+        committer.begin_email()
+        conn.execute("INSERT INTO t VALUES (?)", (i,))
+        clock.now += 0.02
+        committer.email_done()
+
+    # the group is 60ms old after the 3rd email (>= 50ms), the last 2 go at flush
+    assert committer.commits == 1
+    committer.flush()
+    assert committer.commits == 2
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 5
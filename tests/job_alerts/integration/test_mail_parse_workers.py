@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from hiring_compass_au.infra.storage.schema import init_all_tables
+from hiring_compass_au.services.job_alerts.parsers.runner import run_mail_parse
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+def _seed(conn) -> None:
+    html = (FIXTURES_DIR / "seek_alert_minimal.html").read_text(encoding="utf-8")
+    now = "2026-01-01T00:00:00+00:00"
+    rows = [(f"s{i}", "jobmail@s.seek.com.au", html, None, i) for i in range(6)]
+    rows.append(("u1", "news@example.com", "<html/>", None, 10))
+    # body announced in the blob store, but no store configured
+    rows.append(("b1", "jobmail@s.seek.com.au", None, "ab" * 32, 11))
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, from_email, html_raw, "
+        "html_sha256, internal_date_ms) VALUES (?, ?, 'fetched', ?, ?, ?, ?, ?)",
+        [(m, f"t-{m}", now, f, h, d, ts) for m, f, h, d, ts in rows],
+    )
+    conn.commit()
+
+
+def _snapshot(conn):
+    emails = conn.execute(
+        "SELECT message_id, status, hit_extract_count, parsed_confidence FROM emails "
+        "ORDER BY message_id"
+    ).fetchall()
+    hits = conn.execute(
+        "SELECT message_id, out_url, title, fingerprint, hit_confidence FROM email_job_hits "
+        "ORDER BY message_id"
+    ).fetchall()
+    return [tuple(r) for r in emails], [tuple(r) for r in hits]
+
+
+def test_parallel_parse_matches_serial_parse(conn, tmp_path):
+    _seed(conn)
+    serial = run_mail_parse(conn)
+
+    other = sqlite3.connect(tmp_path / "parallel.sqlite")
+    other.row_factory = sqlite3.Row
+    init_all_tables(other)
+    _seed(other)
+    parallel = run_mail_parse(other, workers=2)
+
+    # emails, hits_upserted, empty, error, unsupported, confidence
+    assert serial[:5] == (8, 6, 0, 1, 1)
+    assert parallel == serial
+    assert _snapshot(other) == _snapshot(conn)
+    other.close()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from hiring_compass_au.services.job_alerts.parsers import reparse as reparse_mod
+from hiring_compass_au.services.job_alerts.parsers.parser_registry import PARSER_CONFIGS
+from hiring_compass_au.services.job_alerts.parsers.runner import run_mail_parse
+
+CARD = """
+<a href="https://email.s.seek.com.au/uni/ss/c/{key}">
+  <div style="color:#2e3849; font-size:16px; font-weight:700;">Data Engineer {key}</div>
+  <div style="color:#5a6881; font-size:14px; font-weight:400;">Acme Pty Ltd</div>
+  <div>Sydney NSW</div>
+</a>
+"""
+HTML = "<html><body>" + CARD.format(key="a") + CARD.format(key="b") + "</body></html>"
+URL_A = "https://email.s.seek.com.au/uni/ss/c/a"
+VERSION = PARSER_CONFIGS["jobmail@s.seek.com.au"]["parser_version"]
+
+
+def _seed_parsed(conn) -> None:
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, html_raw, from_email, "
+        "internal_date_ms) VALUES (?, ?, 'fetched', 'x', ?, 'jobmail@s.seek.com.au', ?)",
+        [("m1", "t1", HTML, 1), ("m2", "t2", HTML, 2)],
+    )
+    conn.commit()
+    run_mail_parse(conn)
+
+    # m1 was parsed by an older parser: other title for card a, a card that is gone
+    conn.execute("UPDATE emails SET parser_version = 'v0' WHERE message_id = 'm1'")
+    conn.execute("UPDATE email_job_hits SET parser_version = 'v0' WHERE message_id = 'm1'")
+    conn.execute(
+        "UPDATE email_job_hits SET title = 'Old title' WHERE message_id = 'm1' AND out_url = ?",
+        (URL_A,),
+    )
+    conn.execute(
+        "INSERT INTO email_job_hits(message_id, out_url, source, parser_version) "
+        "VALUES ('m1', 'https://email.s.seek.com.au/uni/ss/c/gone', 'seek', 'v0')"
+    )
+    conn.commit()
+
+
+def _hits(conn, message_id):
+    rows = conn.execute(
+        "SELECT out_url, title, parser_version FROM email_job_hits WHERE message_id = ? "
+        "ORDER BY out_url",
+        (message_id,),
+    ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_reparse_writes_only_changed_hits_of_outdated_emails(conn):
+    _seed_parsed(conn)
+    m2_before = _hits(conn, "m2")
+
+    totals = reparse_mod.run_mail_reparse(conn, page_size=1)
+
+    assert totals == {
+        "emails": 1,
+        "hits_new": 0,
+        "hits_changed": 1,
+        "hits_unchanged": 1,
+        "hits_stale": 1,
+        "error": 0,
+        "skipped": 0,
+    }
+    assert _hits(conn, "m1") == [
+        (URL_A, "Data Engineer a", VERSION),
+        ("https://email.s.seek.com.au/uni/ss/c/b", "Data Engineer b", "v0"),  # untouched
+        ("https://email.s.seek.com.au/uni/ss/c/gone", None, "v0"),  # stale, kept
+    ]
+    assert _hits(conn, "m2") == m2_before
+    email = conn.execute(
+        "SELECT parser_version, template FROM emails WHERE message_id='m1'"
+    ).fetchone()
+    assert email[0] == VERSION
+    assert email[1] is not None
+
+    # up to date now
+    assert reparse_mod.run_mail_reparse(conn)["emails"] == 0
+
+
+def test_reparse_dry_run_reports_without_writing(conn):
+    _seed_parsed(conn)
+    before = _hits(conn, "m1")
+
+    totals = reparse_mod.run_mail_reparse(conn, dry_run=True)
+
+    assert (totals["hits_changed"], totals["hits_stale"]) == (1, 1)
+    assert _hits(conn, "m1") == before
+    assert reparse_mod.run_mail_reparse(conn, dry_run=True)["emails"] == 1
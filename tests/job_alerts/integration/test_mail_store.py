@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 from hiring_compass_au.infra.storage.mail_store import (
+    get_fetched_emails_to_parse,
+    get_non_fetched_email_senders,
     update_fetched_email_metadata,
     update_parsed_email,
     upsert_indexed_emails,
 )
+from hiring_compass_au.infra.storage.migrations import (
+    migration_0007_emails_fetched_queue_index as migration_0007,
+)
 
 
 def test_upsert_indexed_emails_is_idempotent(conn):
@@ -19,6 +24,14 @@ def test_upsert_indexed_emails_is_idempotent(conn):
     rows = conn.execute("SELECT message_id, status FROM emails ORDER BY message_id").fetchall()
     assert [(r["message_id"], r["status"]) for r in rows] == [("m1", "indexed"), ("m2", "indexed")]
 
+    # the sender of a from:(sender) listing is recorded with new rows only
+    upsert_indexed_emails(conn, [*messages, {"id": "m3", "threadId": "t3"}], "a@example.com")
+    assert get_non_fetched_email_senders(conn) == [
+        ("m1", None),
+        ("m2", None),
+        ("m3", "a@example.com"),
+    ]
+
 
 def test_update_fetched_email_metadata_sets_fetched_status_and_received_at(conn):
     conn.execute(
@@ -103,3 +116,34 @@ def test_update_parsed_email_status_transitions(conn):
     assert update_parsed_email(conn, "m", error="x") == 1
     status = conn.execute("SELECT status FROM emails WHERE message_id='m'").fetchone()["status"]
     assert status == "parsed_error"
+
+
+def test_get_fetched_emails_to_parse_pages_by_keyset_while_writing(conn):
+    conn.executemany(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at, html_raw, internal_date_ms) "
+        "VALUES (?, 't', 'fetched', 'x', '<html/>', ?)",
+        [("m5", 20), ("m1", None), ("m3", 10), ("m2", 10), ("m4", None), ("m6", 5)],
+    )
+    conn.commit()
+
+    seen = []
+    for message in get_fetched_emails_to_parse(conn, page_size=2):
+        seen.append(message["message_id"])
+        update_parsed_email(conn, message["message_id"], error="x")
+        conn.commit()
+
+    assert seen == ["m1", "m4", "m6", "m2", "m3", "m5"]
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT message_id FROM emails WHERE status = 'fetched' "
+        "AND (internal_date_ms, message_id) > (1, '') ORDER BY internal_date_ms, message_id"
+    ).fetchall()
+    assert any("idx_emails_fetched_queue" in row[-1] for row in plan)
+
+
+def test_fetched_queue_index_migration_adds_index_to_existing_databases(conn):
+    assert migration_0007.apply(conn) is False
+
+    conn.execute("DROP INDEX idx_emails_fetched_queue")
+    assert migration_0007.apply(conn) is True
+    assert migration_0007.apply(conn) is False
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+import hiring_compass_au.services.job_alerts.enrichment.async_canonicalizer as async_mod
+from hiring_compass_au.services.job_alerts.enrichment.async_canonicalizer import (
+    run_url_canonicalization_batch_async,
+)
+
+TRACKING = "https://email.s.seek.com.au/uni/ss/c/"
+
+
+def _seed(conn, out_urls) -> None:
+    conn.execute(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES ('m','t','indexed','x')"
+    )
+    conn.executemany(
+        "INSERT INTO email_job_hits(message_id, out_url, source) VALUES ('m', ?, 'seek')",
+        [(u,) for u in out_urls],
+    )
+    conn.commit()
+
+
+def test_async_batch_resolves_concurrently_with_sync_outcomes(conn):
+    ok_urls = [f"{TRACKING}ok{i}" for i in range(8)]
+    _seed(conn, [*ok_urls, f"{TRACKING}gone", f"{TRACKING}busy", f"{TRACKING}down"])
+
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            in_flight["now"] -= 1
+
+        key = request.url.path.rsplit("/", 1)[-1]
+        if key.startswith("ok"):
+            location = f"https://www.seek.com.au/job/{100 + int(key[2:])}?ref=alert"
+            return httpx.Response(302, headers={"Location": location})
+        if key == "gone":
+            return httpx.Response(404)
+        if key == "busy":
+            return httpx.Response(503)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await run_url_canonicalization_batch_async(
+                conn, client, limit=50, concurrency=8, per_host_concurrency=3
+            )
+
+    assert asyncio.run(run()) == (8, 2, 1, 11)
+    assert in_flight["max"] == 3  # one host, capped per host
+
+    rows = conn.execute(
+        "SELECT out_url, canonical_status, canonical_url, external_job_id, http_status, "
+        "attempt_count, promote_status FROM email_job_hits"
+    ).fetchall()
+    by_key = {r["out_url"].rsplit("/", 1)[-1].strip(): r for r in rows}
+    assert (by_key["ok3"]["canonical_status"], by_key["ok3"]["external_job_id"]) == ("ok", "103")
+    assert by_key["ok3"]["canonical_url"] == "https://www.seek.com.au/job/103"
+    assert (by_key["gone"]["canonical_status"], by_key["gone"]["http_status"]) == ("error", 404)
+    assert by_key["gone"]["promote_status"] == "rejected"
+    assert (by_key["busy"]["canonical_status"], by_key["busy"]["http_status"]) == ("retry", 503)
+    assert by_key["down"]["canonical_status"] == "retry"
+    assert all(r["attempt_count"] == 1 for r in rows)
+
+
+def test_retry_outcome_pauses_the_host_for_the_other_requests(conn, monkeypatch):
+    monkeypatch.setattr(async_mod, "RETRY_BACKOFF_S", (0.2, 0.2))
+    _seed(conn, [f"{TRACKING}ok{i}" for i in range(4)])
+
+    loop_times = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        key = request.url.path.rsplit("/", 1)[-1]
+        loop_times.setdefault(key, []).append(asyncio.get_running_loop().time())
+        if key == "ok0":
+            return httpx.Response(429)
+        return httpx.Response(302, headers={"Location": f"https://www.seek.com.au/job/{key[2:]}"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await run_url_canonicalization_batch_async(
+                conn, client, limit=50, concurrency=4, per_host_concurrency=1
+            )
+
+    assert asyncio.run(run()) == (3, 1, 0, 4)
+    throttled = max(loop_times.pop("ok0"))
+    assert len(loop_times) == 3
+    # the other URLs, queued behind the 429 on the same host, waited for the pause
+    assert min(min(times) for times in loop_times.values()) - throttled >= 0.2
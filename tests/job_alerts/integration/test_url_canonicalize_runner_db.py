@@ -43,3 +43,25 @@ def test_run_url_canonicalization_updates_db_statuses(conn, monkeypatch):
     ).fetchall()
     statuses = {r["out_url"]: r["canonical_status"] for r in rows}
     assert statuses == {"u1": "ok", "u2": "retry", "u3": "error"}
+
+
+def test_async_engine_shares_one_rate_budget_and_backoff_across_batches(conn, monkeypatch):
+    conn.execute(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES ('m','t','indexed','x')"
+    )
+    conn.execute("INSERT INTO email_job_hits(message_id, out_url, source) VALUES ('m','u1','seek')")
+    seen = []
+
+    def fake_batch(_conn, *, rate, backoff, **_kwargs):
+        seen.append((rate, backoff))
+        return 1, 0, 0, 1
+
+    monkeypatch.setattr(mod, "run_url_canonicalization_batch_concurrent", fake_batch)
+
+    run_url_canonicalization(conn, engine="async", rate_per_s=5, max_batches=3)
+
+    assert len(seen) == 3
+    (rate, backoff), *others = seen
+    assert rate.units_per_s == 5
+    assert all(r is rate and b is backoff for r, b in others)
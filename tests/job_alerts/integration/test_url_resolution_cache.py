@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+
+import requests
+
+import hiring_compass_au.services.job_alerts.enrichment.runner as mod
+from hiring_compass_au.services.job_alerts.enrichment.url_canonicalizer import (
+    CanonicalizeError,
+)
+
+
+def _seed(conn, message_id, hits) -> None:
+    conn.execute(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES (?, 't', 'parsed', 'x')",
+        (message_id,),
+    )
+    conn.executemany(
+        "INSERT INTO email_job_hits(message_id, out_url, fingerprint, source) "
+        "VALUES (?, ?, ?, 'seek')",
+        [(message_id, out_url, fp) for out_url, fp in hits],
+    )
+    conn.commit()
+
+
+def _patch_resolver(monkeypatch) -> list[str]:
+    calls = []
+
+    def fake_resolve(_session, out_url, timeout=15.0):
+        calls.append(out_url)
+        if out_url == "u1":
+            return "123", "https://www.seek.com.au/job/123", 302
+        if out_url == "u2":
+            raise CanonicalizeError("No Location header (status=404)", http_status=404)
+        raise requests.Timeout("t")
+
+    monkeypatch.setattr(mod, "resolve_to_canonical", fake_resolve)
+    monkeypatch.setattr(time, "sleep", lambda *_: None)
+    return calls
+
+
+def _statuses(conn, message_id):
+    rows = conn.execute(
+        "SELECT out_url, canonical_status, external_job_id FROM email_job_hits "
+        "WHERE message_id = ? ORDER BY out_url",
+        (message_id,),
+    ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_resolutions_are_cached_deduped_and_negative_cached(conn, monkeypatch):
+    calls = _patch_resolver(monkeypatch)
+    _seed(conn, "m1", [("u1", "fp1"), ("u2", None), ("u3", None)])
+    _seed(conn, "m2", [("u1", "fp1")])
+
+    stats = {}
+    assert mod.run_url_canonicalization(conn, stats=stats) == (4, 2, 1, 1)
+    assert sorted(calls) == ["u1", "u2", "u3"]  # u1 once for both emails
+    assert stats["deduped"] == 1
+    assert (stats["cache_hits"], stats["cache_misses"]) == (0, 3)
+
+    # next alerts: u1 (ok) and u2 (404) come from the cache, u3 (retry) is requested again
+    calls.clear()
+    _seed(conn, "m3", [("u1", "fp1"), ("u2", None), ("u3", None), ("u4", "fp1")])
+    conn.execute("UPDATE email_job_hits SET next_retry_at = NULL WHERE out_url = 'u3'")
+    stats = {}
+    mod.run_url_canonicalization(conn, cache_reuse_fingerprint=True, stats=stats)
+
+    assert calls == ["u3"]  # m1 retry and m3 share one request, u4 reuses the fp1 result
+    assert _statuses(conn, "m3") == [
+        ("u1", "ok", "123"),
+        ("u2", "error", None),
+        ("u3", "retry", None),
+        ("u4", "ok", "123"),
+    ]
+    assert stats["cache_fingerprint_hits"] == 1
+    assert stats["cache_hits"] == 3 and stats["cache_hit_rate"] == 0.75
+
+
+def test_expired_resolutions_are_requested_again(conn, monkeypatch):
+    calls = _patch_resolver(monkeypatch)
+    _seed(conn, "m1", [("u1", None)])
+    mod.run_url_canonicalization(conn)
+
+    conn.execute("UPDATE url_resolution_cache SET expires_at = '2000-01-01T00:00:00+00:00'")
+    _seed(conn, "m2", [("u1", None)])
+    mod.run_url_canonicalization(conn)
+
+    assert calls == ["u1", "u1"]
+    expires_at = conn.execute("SELECT expires_at FROM url_resolution_cache").fetchone()[0]
+    assert expires_at > "2001"
+
+    # caching disabled
+    _seed(conn, "m3", [("u1", None)])
+    mod.run_url_canonicalization(conn, cache_ttl_days=None, cache_negative_ttl_days=None)
+    assert calls == ["u1", "u1", "u1"]
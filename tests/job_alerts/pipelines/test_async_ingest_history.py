@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from hiring_compass_au.infra.storage.mail_store import get_history_id
+from hiring_compass_au.services.job_alerts import pipeline as pipeline_mod
+
+
+def _run_async_ingest(conn, monkeypatch, history_indexed):
+    listed = []
+
+    def fake_ingest(_creds, _conn, senders, **kwargs):
+        listed.append((list(senders), kwargs["metadata_first"]))
+        return {"found": 1, "inserted": 1, "ok": 0}
+
+    monkeypatch.setattr(pipeline_mod, "authenticate_gmail", lambda **_: object())
+    monkeypatch.setattr(pipeline_mod, "build_gmail_service", lambda _creds: object())
+    monkeypatch.setattr(pipeline_mod, "index_history_added", lambda _s, _c: history_indexed)
+    monkeypatch.setattr(pipeline_mod, "get_current_history_id", lambda _s: "42")
+    monkeypatch.setattr(pipeline_mod, "run_mail_ingest", fake_ingest)
+
+    results = pipeline_mod.run_job_alert_pipeline(
+        conn,
+        Path("ignored"),
+        Path("ignored"),
+        "127.0.0.1",
+        0,
+        False,
+        parse=False,
+        canonicalize=False,
+        promote=False,
+        index_use_history=True,
+        ingest_engine="async",
+        progress=False,
+    )
+    return results, listed
+
+
+@pytest.mark.parametrize(
+    ("history_indexed", "mode", "listed_senders", "found", "history_id"),
+    [
+        ((2, 3), "history", [], 4, None),  # index_history_added stores its own historyId
+        (None, "async", ["jobmail@s.seek.com.au"], 1, "42"),
+    ],
+)
+def test_async_ingest_honours_index_use_history(
+    conn, monkeypatch, history_indexed, mode, listed_senders, found, history_id
+):
+    results, listed = _run_async_ingest(conn, monkeypatch, history_indexed)
+
+    assert results["index"]["mode"] == mode
+    assert results["index"]["found"] == found
+    # history-indexed senders are unknown: headers are read before any body
+    assert listed == [(listed_senders, True)]
+    assert get_history_id(conn) == history_id
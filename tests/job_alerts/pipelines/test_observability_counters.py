@@ -41,7 +41,7 @@ def test_mail_fetch_counters(monkeypatch):
             "error": None,
         }
 
-    def fake_load(_service, message_id):
+    def fake_load(_service, message_id, profile="full"):
         if message_id == "m2":
             raise RuntimeError("boom")
         return {"id": message_id}
@@ -21,7 +21,7 @@ def _conn():
 def test_run_job_alert_pipeline_returns_expected_shape_without_gmail(monkeypatch):
     conn = _conn()
 
-    monkeypatch.setattr(pipeline_mod, "run_mail_parse", lambda conn: (2, 7, 1, 0, 0, 88.0))
+    monkeypatch.setattr(pipeline_mod, "run_mail_parse", lambda conn, **_: (2, 7, 1, 0, 0, 88.0))
     monkeypatch.setattr(pipeline_mod, "run_url_canonicalization", lambda **_: (3, 1, 1, 1))
     monkeypatch.setattr(pipeline_mod, "run_promote_job_ad", lambda conn: (1, 1, 0))
 
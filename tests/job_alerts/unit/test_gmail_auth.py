@@ -50,3 +50,44 @@ def test_authenticate_gmail_rejects_port_0_when_listening_on_all_interfaces(tmp_
             oauth_port=0,
             oauth_open_browser=False,
         )
+
+
+def test_save_token_replaces_the_file_atomically(tmp_path):
+    token = tmp_path / "secrets" / "token.json"
+    creds = SimpleNamespace(to_json=lambda: '{"token": "a"}')
+
+    auth_mod.save_token(token, creds)
+    assert token.read_text(encoding="utf-8") == '{"token": "a"}'
+
+    creds.to_json = lambda: '{"token": "b"}'
+    auth_mod.save_token(token, creds)
+    assert token.read_text(encoding="utf-8") == '{"token": "b"}'
+    assert [p.name for p in token.parent.iterdir()] == ["token.json"]
+
+
+def test_save_token_keeps_the_previous_file_when_the_replace_fails(tmp_path, monkeypatch):
+    token = tmp_path / "token.json"
+    token.write_text('{"token": "a"}', encoding="utf-8")
+
+    def failing_replace(_src, _dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(auth_mod.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        auth_mod.save_token(token, SimpleNamespace(to_json=lambda: '{"token": "b"}'))
+    assert token.read_text(encoding="utf-8") == '{"token": "a"}'
+    assert [p.name for p in tmp_path.iterdir()] == ["token.json"]
+
+
+def test_build_gmail_service_uses_bundled_discovery_doc(monkeypatch):
+    from google.oauth2.credentials import Credentials
+
+    def no_network_build(*_args, **_kwargs):
+        raise AssertionError("discovery must come from the bundled document")
+
+    monkeypatch.setattr(auth_mod, "build", no_network_build)
+
+    service = auth_mod.build_gmail_service(Credentials(token="t"))
+    request = service.users().messages().get(userId="me", id="m1", format="full")
+
+    assert request.uri.startswith("https://gmail.googleapis.com/gmail/v1/users/me/messages/m1")
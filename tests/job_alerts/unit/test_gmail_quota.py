@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from hiring_compass_au.infra.rate_limit import AsyncQuotaBudget, QuotaBudget
+from hiring_compass_au.services.job_alerts.ingestion.quota import cap_workers_to_budget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.now += seconds
+
+
+def test_quota_budget_waits_for_refill_once_burst_is_spent():
+    clock = FakeClock()
+    budget = QuotaBudget(10, clock=clock, sleep=clock.sleep)
+
+    assert budget.acquire(5) == 0.0
+    assert budget.acquire(5) == 0.0
+    waited = budget.acquire(5)
+
+    assert waited == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_async_quota_budget_waits_for_refill_once_burst_is_spent():
+    clock = FakeClock()
+    budget = AsyncQuotaBudget(10, clock=clock, sleep=clock.async_sleep)
+
+    async def spend():
+        return [await budget.acquire(5) for _ in range(3)]
+
+    assert asyncio.run(spend()) == [0.0, 0.0, pytest.approx(0.5)]
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_quota_budget_rejects_requests_above_capacity():
+    budget = QuotaBudget(10)
+    with pytest.raises(ValueError):
+        budget.acquire(11)
+
+
+def test_cap_workers_to_budget():
+    assert cap_workers_to_budget(8, 250, 5) == 8
+    assert cap_workers_to_budget(100, 250, 5) == 50
+    assert cap_workers_to_budget(4, 3, 5) == 1
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from hiring_compass_au.services.job_alerts.parsers.html_engines import get_anchor_iterator
+from hiring_compass_au.services.job_alerts.parsers.seek_mail_parser import parse_seek_email
+
+CARD_LINES = (
+    '<div style="color:#2e3849; font-size:16px; font-weight:700;">Data Engineer</div>'
+    '<div style="color:#5a6881; font-size:14px; font-weight:400;">Acme</div>'
+    "<div>Sydney NSW</div>"
+)
+
+
+def _anchor(key: str, content: str) -> str:
+    return f'<a href="https://email.s.seek.com.au/uni/ss/c/{key}">{content}</a>'
+
+
+def test_unknown_engine_is_an_error_not_a_fallback():
+    with pytest.raises(ValueError, match="Unknown HTML engine"):
+        get_anchor_iterator("selectolax")
+    with pytest.raises(ValueError):
+        list(parse_seek_email(_anchor("x1", CARD_LINES), engine="lxml"))
+
+
+def test_script_style_and_comments_are_not_card_text():
+    card = _anchor(
+        "x1", f"<style>.t{{color:red}}</style><!-- c -->{CARD_LINES}<script>var x=1;</script>"
+    )
+    html = f"<html><body>{card}<template><div>Hidden</div></template></body></html>"
+
+    hits = list(parse_seek_email(html))
+
+    assert [h["title"] for h in hits] == ["Data Engineer"]
+    assert hits[0]["debug_lines"] == ["Data Engineer", "Acme", "Sydney NSW"]
+
+
+def test_misnested_cards_keep_the_markup_as_written():
+    # an HTML5 tree builder would close the <p> and move the card out of its <a>
+    div_in_p = f"<html><body><p>{_anchor('x1', CARD_LINES)}</p></body></html>"
+    assert [h["title"] for h in parse_seek_email(div_in_p)] == ["Data Engineer"]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import base64
+from email import policy
+from email.message import EmailMessage
+
+import pytest
+
+from hiring_compass_au.services.job_alerts.ingestion import mail_fetch as mail_fetch_mod
+
+HTML = "<html><body><a href='https://email.s.seek.com.au/uni/ss/c/x'>Café</a></body></html>"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _full_message() -> dict:
+    return {
+        "internalDate": "1700000000000",
+        "payload": {
+            "mimeType": "multipart/alternative",
+            "headers": [
+                {"name": "From", "value": "SEEK <jobmail@s.seek.com.au>"},
+                {"name": "Subject", "value": "3 new jobs"},
+            ],
+            "body": {},
+            "parts": [
+                {"mimeType": "text/plain", "body": {"data": _b64(b"plain")}},
+                {"mimeType": "text/html", "body": {"data": _b64(HTML.encode())}},
+            ],
+        },
+    }
+
+
+def _raw_message(mime_policy=policy.default) -> dict:
+    mime = EmailMessage()
+    mime["From"] = "SEEK <jobmail@s.seek.com.au>"
+    mime["Subject"] = "3 new jobs"
+    mime.set_content("plain")
+    mime.add_alternative(HTML, subtype="html")
+    return {"internalDate": "1700000000000", "raw": _b64(mime.as_bytes(policy=mime_policy))}
+
+
+@pytest.mark.parametrize("mime_policy", [policy.default, policy.SMTP])
+def test_raw_profile_extracts_same_fields_as_full_profile(mime_policy):
+    full = mail_fetch_mod.extract_message_fields(_full_message())
+    raw = mail_fetch_mod.extract_raw_message_fields(_raw_message(mime_policy))
+
+    assert raw == full
+    assert raw["html_raw"] == HTML
+
+
+def test_run_mail_fetch_reports_profile_bytes_and_latency(conn, monkeypatch):
+    conn.execute(
+        "INSERT INTO emails(message_id, thread_id, status, indexed_at) "
+        "VALUES ('m1', 't1', 'indexed', '2026-01-01T00:00:00+00:00')"
+    )
+    conn.commit()
+    profiles = []
+
+    def fake_load(_service, _message_id, profile="full"):
+        profiles.append(profile)
+        return _raw_message()
+
+    monkeypatch.setattr(mail_fetch_mod, "load_message", fake_load)
+
+    stats = {}
+    result = mail_fetch_mod.run_mail_fetch(None, conn, profile="raw", stats=stats)
+
+    assert result == (1, 1, 0, 1)
+    assert profiles == ["raw"]
+    assert stats["profile"] == "raw"
+    assert stats["response_bytes"] > len(HTML)
+    assert stats["latency_ms_mean"] >= 0
+
+
+def test_run_mail_fetch_rejects_unknown_profile(conn):
+    with pytest.raises(ValueError):
+        mail_fetch_mod.run_mail_fetch(None, conn, profile="tiny")
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from hiring_compass_au.domain.normalizers import normalize_job_fields as nf
+
+
+def test_parse_location_raw_is_memoized_and_returns_copies():
+    nf._parse_location.cache_clear()
+
+    first = nf.parse_location_raw("Surry Hills,  Sydney NSW")
+    first["city"] = "mutated"
+    second = nf.parse_location_raw(" Surry Hills, Sydney   NSW ")
+
+    assert second == {
+        "suburb": "Surry Hills",
+        "city": "Sydney",
+        "state": "NSW",
+        "location_raw": "Surry Hills, Sydney NSW",
+    }
+    assert nf._parse_location.cache_info().misses == 1
+
+
+def test_parse_many_parses_each_distinct_string_once():
+    nf._parse_salary.cache_clear()
+    values = ["$120k - $140k p.a.", None, "$120k - $140k p.a.", "$45 per hour", ""]
+
+    parsed = nf.parse_salary_many(values)
+
+    assert parsed == [nf.parse_salary_raw(v) for v in values]
+    assert parsed[0] == {
+        "salary_min": 120000.0,
+        "salary_max": 140000.0,
+        "salary_period": "year",
+        "salary_raw": "$120k - $140k p.a.",
+    }
+    assert parsed[0] is not parsed[2]
+    assert nf._parse_salary.cache_info().currsize == 3  # "", "$120k...", "$45..."
+
+    locations = nf.parse_location_many(["Sydney NSW", "Perth WA", "Sydney NSW"])
+    assert [loc["state"] for loc in locations] == ["NSW", "WA", "NSW"]
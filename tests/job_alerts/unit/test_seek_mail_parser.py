@@ -2,7 +2,13 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from hiring_compass_au.services.job_alerts.parsers.seek_mail_parser import parse_seek_email
+from bs4 import BeautifulSoup
+
+import hiring_compass_au.services.job_alerts.parsers.seek_mail_parser as parser_mod
+from hiring_compass_au.services.job_alerts.parsers.seek_mail_parser import (
+    parse_seek_email,
+    scan_job_card,
+)
 
 
 def test_parse_seek_email_from_fixture_extracts_one_hit():
@@ -20,3 +26,70 @@ def test_parse_seek_email_from_fixture_extracts_one_hit():
     assert hit["location_raw"] == "Sydney NSW"
     assert isinstance(hit["hit_confidence"], int)
     assert 0 <= hit["hit_confidence"] <= 100
+
+
+def test_scan_job_card_matches_per_div_get_text_on_nested_divs():
+    long_block = "boilerplate " * 20
+    html = (
+        '<a href="https://email.s.seek.com.au/uni/ss/c/x"><div style="PADDING:0">'
+        '<div style="color:#2e3849; font-size:16px; font-weight:700"> Data  <b>Engineer</b></div>'
+        "<!-- skipped --><div><div>Acme</div><div> Sydney NSW </div></div>"
+        f"<div>{long_block}</div><div>   </div></div></a>"
+    )
+    a = BeautifulSoup(html, "html.parser").a
+
+    card = scan_job_card(a)
+
+    expected = []
+    for d in a.find_all("div"):
+        txt = d.get_text(" ", strip=True)
+        if txt and len(txt) <= 120:
+            expected.append(((d.get("style") or "").lower(), txt))
+    assert card["cands"] == expected
+    assert card["div_text_count"] == 6
+    assert card["cands"][0] == ("color:#2e3849; font-size:16px; font-weight:700", "Data Engineer")
+
+
+def _card(key: str, lines: list[str]) -> str:
+    divs = "".join(f"<div>{line}</div>" for line in lines)
+    return (
+        f'<a href="https://email.s.seek.com.au/uni/ss/c/{key}">'
+        '<div style="color:#2e3849; font-size:16px; font-weight:700">Engineer ' + key + "</div>"
+        '<div style="color:#5a6881; font-size:14px; font-weight:400">Acme ' + key + "</div>"
+        f"{divs}</a>"
+    )
+
+
+def test_same_skeleton_cards_keep_their_own_heuristic_fields():
+    # Same skeleton on every card, but the heuristics pick different positions:
+    # the shortest money line for the salary, the lowest-penalty line for the location
+    first = _card("a", ["Sydney NSW", "$100,000 per year", "Great culture"])
+    shortest_money = _card("b", ["Sydney NSW", "$120,000 - $140,000 per year", "$5k bonus"])
+    remote_location = _card("c", ["Parramatta, Sydney NSW", "Hybrid - NSW", "$90,000"])
+
+    alone = list(parse_seek_email(shortest_money + remote_location))
+    hits = list(parse_seek_email(first + shortest_money + remote_location))
+
+    assert hits[1:] == alone
+    assert len({h["template"] for h in hits}) == 1
+    assert hits[1]["salary_raw"] == "$5k bonus"
+    assert hits[2]["location_raw"] == "Hybrid - NSW"
+
+
+def test_location_and_salary_lines_are_normalized_once_per_email(monkeypatch):
+    calls = []
+    real_parse_location_many = parser_mod.parse_location_many
+
+    def recording_parse_location_many(values):
+        values = list(values)
+        calls.append(values)
+        return real_parse_location_many(values)
+
+    monkeypatch.setattr(parser_mod, "parse_location_many", recording_parse_location_many)
+    html = "".join(_card(k, ["Sydney NSW", "$95 per hour"]) for k in "abc")
+
+    hits = list(parse_seek_email(html))
+
+    assert calls == [["Sydney NSW"] * 3]
+    assert [h["location_raw"] for h in hits] == ["Sydney NSW"] * 3
+    assert [h["salary_period"] for h in hits] == ["hour"] * 3
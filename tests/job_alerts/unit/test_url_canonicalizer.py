@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 from types import SimpleNamespace
 
 import pytest
@@ -7,10 +8,23 @@ import pytest
 from hiring_compass_au.services.job_alerts.enrichment.url_canonicalizer import (
     CanonicalizeError,
     canonicalize_seek_location,
+    decode_offline,
     resolve_to_canonical,
 )
 
 
+class NoNetworkSession:
+    def head(self, out_url, allow_redirects, timeout):
+        raise AssertionError("HEAD should not be called for a decodable URL")
+
+    def get(self, out_url, allow_redirects, timeout):
+        raise AssertionError("GET should not be called for a decodable URL")
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
 def test_canonicalize_seek_location_strips_to_job_id_path():
     job_id, canonical = canonicalize_seek_location("https://www.seek.com.au/job/12345?foo=1")
     assert job_id == "12345"
@@ -45,3 +59,48 @@ def test_resolve_to_canonical_raises_when_no_location():
 
     with pytest.raises(CanonicalizeError):
         resolve_to_canonical(FakeSession(), "https://email.s.seek.com.au/uni/ss/c/x")
+
+
+def test_resolve_to_canonical_decodes_base64_token_offline():
+    token = _b64('{"u":"https://www.seek.com.au/job/81234567?tracking=JOBMAIL","c":1}')
+    out_url = f"https://email.s.seek.com.au/uni/ss/c/{token}/4ab/h1/xyz"
+
+    job_id, canonical, status = resolve_to_canonical(NoNetworkSession(), out_url)
+    assert job_id == "81234567"
+    assert canonical == "https://www.seek.com.au/job/81234567"
+    assert status is None
+
+
+def test_decode_offline_reads_redirect_query_param():
+    out_url = (
+        "https://click.example.net/r?id=7&url=https%3A%2F%2Fwww.seek.com.au%2Fjob%2F555%3Fref%3Dx"
+    )
+    assert decode_offline(out_url) == ("555", "https://www.seek.com.au/job/555")
+
+
+def test_decode_offline_rejects_non_seek_destination():
+    token = _b64("https://evil.example.com/job/123")
+    assert decode_offline(f"https://email.s.seek.com.au/uni/ss/c/{token}") is None
+    assert (
+        decode_offline("https://x.example.net/r?url=https%3A%2F%2Fseek.com.au.evil.io%2Fjob%2F1")
+        is None
+    )
+
+
+def test_resolve_to_canonical_falls_back_to_head_when_opaque():
+    calls = []
+
+    class FakeSession:
+        def head(self, out_url, allow_redirects, timeout):
+            calls.append(out_url)
+            return SimpleNamespace(
+                status_code=302, headers={"Location": "https://www.seek.com.au/job/42"}
+            )
+
+    out_url = "https://email.s.seek.com.au/uni/ss/c/AAAAAAAAAAAAAAAAAAAAAAAA/opaque"
+    assert resolve_to_canonical(FakeSession(), out_url) == (
+        "42",
+        "https://www.seek.com.au/job/42",
+        302,
+    )
+    assert calls == [out_url]